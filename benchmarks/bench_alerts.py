@@ -0,0 +1,101 @@
+"""Benchmark: checking thousands of price alert rules on each refresh tick.
+
+Random spot, coin and ratio rules (1k, 10k and 100k of them) are checked
+against a sequence of snapshots with small price moves (a typical tick) and
+one large move that crosses many rules:
+
+    python benchmarks/bench_alerts.py [--sizes 1000,10000,100000] [--json out.json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import tracker_core as core  # noqa: E402
+from tracker_alerts import AlertEngine  # noqa: E402
+from tracker_quote import Quote  # noqa: E402
+
+SIZES = (1_000, 10_000, 100_000)
+RATES = {"USD": 1.0, "GBP": 0.79, "EUR": 0.9231}
+TICKS = 50
+
+
+def random_rules(count, rng):
+    coins = core.CATALOGUE.names
+    rules = []
+    for i in range(count):
+        op = rng.choice("<>")
+        kind = i % 3
+        if kind == 0:
+            rules.append(f"Silver {op} {rng.uniform(20, 45):.2f} {rng.choice(list(RATES))}")
+        elif kind == 1:
+            rules.append(f"{coins[i % len(coins)]} {op} {rng.uniform(0.5, 30):.2f} {rng.choice(list(RATES))}")
+        else:
+            rules.append(f"Gold/Silver {op} {rng.uniform(60, 90):.1f}")
+    return rules
+
+
+def snapshot(silver, gold=2300.0):
+    return core.build_data({"Gold": Quote(gold, "bench"), "Silver": Quote(silver, "bench"),
+                            "Platinum": Quote(998.4, "bench"), "Palladium": Quote(1012.75, "bench")})
+
+
+def run(sizes=SIZES, ticks=TICKS):
+    rng = random.Random(0)
+    metals = [m["name"] for m in core.METALS_CONFIG]
+    walk = [31.2]
+    for _ in range(ticks):
+        walk.append(walk[-1] + rng.gauss(0, 0.05))
+    snapshots = [snapshot(price) for price in walk]
+    jump = snapshot(walk[-1] * 1.15)
+
+    results = []
+    for rules in sizes:
+        engine = AlertEngine(core.CATALOGUE, metals)
+        start = time.perf_counter()
+        for text in random_rules(rules, rng):
+            engine.add(text)
+        engine.check(snapshots[0], RATES)          # builds the index and sets the baseline
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fired = sum(len(engine.check(data, RATES)) for data in snapshots[1:])
+        tick_seconds = (time.perf_counter() - start) / ticks
+
+        start = time.perf_counter()
+        jump_fired = len(engine.check(jump, RATES))
+        jump_seconds = time.perf_counter() - start
+
+        for case, seconds, count in (("load", load_seconds, rules), ("tick", tick_seconds, fired),
+                                     ("jump_15pct", jump_seconds, jump_fired)):
+            results.append({
+                "benchmark": "alerts",
+                "case": case,
+                "rows": rules,
+                "ms": round(seconds * 1000, 3),
+                "fired": count,
+            })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated rule counts")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run([int(s) for s in args.sizes.split(",")])
+    print(f"{'case':<12}{'rules':>10}{'ms':>12}{'fired':>10}")
+    for r in results:
+        print(f"{r['case']:<12}{r['rows']:>10,}{r['ms']:>12.3f}{r['fired']:>10,}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
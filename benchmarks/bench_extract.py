@@ -0,0 +1,109 @@
+"""Benchmark: APMEX price extraction, full DOM parse vs. the fast extractor.
+
+Runs both strategies over the synthetic APMEX fixtures (generated to
+match the live markup, not captures) and reports median CPU time and peak
+memory per page:
+
+    python benchmarks/bench_extract.py [--repeat N] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from tracker_extract import extract_apmex_price, extract_apmex_prices  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+METALS = [
+    {"name": "Gold",      "search_term": "Gold Price Per Ounce"},
+    {"name": "Silver",    "search_term": "Silver Price Per Ounce"},
+    {"name": "Platinum",  "search_term": "Platinum Price Per Ounce"},
+    {"name": "Palladium", "search_term": "Palladium Price Per Ounce"},
+]
+
+FIXTURES = {
+    "apmex_spotprices.html": METALS,
+    "apmex_silver_price.html": [METALS[1]],
+}
+
+
+def extract_full_dom(content, metals):
+    """The previous approach: full html.parser DOM, then one find() per metal."""
+    soup = BeautifulSoup(content, 'html.parser')
+    prices = {}
+    for metal in metals:
+        price = extract_apmex_price(soup, metal["search_term"])
+        if price:
+            prices[metal["name"]] = price
+    return prices
+
+
+STRATEGIES = {
+    "full_dom": extract_full_dom,
+    "fast": extract_apmex_prices,
+}
+
+
+def measure(func, content, metals, repeat):
+    """Returns (median CPU seconds, peak traced bytes, result) for `func`."""
+    times = []
+    for _ in range(repeat):
+        start = time.process_time()
+        result = func(content, metals)
+        times.append(time.process_time() - start)
+    tracemalloc.start()
+    func(content, metals)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak, result
+
+
+def run(repeat=20):
+    """Runs every strategy on every fixture and returns a list of result dicts."""
+    results = []
+    for fixture, metals in FIXTURES.items():
+        with open(os.path.join(FIXTURES_DIR, fixture), "rb") as f:
+            content = f.read()
+        expected = None
+        for name, func in STRATEGIES.items():
+            seconds, peak, prices = measure(func, content, metals, repeat)
+            if expected is None:
+                expected = prices
+            elif prices != expected:
+                raise AssertionError(f"{name} disagrees on {fixture}: {prices} != {expected}")
+            results.append({
+                "benchmark": "extract",
+                "fixture": fixture,
+                "strategy": name,
+                "bytes": len(content),
+                "cpu_ms": round(seconds * 1000, 3),
+                "peak_kib": round(peak / 1024, 1),
+            })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat)
+    print(f"{'fixture':<26}{'strategy':<10}{'cpu ms':>10}{'peak KiB':>12}")
+    for r in results:
+        print(f"{r['fixture']:<26}{r['strategy']:<10}{r['cpu_ms']:>10.3f}{r['peak_kib']:>12.1f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark: price parsing and currency formatting throughput.
+
+Measures calls per second for clean_price_text, Quote.parse
+(legacy price strings), Quote.text (display strings) and convert_price on
+single values. Bulk column formatting is measured with
+CurrencyFormatter.convert_column:
+
+    python benchmarks/bench_format.py [--count N] [--json out.json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np  # noqa: E402
+
+import tracker_core as core  # noqa: E402
+from tracker_format import get_formatter  # noqa: E402
+from tracker_quote import Quote  # noqa: E402
+
+
+def throughput(func, items):
+    """(seconds, items per second) for calling func once per item."""
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    seconds = time.perf_counter() - start
+    return seconds, len(items) / seconds if seconds else float("inf")
+
+
+def run(count=200_000):
+    rng = random.Random(0)
+    usd = [rng.uniform(0.01, 5000.0) for _ in range(count)]
+    price_strs = [f"${v:,.2f}" + rng.choice(("", "", " *", " (Manual)")) for v in usd]
+    quotes = [Quote.parse(p) for p in price_strs]
+    core.STATE.publish(exchange_rates={"USD": 1.0, "EUR": 0.9231})
+
+    cases = [
+        ("clean_price_text", lambda: throughput(core.clean_price_text, price_strs)),
+        ("quote_parse", lambda: throughput(Quote.parse, price_strs)),
+        ("quote_text", lambda: throughput(Quote.text, quotes)),
+        ("convert_price", lambda: throughput(lambda v: core.convert_price(v, "EUR"), usd)),
+    ]
+    column = np.array(usd)
+    fmt = get_formatter("EUR", 0.9231)
+
+    def bulk():
+        start = time.perf_counter()
+        fmt.convert_column(column)
+        seconds = time.perf_counter() - start
+        return seconds, count / seconds
+    cases.append(("convert_column", bulk))
+
+    results = []
+    for name, case in cases:
+        seconds, rate = case()
+        results.append({
+            "benchmark": "format",
+            "case": name,
+            "count": count,
+            "total_ms": round(seconds * 1000, 2),
+            "ops_per_sec": round(rate),
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.count)
+    print(f"{'case':<20}{'total ms':>12}{'ops/s':>14}")
+    for r in results:
+        print(f"{r['case']:<20}{r['total_ms']:>12.2f}{r['ops_per_sec']:>14,}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
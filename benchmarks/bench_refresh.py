@@ -0,0 +1,83 @@
+"""Benchmark: end-to-end get_all_data() latency against replayed upstream sources.
+
+Every scenario replays benchmarks/fixtures/replay_refresh.json with a
+different fault spec (see tracker_replay). Each refresh starts with an
+empty price cache, so every source is fetched:
+
+    python benchmarks/bench_refresh.py [--repeat N] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import tracker_core as core  # noqa: E402
+from tracker_sources import SourceRegistry  # noqa: E402
+
+RECORDING = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "replay_refresh.json")
+
+# name -> fault spec
+SCENARIOS = {
+    "instant": "",
+    "recorded_latency": "scale=1",
+    "slow_jittery": "scale=1,latency=0.2,jitter=0.3",
+    "apmex_403": "scale=1,apmex.com:forbidden=1",
+    "apmex_timeout": "scale=1,apmex.com:timeout=1",
+    "flaky": "scale=1,error=0.3",
+}
+
+
+def run(repeat=5, scenarios=None):
+    """Times `repeat` cold refreshes per scenario and returns a list of result dicts."""
+    results = []
+    for name in scenarios or SCENARIOS:
+        transport = core.configure_transport(replay=RECORDING, faults=SCENARIOS[name])
+        core.SOURCE_HEALTH = SourceRegistry()   # fresh circuit breakers per scenario
+        times = []
+        fallbacks = unavailable = 0
+        for _ in range(repeat):
+            core.PRICE_CACHE.clear()
+            start = time.perf_counter()
+            data = core.get_all_data()
+            times.append(time.perf_counter() - start)
+            quotes = [row["quote"] for row in data["spot"]]
+            fallbacks += sum(q.is_fallback for q in quotes)
+            unavailable += sum(not q.available for q in quotes)
+        results.append({
+            "benchmark": "refresh",
+            "scenario": name,
+            "faults": SCENARIOS[name],
+            "repeat": repeat,
+            "median_ms": round(statistics.median(times) * 1000, 1),
+            "min_ms": round(min(times) * 1000, 1),
+            "max_ms": round(max(times) * 1000, 1),
+            "fallback_quotes": fallbacks,
+            "unavailable_quotes": unavailable,
+            "requests": transport.stats["requests"],
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="run only these (repeatable)")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat, args.scenario)
+    print(f"{'scenario':<20}{'median ms':>11}{'min ms':>10}{'max ms':>10}{'fallback':>10}{'missing':>9}")
+    for r in results:
+        print(f"{r['scenario']:<20}{r['median_ms']:>11.1f}{r['min_ms']:>10.1f}{r['max_ms']:>10.1f}"
+              f"{r['fallback_quotes']:>10}{r['unavailable_quotes']:>9}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Benchmark: render_table() against a mocked Treeview for large catalogues.
+
+Synthetic catalogues of 100, 10k and 100k coins (built by repeating
+coins.csv) are rendered in each table mode:
+
+    tree_expanded  tree view with every category open (small catalogues)
+    tree_lazy      tree view with categories collapsed (over LAZY_EXPAND_LIMIT)
+    virtual        virtual-scroll view, 40 visible rows (over VIRTUAL_SCROLL_THRESHOLD)
+
+For each mode it times the first render, an unchanged re-render, a
+re-render after a price move and a currency switch. It also counts the
+Treeview calls each one made. No display is needed; ttkbootstrap only has
+to be importable:
+
+    python benchmarks/bench_render.py [--sizes 100,10000,100000] [--json out.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import silver_tracker as gui  # noqa: E402
+import tracker_core as core  # noqa: E402
+from tracker_catalogue import Catalogue, load_catalogue  # noqa: E402
+from tracker_quote import Quote  # noqa: E402
+
+SIZES = (100, 10_000, 100_000)
+MODES = ("tree_expanded", "tree_lazy", "virtual")
+VISIBLE_ROWS = 40
+
+PRICES = {"Gold": Quote(2345.10, "apmex"), "Silver": Quote(31.20, "apmex"),
+          "Platinum": Quote(998.40, "apmex"), "Palladium": Quote(1012.75, "apmex")}
+MOVED = dict(PRICES, Silver=Quote(31.45, "apmex"))
+RATES = {"USD": 1.0, "EUR": 0.9231}
+
+
+class FakeWidget:
+    def config(self, *args, **kw):
+        pass
+    configure = set = config
+
+    def bind(self, *args):
+        pass
+
+
+class FakeTree(FakeWidget):
+    """Just enough of ttk.Treeview for the table code, counting every mutating call."""
+
+    def __init__(self):
+        self.items = {}                 # iid -> [parent, values, tags]
+        self.children = {"": []}
+        self.calls = 0
+
+    def insert(self, parent, index, iid=None, values=(), tags=(), text="", open=False):
+        self.calls += 1
+        iid = iid or f"I{len(self.items)}"
+        self.items[iid] = [parent, values, tags]
+        self.children.setdefault(parent, []).append(iid)
+        self.children[iid] = []
+        return iid
+
+    def item(self, iid, values=None, tags=None):
+        self.calls += 1
+        entry = self.items[iid]
+        entry[1], entry[2] = values, tags
+
+    def delete(self, *iids):
+        self.calls += 1
+        gone = set(iids)
+        for parent in {self.items[iid][0] for iid in iids}:
+            self.children[parent] = [c for c in self.children[parent] if c not in gone]
+        stack = list(iids)
+        while stack:
+            iid = stack.pop()
+            del self.items[iid]
+            stack.extend(self.children.pop(iid))
+
+    def heading(self, column, **kw):
+        pass
+
+    def winfo_height(self):
+        return 10_000
+
+
+def synthetic_catalogue(rows):
+    """`rows` coins copied from coins.csv, in categories of about rows/100 (at least 10)."""
+    base = load_catalogue()
+    per_category = max(10, rows // 100)
+    records = []
+    for i in range(rows):
+        j = i % len(base)
+        records.append({
+            "category": f"c{i // per_category}",
+            "name": f"{base.names[j]} #{i}",
+            "metal": base.metals[base.metal_index[j]],
+            "weight_g": base.weight_g[j],
+            "purity": base.purity[j],
+        })
+    return Catalogue(records)
+
+
+def setup(catalogue, mode):
+    """Points silver_tracker at a fresh fake tree in `mode`; returns the tree."""
+    gui.CATALOGUE = core.CATALOGUE = catalogue
+    gui.tree = FakeTree()
+    gui.calc_spot_lbl = FakeWidget()
+    gui.TABLE_ROWS.clear()
+    gui.TABLE_CHILDREN.clear()
+    gui.TABLE_SYNCED.clear()
+    gui.EXPANDED.clear()
+    gui.TABLE_MODEL = None
+    gui.VIRTUAL_TABLE = None
+    if mode == "tree_expanded":
+        gui.EXPANDED.update(f"hdr:{key}" for key, _ in catalogue.categories)
+    elif mode == "virtual":
+        gui.VIRTUAL_TABLE = gui.VirtualTable(gui.tree, FakeWidget())
+        gui.VIRTUAL_TABLE.visible_count = lambda: VISIBLE_ROWS
+    gui.STATE.currency = "USD"
+    core.STATE.publish(data=core.build_data(PRICES), exchange_rates=RATES)
+    return gui.tree
+
+
+def timed_render(tree):
+    calls = tree.calls
+    start = time.perf_counter()
+    gui.render_table()
+    return round((time.perf_counter() - start) * 1000, 2), tree.calls - calls
+
+
+def run(sizes=SIZES, modes=MODES):
+    results = []
+    original = gui.CATALOGUE
+    try:
+        for rows in sizes:
+            catalogue = synthetic_catalogue(rows)
+            for mode in modes:
+                tree = setup(catalogue, mode)
+                phases = {"first": timed_render(tree), "unchanged": timed_render(tree)}
+                core.STATE.publish(data=core.build_data(MOVED))
+                phases["price_move"] = timed_render(tree)
+                gui.STATE.currency = "EUR"
+                phases["currency_switch"] = timed_render(tree)
+                for phase, (ms, calls) in phases.items():
+                    results.append({
+                        "benchmark": "render",
+                        "rows": rows,
+                        "mode": mode,
+                        "phase": phase,
+                        "ms": ms,
+                        "tree_calls": calls,
+                    })
+    finally:
+        gui.CATALOGUE = core.CATALOGUE = original
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated catalogue sizes")
+    parser.add_argument("--mode", action="append", choices=MODES, help="run only these (repeatable)")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run([int(s) for s in args.sizes.split(",")], args.mode or MODES)
+    print(f"{'rows':>8}  {'mode':<15}{'phase':<17}{'ms':>10}{'tree calls':>12}")
+    for r in results:
+        print(f"{r['rows']:>8}  {r['mode']:<15}{r['phase']:<17}{r['ms']:>10.2f}{r['tree_calls']:>12}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
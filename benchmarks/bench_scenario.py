@@ -0,0 +1,92 @@
+"""Benchmark: spot-price scenario grids (catalogue x price x currency) and their CSV export.
+
+Synthetic catalogues of 1k, 20k and 50k coins (built by repeating
+coins.csv) are valued across the default $20-$60 sweep in $0.50 steps (81
+prices) in all 7 currencies. The CSV export (every price and currency) is
+timed into memory:
+
+    python benchmarks/bench_scenario.py [--sizes 1000,20000,50000] [--json out.json]
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from tracker_catalogue import Catalogue, load_catalogue  # noqa: E402
+from tracker_scenario import DEFAULT_RANGE, ScenarioGrid, price_steps  # noqa: E402
+
+SIZES = (1_000, 20_000, 50_000)
+RATES = {"USD": 1.0, "GBP": 0.79, "EUR": 0.9231, "CAD": 1.37, "AUD": 1.52, "MXN": 17.1, "CHF": 0.88}
+
+
+def synthetic_catalogue(rows):
+    """`rows` coins copied from coins.csv (see bench_render.synthetic_catalogue)."""
+    base = load_catalogue()
+    records = []
+    for i in range(rows):
+        j = i % len(base)
+        records.append({
+            "category": f"c{i // 100}",
+            "name": f"{base.names[j]} #{i}",
+            "metal": base.metals[base.metal_index[j]],
+            "weight_g": base.weight_g[j],
+            "purity": base.purity[j],
+        })
+    return Catalogue(records)
+
+
+def best_of(func, repeat):
+    """Fastest of `repeat` calls in seconds, and the last call's result."""
+    best, value = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+
+def run(sizes=SIZES, repeat=3):
+    prices = price_steps(*DEFAULT_RANGE)
+    results = []
+    for rows in sizes:
+        catalogue = synthetic_catalogue(rows)
+        grid_seconds, grid = best_of(lambda: ScenarioGrid(catalogue, prices, RATES), repeat)
+        out = io.StringIO()
+        start = time.perf_counter()
+        grid.write_csv(out)
+        csv_seconds = time.perf_counter() - start
+        for case, seconds in (("grid", grid_seconds), ("csv", csv_seconds)):
+            results.append({
+                "benchmark": "scenario",
+                "case": case,
+                "rows": rows,
+                "prices": len(prices),
+                "currencies": len(RATES),
+                "ms": round(seconds * 1000, 2),
+                "mb": round(len(out.getvalue()) / 1e6, 1) if case == "csv" else 0.0,
+            })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated catalogue sizes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run([int(s) for s in args.sizes.split(",")], args.repeat)
+    print(f"{'case':<8}{'rows':>10}{'prices':>8}{'ms':>12}{'MB':>8}")
+    for r in results:
+        print(f"{r['case']:<8}{r['rows']:>10,}{r['prices']:>8}{r['ms']:>12.2f}{r['mb']:>8.1f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
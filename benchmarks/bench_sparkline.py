@@ -0,0 +1,71 @@
+"""Benchmark: recent-quote ring buffers and LTTB-downsampled sparkline coordinates.
+
+Random-walk price series of 1k, 4k (a full default buffer) and 100k quotes
+are reduced to a 140 px sparkline, and appending the whole series to a
+ring buffer is timed:
+
+    python benchmarks/bench_sparkline.py [--sizes 1000,4096,100000] [--json out.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np  # noqa: E402
+
+from tracker_ticks import RingBuffer, sparkline_coords  # noqa: E402
+
+SIZES = (1_000, 4_096, 100_000)
+WIDTH, HEIGHT = 140, 28
+
+
+def run(sizes=SIZES, repeat=20):
+    rng = np.random.default_rng(0)
+    results = []
+    for rows in sizes:
+        times = np.cumsum(rng.uniform(55, 65, rows))
+        values = 31.2 + np.cumsum(rng.normal(0, 0.02, rows))
+
+        buffer = RingBuffer(min(rows, 4_096))
+        start = time.perf_counter()
+        for t, v in zip(times.tolist(), values.tolist()):
+            buffer.append(t, v)
+        append_seconds = time.perf_counter() - start
+
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            coords = sparkline_coords(times, values, WIDTH, HEIGHT)
+            best = min(best, time.perf_counter() - start)
+
+        for case, seconds in (("append", append_seconds), ("coords", best)):
+            results.append({
+                "benchmark": "sparkline",
+                "case": case,
+                "rows": rows,
+                "ms": round(seconds * 1000, 3),
+                "points": len(coords) // 2 if case == "coords" else rows,
+            })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated series lengths")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run([int(s) for s in args.sizes.split(",")])
+    print(f"{'case':<10}{'quotes':>10}{'ms':>12}{'points':>8}")
+    for r in results:
+        print(f"{r['case']:<10}{r['rows']:>10,}{r['ms']:>12.3f}{r['points']:>8}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
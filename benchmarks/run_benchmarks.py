@@ -0,0 +1,124 @@
+"""Runs every benchmark and writes one JSON report for tracking hot paths across releases.
+
+    python benchmarks/run_benchmarks.py --json bench.json
+    python benchmarks/run_benchmarks.py --quick --json bench.json --compare baseline.json
+
+The report is {"meta": {...}, "results": [...]}; each result carries a
+"benchmark" name plus that benchmark's own fields (see bench_*.py). With
+--compare, results are matched to a previous report and timings that got
+slower by more than --threshold are listed; --fail-on-regression turns
+that into a non-zero exit.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import bench_alerts  # noqa: E402
+import bench_extract  # noqa: E402
+import bench_format  # noqa: E402
+import bench_refresh  # noqa: E402
+import bench_render  # noqa: E402
+import bench_scenario  # noqa: E402
+import bench_sparkline  # noqa: E402
+
+# Timing field per benchmark (lower is better)
+METRICS = {"alerts": "ms", "extract": "cpu_ms", "format": "total_ms", "refresh": "median_ms", "render": "ms",
+           "scenario": "ms", "sparkline": "ms"}
+
+
+def run_all(quick=False):
+    if quick:
+        return (bench_extract.run(repeat=5)
+                + bench_format.run(count=50_000)
+                + bench_refresh.run(repeat=2, scenarios=["instant", "recorded_latency", "apmex_403"])
+                + bench_render.run(sizes=(100, 10_000))
+                + bench_scenario.run(sizes=(1_000, 10_000), repeat=1)
+                + bench_alerts.run(sizes=(1_000, 10_000))
+                + bench_sparkline.run(repeat=5))
+    return (bench_extract.run()
+            + bench_format.run()
+            + bench_refresh.run()
+            + bench_render.run()
+            + bench_scenario.run()
+            + bench_alerts.run()
+            + bench_sparkline.run())
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def result_key(result):
+    """Identity of a result: every field that is not a measurement."""
+    return tuple(sorted((k, v) for k, v in result.items() if isinstance(v, str) or k in ("rows", "count", "repeat", "prices", "currencies")))
+
+
+def compare(results, baseline, threshold, floor_ms=1.0):
+    """[(result, old, new)] for timings more than `threshold` (a ratio) slower than `baseline`.
+
+    Timings under `floor_ms` in both runs are too noisy to compare and are skipped.
+    """
+    old = {result_key(r): r for r in baseline}
+    slower = []
+    for result in results:
+        metric = METRICS.get(result["benchmark"])
+        before = old.get(result_key(result), {}).get(metric)
+        if metric and before and max(before, result[metric]) >= floor_ms and result[metric] > before * threshold:
+            slower.append((result, before, result[metric]))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="smaller sizes and fewer repeats (for CI)")
+    parser.add_argument("--json", metavar="PATH", help="write the report here")
+    parser.add_argument("--compare", metavar="PATH", help="previous report to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio to report (default 1.25)")
+    parser.add_argument("--floor-ms", type=float, default=1.0, help="ignore timings below this (default 1 ms)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": run_all(args.quick),
+    }
+    for result in report["results"]:
+        metric = METRICS[result["benchmark"]]
+        label = " ".join(str(v) for k, v in result.items() if k != "benchmark" and v != "" and result_key({k: v}))
+        print(f"{result['benchmark']:<10}{label:<55}{result[metric]:>12.2f} {metric}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        slower = compare(report["results"], baseline, args.threshold, args.floor_ms)
+        for result, before, after in slower:
+            print(f"SLOWER {result['benchmark']} {dict(result_key(result))}: {before} -> {after}")
+        if not slower:
+            print(f"No timings more than {args.threshold:g}x slower than {args.compare}")
+        if slower and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,4 @@
-from setuptools import setup, find_packages
+from setuptools import setup
 
 setup(
     name="silver-tracker",
@@ -9,12 +9,18 @@ setup(
     install_requires=[
         "ttkbootstrap>=1.10.0",
         "cloudscraper>=1.2.71",
+        "requests>=2.28.0",
+        "numpy>=1.20",
         "beautifulsoup4>=4.12.0",
     ],
-    py_modules=["silver_tracker"],
+    py_modules=["silver_tracker", "tracker_alerts", "tracker_cache", "tracker_catalogue", "tracker_cli",
+                "tracker_core", "tracker_extract", "tracker_format", "tracker_history", "tracker_inventory",
+                "tracker_metrics", "tracker_quote", "tracker_replay", "tracker_scenario", "tracker_schedule",
+                "tracker_server", "tracker_sources", "tracker_state", "tracker_ticks"],
+    data_files=[("share/silver-tracker", ["coins.csv"])],
     entry_points={
         "console_scripts": [
-            "silver-tracker=silver_tracker:main",
+            "silver-tracker=tracker_cli:main",
         ],
         "gui_scripts": [
             "silver-tracker-gui=silver_tracker:main",
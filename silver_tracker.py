@@ -1,456 +1,760 @@
+import time
+LAUNCH_TIME = time.perf_counter()   # startup milestones are measured from here, before the heavy imports
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from tkinter import messagebox
-import cloudscraper
-from bs4 import BeautifulSoup
+import argparse
 import threading
-import time
-import json
-import urllib.request
-
-# --- CONFIGURATION ---
-METALS_CONFIG = [
-    {"name": "Gold",      "url": "https://www.apmex.com/gold-price",      "search_term": "Gold Price Per Ounce"},
-    {"name": "Silver",    "url": "https://www.apmex.com/silver-price",    "search_term": "Silver Price Per Ounce"},
-    {"name": "Platinum",  "url": "https://www.apmex.com/platinum-price",  "search_term": "Platinum Price Per Ounce"},
-    {"name": "Palladium", "url": "https://www.apmex.com/palladium-price", "search_term": "Palladium Price Per Ounce"},
-]
-
-# Supported display currencies and their approximate fallback rates
-CURRENCY_OPTIONS = ["USD", "GBP", "EUR", "CAD", "AUD", "MXN", "CHF"]
-
-# Global State
-APP_STATE = {
-    "show_in_oz": False,
-    "auto_refresh": False,
-    "last_data": None,
-    "is_fetching": False,
-    "currency": "USD",
-    "exchange_rates": {"USD": 1.0},  # populated at runtime
-    "manual_spot": None,             # float if user has entered a manual spot price
-}
-
-CONST_GRAMS_PER_OZ = 31.1034768
-
-# --- CURRENCY FETCHING ---
-
-def fetch_exchange_rates():
-    """Fetches live exchange rates vs USD from a free open API (no key required)."""
-    try:
-        url = "https://open.er-api.com/v6/latest/USD"
-        with urllib.request.urlopen(url, timeout=8) as resp:
-            data = json.loads(resp.read())
-        if data.get("result") == "success":
-            rates = data["rates"]
-            filtered = {c: rates[c] for c in CURRENCY_OPTIONS if c in rates}
-            filtered["USD"] = 1.0
-            APP_STATE["exchange_rates"] = filtered
-            return True
-    except Exception as e:
-        print(f"Exchange rate fetch failed: {e}")
-    return False
-
-def convert_price(usd_value, currency=None):
-    """Converts a USD float to the target currency string."""
-    if currency is None:
-        currency = APP_STATE["currency"]
-    rate = APP_STATE["exchange_rates"].get(currency, 1.0)
-    converted = usd_value * rate
-    symbols = {"USD": "$", "GBP": "£", "EUR": "€", "CAD": "CA$", "AUD": "AU$", "MXN": "MX$", "CHF": "Fr"}
-    sym = symbols.get(currency, currency + " ")
-    return f"{sym}{converted:,.2f}"
-
-# --- UTILS & SCRAPING ---
-
-def clean_price_text(price_text):
-    """Removes currency symbols and returns a float (always USD)."""
-    try:
-        clean = price_text.replace("$", "").replace("USD", "").replace(",", "").strip()
-        return float(clean)
-    except (ValueError, AttributeError):
-        return 0.0
-
-def fetch_price_primary(metal_info):
-    """Primary source: scrapes APMEX."""
-    scraper = cloudscraper.create_scraper()
-    response = scraper.get(metal_info["url"], timeout=10)
-    if response.status_code == 403:
-        return None
-    soup = BeautifulSoup(response.content, 'html.parser')
-    label = soup.find(string=metal_info["search_term"])
-    if label:
-        price_element = label.find_next("td")
-        if price_element:
-            raw_text = price_element.get_text(strip=True)
-            return raw_text.replace(" USD", "").strip()
-    return None
-
-def fetch_price_fallback(metal_info):
-    """Fallback source: metals-live.net (no scraper needed, JSON endpoint)."""
-    metal_map = {"Gold": "gold", "Silver": "silver", "Platinum": "platinum", "Palladium": "palladium"}
-    key = metal_map.get(metal_info["name"])
-    if not key:
-        return None
-    try:
-        url = f"https://metals-api.com/api/latest?access_key=&base=USD&symbols=XAG,XAU,XPT,XPD"
-        # Free fallback: use frankfurter-style metals endpoint
-        url = f"https://api.metals.dev/v1/latest?api_key=&currency=USD&unit=troy_oz"
-        with urllib.request.urlopen(url, timeout=8) as resp:
-            pass  # gracefully skip if no API key
-    except Exception:
-        pass
-
-    # Second fallback: goldapi.io free scrape
-    try:
-        symbol_map = {"Gold": "XAU", "Silver": "XAG", "Platinum": "XPT", "Palladium": "XPD"}
-        symbol = symbol_map.get(metal_info["name"], "XAG")
-        url = f"https://www.goldapi.io/api/{symbol}/USD"
-        req = urllib.request.Request(url, headers={"x-access-token": "goldapi-demo"})
-        with urllib.request.urlopen(req, timeout=8) as resp:
-            data = json.loads(resp.read())
-            price = data.get("price")
-            if price:
-                return f"${price:,.2f}"
-    except Exception:
-        pass
-
-    # Third fallback: kitco public JSON (no auth required)
-    try:
-        kitco_map = {"Gold": "gold", "Silver": "silver", "Platinum": "platinum", "Palladium": "palladium"}
-        k = kitco_map.get(metal_info["name"])
-        url = f"https://online.kitco.com/KitcoChartServlet?type=currency&commodity={k.upper()}&currency=USD&period=1D"
-        with urllib.request.urlopen(url, timeout=8) as resp:
-            text = resp.read().decode()
-            # Kitco returns CSV-like data; last value is most recent
-            lines = [l for l in text.strip().split("\n") if l]
-            if lines:
-                last = lines[-1].split(",")
-                if len(last) >= 2:
-                    return f"${float(last[-1]):,.2f}"
-    except Exception:
-        pass
-
-    return None
-
-def fetch_price(metal_info):
-    """Tries primary source first, falls back gracefully."""
-    # If user has manually set a spot price (Silver only), use that
-    if metal_info["name"] == "Silver" and APP_STATE.get("manual_spot") is not None:
-        return f"${APP_STATE['manual_spot']:,.2f} (Manual)"
-
-    try:
-        result = fetch_price_primary(metal_info)
-        if result:
-            return result
-    except Exception as e:
-        print(f"Primary fetch failed for {metal_info['name']}: {e}")
-
-    print(f"Trying fallback source for {metal_info['name']}...")
-    try:
-        result = fetch_price_fallback(metal_info)
-        if result:
-            return result + " *"  # asterisk = fallback source
-    except Exception as e:
-        print(f"Fallback fetch failed for {metal_info['name']}: {e}")
-
-    return "Unavailable"
+import numpy as np
+from tracker_alerts import AlertEngine, run_hook
+from tracker_core import (
+    STATE, CATALOGUE, CONST_GRAMS_PER_OZ, CURRENCY_OPTIONS, HISTORY, METALS_CONFIG, PRICE_CACHE,
+    convert_price, get_all_data, get_cached_data, get_server_data,
+    SOURCE_HEALTH, spot_prices_usd,
+)
+from tracker_format import get_formatter
+from tracker_inventory import load_inventory
+from tracker_metrics import METRICS
+from tracker_scenario import DEFAULT_RANGE, ScenarioGrid, price_steps, suggest_range
+from tracker_schedule import DEFAULT_INTERVAL, RefreshScheduler, refresh_outcome
+from tracker_ticks import RecentQuotes, sparkline_coords
+
+# Catalogue display: below LAZY_EXPAND_LIMIT rows every category starts expanded;
+# above VIRTUAL_SCROLL_THRESHOLD the table switches to a flat virtual-scroll view.
+LAZY_EXPAND_LIMIT = 500
+VIRTUAL_SCROLL_THRESHOLD = 20000
+
+# Base URL of a tracker_server to read quotes from instead of scraping (set by --server)
+SERVER_URL = None
+
+# Holdings valued on every refresh (loaded from --inventory)
+INVENTORY = None
+
+# Price alert rules checked on every refresh (loaded from --alerts) and their banner label
+ALERTS = None
+alert_lbl = None
+
+# Auto-refresh timing (interval set by --interval) and the pending root.after() id
+SCHEDULER = RefreshScheduler()
+REFRESH_AFTER_ID = None
+
+# Diagnostics tab with per-request timings and counters (set by --diagnostics)
+DIAGNOSTICS = False
+LAST_RENDER_TIMES = None   # (prepare, apply) seconds of the last table render
+
+# Recent quotes per metal (bounded ring buffers, seeded from the last SPARKLINE_SPAN seconds of
+# history) and the sparkline drawn from each: metal -> (canvas, line item, label)
+RECENT = RecentQuotes([m["name"] for m in METALS_CONFIG])
+SPARKLINE_SPAN = 86400
+SPARKLINE_SIZE = (140, 28)
+SPARKLINES = {}
+
+# Startup milestones in seconds since LAUNCH_TIME: "first_paint" and "first_data"
+STARTUP = {}
+
+# Spot-price scenarios: the latest grid (kept for the CSV export), how many of its
+# prices are shown as table columns and how many coins are listed
+SCENARIO_GRID = None
+SCENARIO_COLUMNS = 9
+SCENARIO_DISPLAY_LIMIT = 2000
+
+# Widgets on the Calculator, Scenarios and Diagnostics tabs, which are built after the first paint
+calc_spot_lbl = inventory_lbl = diag_tree = diag_summary_lbl = scenario_tree = None
 
-def calculate_coin_value(weight_grams, purity, spot_price_usd):
-    """Returns the USD value float for a silver item."""
-    return ((weight_grams * purity) / CONST_GRAMS_PER_OZ) * spot_price_usd
+# --- TRACKER LOGIC ---
 
-def get_all_data():
-    """Scrapes/fetches all data and calculates values."""
-    spot_results = []
-    silver_price_str = "0"
+class TableModel:
+    """One render's worth of table rows, formatted on demand.
+
+    Coin values for the whole catalogue are converted to the display currency
+    in one vectorized pass up front; string formatting only happens for the
+    rows that are actually put in the tree. Rows are (item_id, values, tags)
+    with stable ids (spot:<metal>, hdr:<category>, err:<category>,
+    coin:<catalogue row>) so successive renders can be diffed. Formatted rows
+    are memoized, so a model can be filled in on a worker thread (see
+    prepare_table) and read back on the Tk thread without redoing the work.
+    Given the `previous` model in the same currency and unit, a category's
+    rows are reused and only coins whose converted value changed are
+    formatted again.
+    """
+
+    def __init__(self, snapshot, show_oz, currency, previous=None):
+        self.data = snapshot.data
+        self.currency = currency
+        self.show_oz = show_oz
+        self.fmt = get_formatter(currency, snapshot.exchange_rates.get(currency, 1.0))
+        self.values = self.data["coin_usd"] * self.fmt.rate
+        self.weights = CATALOGUE.weight_g / CONST_GRAMS_PER_OZ if show_oz else CATALOGUE.weight_g
+        self.w_fmt = "{:.3f} oz" if show_oz else "{:g} g"
+        self.nan = np.isnan(self.values)
+        starts = [CATALOGUE.slices[key].start for key, _ in CATALOGUE.categories]
+        self.missing = (np.add.reduceat(self.nan, starts) > 0).tolist() if starts else []
+        self._spot = None
+        self._categories = {}   # k -> formatted category_rows(k)
+        self._rows = {}         # n -> formatted row(n) of the flat layout
+        self._kinds = None
+        self._refs = None
+        # The previous model's numbers and formatted categories (not the model, so models do not chain)
+        self._previous = None
+        if (previous is not None and (previous.currency, previous.show_oz) == (currency, show_oz)
+                and previous.values.shape == self.values.shape and starts):
+            # NaN != NaN, so a coin unpriced in both counts as unchanged
+            moved = (previous.values != self.values) & ~(previous.nan & self.nan)
+            self._moved = (np.add.reduceat(moved, starts) > 0).tolist()
+            self._previous = (previous.values, previous.nan, previous.missing, previous._categories)
+
+    def spot_rows(self):
+        if self._spot is None:
+            self._spot = [self._spot_row(row) for row in self.data['spot']]
+        return self._spot
+
+    def _spot_row(self, row):
+        if row["weight_g"] == 0:
+            w_str = "-"
+        elif self.show_oz:
+            w_val = row["weight_g"] / CONST_GRAMS_PER_OZ
+            w_str = f"{w_val:.3f} oz"
+        else:
+            w_str = f"{row['weight_g']} g"
 
-    for metal in METALS_CONFIG:
-        price = fetch_price(metal)
-        spot_results.append({
-            "name": metal["name"],
-            "weight_g": 31.1034768,
-            "price_str": price,
-            "price_usd": clean_price_text(price),
-            "is_spot": True
-        })
-        if metal["name"] == "Silver":
-            silver_price_str = price
-
-    silver_spot = clean_price_text(silver_price_str)
-
-    categories = {
-        "us": [], "cad": [], "uk": [], "aus": [], "mex": [],
-        "prt": [], "esp": [], "fra": [], "ita": [], "deu": [], "che": []
-    }
-
-    if silver_spot > 0:
-        def add_coin(cat_key, name, weight_g, purity):
-            val_usd = calculate_coin_value(weight_g, purity, silver_spot)
-            categories[cat_key].append({
-                "name": name,
-                "weight_g": weight_g,
-                "price_str": convert_price(val_usd),
-                "price_usd": val_usd,
-                "is_spot": False
-            })
-
-        # --- US JUNK ---
-        add_coin("us", "5c Wartime Nickel (1942-1945 35%)", 5, 0.350)
-        add_coin("us", "10c Dime (1892-1964)", 2.5, 0.9)
-        add_coin("us", "25c Quarter (1892-1964)", 6.25, 0.9)
-        add_coin("us", "50c Half Dollar (1892-1964)", 12.5, 0.9)
-        add_coin("us", "50c Half Dollar (1965-1970 40%)", 11.5, 0.4)
-        add_coin("us", "Morgan/Peace Dollar (1878-1935)", 26.73, 0.9)
-        add_coin("us", "Eisenhower Dollar (1971-1977 40%)", 24.59, 0.4)
-
-        # --- CAD JUNK ---
-        add_coin("cad", "10c Dime (1858-1919)", 2.324, 0.925)
-        add_coin("cad", "10c Dime (1920-1967)", 2.33, 0.8)
-        add_coin("cad", "10c Dime (1968 50%)", 2.33, 0.5)
-        add_coin("cad", "25c Quarter (1870-1919)", 5.83, 0.925)
-        add_coin("cad", "25c Quarter (1920-1967)", 5.83, 0.8)
-        add_coin("cad", "25c Quarter (1968 50%)", 5.83, 0.5)
-        add_coin("cad", "50c Half Dollar (1870-1919)", 11.62, 0.925)
-        add_coin("cad", "50c Half Dollar (1920-1967)", 11.66, 0.8)
-        add_coin("cad", "$1 Dollar (1935-1967)", 23.33, 0.8)
-
-        # --- UK JUNK ---
-        add_coin("uk", "3 Pence (1887-1919)", 1.41, 0.925)
-        add_coin("uk", "3 Pence (1920-1936)", 1.41, 0.500)
-        add_coin("uk", "6 Pence (1887-1919)", 2.83, 0.925)
-        add_coin("uk", "6 Pence (1920-1946)", 2.83, 0.500)
-        add_coin("uk", "1 Shilling (1887-1919)", 5.66, 0.925)
-        add_coin("uk", "1 Shilling (1920-1946)", 5.66, 0.500)
-        add_coin("uk", "2 Shilling/Florin (1887-1919)", 11.31, 0.925)
-        add_coin("uk", "2 Shilling/Florin (1920-1946)", 11.3, 0.500)
-        add_coin("uk", "1/2 Crown (1887-1919)", 14.14, 0.925)
-        add_coin("uk", "1/2 Crown (1920-1946)", 14.14, 0.500)
-
-        # --- AUSTRALIAN JUNK ---
-        add_coin("aus", "3 Pence (1910-1944)", 1.41, 0.925)
-        add_coin("aus", "3 Pence (1947-1964)", 1.41, 0.500)
-        add_coin("aus", "6 Pence (1910-1945)", 2.83, 0.925)
-        add_coin("aus", "6 Pence (1946-1963)", 2.83, 0.500)
-        add_coin("aus", "1 Shilling (1910-1945)", 5.66, 0.925)
-        add_coin("aus", "1 Shilling (1946-1963)", 5.66, 0.500)
-        add_coin("aus", "2 Shilling/Florin (1910-1945)", 11.31, 0.925)
-        add_coin("aus", "2 Shilling/Florin (1946-1963)", 11.31, 0.500)
-        add_coin("aus", "50 Cents (1966)", 13.28, 0.800)
-
-        # --- MEXICO JUNK ---
-        add_coin("mex", "20 Centavos (1920-1943)", 3.33, 0.720)
-        add_coin("mex", "25 Centavos (1950-1953)", 3.33, 0.300)
-        add_coin("mex", "50 Centavos (1919-1945)", 8.33, 0.720)
-        add_coin("mex", "50 Centavos (1950-1951)", 6.66, 0.300)
-        add_coin("mex", "1 Peso (1920-1945)", 16.6, 0.720)
-        add_coin("mex", "1 Peso (1947-1949)", 14.0, 0.500)
-        add_coin("mex", "1 Peso (1950)", 13.33, 0.300)
-        add_coin("mex", "1 Peso (1957-1967)", 16.0, 0.100)
-        add_coin("mex", "5 Peso (1951-1954)", 27.78, 0.720)
-        add_coin("mex", "5 Peso (1955-1957)", 18.055, 0.720)
-        add_coin("mex", "10 Peso (1955-1960)", 28.888, 0.900)
-        add_coin("mex", "100 Peso (1977-1979)", 27.78, 0.720)
-
-        # --- PORTUGAL JUNK ---
-        add_coin("prt", "2.50 Escudos (1932-1951)", 3.5, 0.650)
-        add_coin("prt", "5 Escudos (1932-1951)", 7.0, 0.650)
-        add_coin("prt", "10 Escudos (1932-1948)", 12.5, 0.835)
-        add_coin("prt", "10 Escudos (1954-1955)", 12.5, 0.680)
-
-        # --- SPANISH JUNK ---
-        add_coin("esp", "100 Pesetas (1966-1970)", 19.0, 0.800)
-
-        # --- FRENCH JUNK ---
-        add_coin("fra", "1/2 Franc (1897-1920)", 2.5, 0.835)
-        add_coin("fra", "1 Franc (1898-1920)", 5.0, 0.835)
-        add_coin("fra", "2 Franc (1898-1920)", 10.0, 0.835)
-        add_coin("fra", "10 Franc (1929-1939)", 10.0, 0.680)
-        add_coin("fra", "20 Franc (1929-1939)", 20.0, 0.680)
-        add_coin("fra", "5 Franc (1960-1969)", 12.0, 0.835)
-        add_coin("fra", "10 Franc (1965-1973)", 25.0, 0.900)
-        add_coin("fra", "50 Franc (1974-1980)", 30.0, 0.900)
-        add_coin("fra", "100 Franc (1982-2001)", 15.0, 0.900)
-
-        # --- ITALIAN JUNK ---
-        add_coin("ita", "5 Lire (1926-1941)", 5.0, 0.835)
-        add_coin("ita", "10 Lire (1926-1941)", 10.0, 0.835)
-        add_coin("ita", "20 Lire (1927-1934)", 15.0, 0.800)
-        add_coin("ita", "20 Lire (1936-1941)", 20.0, 0.800)
-        add_coin("ita", "500 Lire (1958-1967)", 11.0, 0.835)
-
-        # --- GERMAN JUNK ---
-        add_coin("deu", "1/2 Mark (1896-1919)", 2.777, 0.900)
-        add_coin("deu", "1 Mark (1891-1916)", 5.556, 0.900)
-        add_coin("deu", "1 Reichsmark (1924-1927)", 5.0, 0.500)
-        add_coin("deu", "2 Reichsmark (1925-1931)", 10.0, 0.500)
-        add_coin("deu", "2 Reichsmark (1933-1939)", 8.0, 0.625)
-        add_coin("deu", "3 Reichsmark (1924-1933)", 15.0, 0.500)
-        add_coin("deu", "5 Reichsmark (1935-1939)", 13.889, 0.900)
-        add_coin("deu", "5 Deutschmark (1951-1974)", 11.2, 0.625)
-
-        # --- SWITZERLAND JUNK ---
-        add_coin("che", "1/2 Franc (1875-1967)", 2.5, 0.835)
-        add_coin("che", "1 Franc (1875-1967)", 5.0, 0.835)
-        add_coin("che", "2 Franc (1875-1967)", 10.0, 0.835)
-        add_coin("che", "5 Franc (1931-1967)", 15.0, 0.835)
+        quote = row["quote"]
+        if quote.available:
+            # Marker: " *" = fallback source, " (Manual)" = manual override
+            p_str = self.fmt.convert(quote.value) + quote.marker
+            tags = ("spot_row", "fallback") if quote.is_fallback else ("spot_row",)
+        else:
+            p_str, tags = "Unavailable", ("error",)
+
+        return (f"spot:{row['name']}", (row['name'], w_str, p_str), tags)
+
+    def header_row(self, k):
+        key, title = CATALOGUE.categories[k]
+        return (f"hdr:{key}", (f"--- {title} ---", "", ""), ('category',))
+
+    def error_row(self, k):
+        key = CATALOGUE.categories[k][0]
+        return (f"err:{key}", ("Calculation Failed - check spot price", "-", "Error"), ("error",))
+
+    def coin_row(self, i):
+        return (f"coin:{i}", (CATALOGUE.names[i], self.w_fmt.format(self.weights[i]),
+                              self.fmt(float(self.values[i]))), ())
+
+    def category_rows(self, k):
+        """Rows under category `k`: the error row if any coin is unpriced, then priced coins."""
+        table = self._categories.get(k)
+        if table is None:
+            table = self._categories[k] = self._category_rows(k)
+        return table
+
+    def _category_rows(self, k):
+        rows = CATALOGUE.slices[CATALOGUE.categories[k][0]]
+        if self._previous is not None:
+            table = self._changed_rows(k, rows)
+            if table is not None:
+                return table
+        table = [self.error_row(k)] if self.missing[k] else []
+        w_fmt = self.w_fmt
+        prices = self.fmt.format_column(self.values[rows])
+        for i, name, weight, price, unpriced in zip(range(rows.start, rows.stop), CATALOGUE.names[rows],
+                                                    self.weights[rows].tolist(), prices, self.nan[rows].tolist()):
+            if not unpriced:
+                table.append((f"coin:{i}", (name, w_fmt.format(weight), price), ()))
+        return table
+
+    def _changed_rows(self, k, rows):
+        """The previous model's rows for category `k` with only the changed prices reformatted.
+
+        None if the previous model never formatted the category or a different
+        set of coins is priced now.
+        """
+        values, nan, missing, categories = self._previous
+        old = categories.get(k)
+        if old is None or not self._moved[k]:
+            return old
+        if missing[k] != self.missing[k] or not np.array_equal(nan[rows], self.nan[rows]):
+            return None
+        priced = np.flatnonzero(~self.nan[rows])
+        new_values = self.values[rows][priced]
+        changed = np.flatnonzero(values[rows][priced] != new_values)
+        table = list(old)
+        head = 1 if self.missing[k] else 0
+        for j, price in zip(changed.tolist(), self.fmt.format_column(new_values[changed])):
+            iid, (name, weight, _), tags = table[head + j]
+            table[head + j] = (iid, (name, weight, price), tags)
+        return table
+
+    # Flat layout (spot rows, then each header, error row and coins) for the virtual view
+
+    def _layout(self):
+        if self._kinds is None:
+            kinds = [np.zeros(len(self.data['spot']), dtype=np.int8)]
+            refs = [np.arange(len(self.data['spot']))]
+            for k, (key, _) in enumerate(CATALOGUE.categories):
+                rows = CATALOGUE.slices[key]
+                coins = np.flatnonzero(~self.nan[rows]) + rows.start
+                head = [1, 2] if self.missing[k] else [1]
+                kinds.append(np.array(head, dtype=np.int8))
+                kinds.append(np.full(len(coins), 3, dtype=np.int8))
+                refs.append(np.full(len(head), k))
+                refs.append(coins)
+            self._kinds = np.concatenate(kinds)
+            self._refs = np.concatenate(refs)
+        return self._kinds, self._refs
+
+    def __len__(self):
+        return len(self._layout()[0])
+
+    def row(self, n):
+        """The n-th row of the flat layout."""
+        row = self._rows.get(n)
+        if row is None:
+            row = self._rows[n] = self._row(n)
+        return row
+
+    def _row(self, n):
+        kinds, refs = self._layout()
+        kind, ref = int(kinds[n]), int(refs[n])
+        if kind == 0:
+            return self.spot_rows()[ref]
+        if kind == 1:
+            return self.header_row(ref)
+        if kind == 2:
+            return self.error_row(ref)
+        return self.coin_row(ref)
+
+# What the tree currently shows (tree mode)
+TABLE_ROWS = {}       # item id -> (values, tags)
+TABLE_CHILDREN = {}   # parent id -> [child ids], in display order
+EXPANDED = set()      # category header ids whose children have been created
+TABLE_MODEL = None    # latest TableModel, used to fill a category on its first expand
+TABLE_SYNCED = {}     # parent id -> the rows list last synced (models hand back unchanged lists as is)
+
+def forget_items(iids):
+    for iid in iids:
+        TABLE_ROWS.pop(iid, None)
+        TABLE_SYNCED.pop(iid, None)
+        forget_items(TABLE_CHILDREN.pop(iid, ()))
+
+def sync_children(parent, rows):
+    """Brings `parent`'s children in line with `rows`, touching only items that changed.
+
+    When the ids and order are unchanged (the usual case: a new price,
+    currency or unit) only rows whose text or tags changed get a tree.item()
+    call; otherwise that parent's children are rebuilt once. Returns True on
+    a rebuild.
+    """
+    if TABLE_SYNCED.get(parent) is rows:
+        return False
+    TABLE_SYNCED[parent] = rows
+    ids = [iid for iid, _, _ in rows]
+    if TABLE_CHILDREN.get(parent) != ids:
+        old = TABLE_CHILDREN.pop(parent, [])
+        if old:
+            tree.delete(*old)
+            forget_items(old)
+        for iid, values, tags in rows:
+            tree.insert(parent, "end", iid=iid, values=values, tags=tags, open=iid in EXPANDED)
+            TABLE_ROWS[iid] = (values, tags)
+        TABLE_CHILDREN[parent] = ids
+        return True
+
+    for iid, values, tags in rows:
+        if TABLE_ROWS[iid] != (values, tags):
+            tree.item(iid, values=values, tags=tags)
+            TABLE_ROWS[iid] = (values, tags)
+    return False
 
+def apply_table_model(model):
+    """Tree mode: updates spot rows, category headers and the expanded categories.
+
+    Collapsed categories that were never opened only get a placeholder child
+    (so they show an expand arrow); their rows are neither formatted nor created.
+    """
+    global TABLE_MODEL
+    TABLE_MODEL = model
+    headers = [model.header_row(k) for k in range(len(CATALOGUE.categories))]
+    if sync_children("", model.spot_rows() + headers):
+        for hdr, _, _ in headers:
+            if hdr not in EXPANDED:
+                placeholder = tree.insert(hdr, "end", iid=f"ph:{hdr}", values=("Loading...", "", ""))
+                TABLE_CHILDREN[hdr] = [placeholder]
+    for k, (hdr, _, _) in enumerate(headers):
+        if hdr in EXPANDED:
+            sync_children(hdr, model.category_rows(k))
+
+def on_tree_open(event=None):
+    """Creates a category's rows the first time it is expanded."""
+    hdr = tree.focus()
+    if not hdr.startswith("hdr:") or hdr in EXPANDED or TABLE_MODEL is None:
+        return
+    EXPANDED.add(hdr)
+    k = [f"hdr:{key}" for key, _ in CATALOGUE.categories].index(hdr)
+    sync_children(hdr, TABLE_MODEL.category_rows(k))
+
+class VirtualTable:
+    """Virtual-scroll view: shows a window of a TableModel in a fixed set of rows.
+
+    Only as many Treeview items exist as fit on screen; scrolling re-points
+    them at other model rows, so memory and redraw cost do not grow with the
+    catalogue.
+    """
+
+    def __init__(self, tree, scrollbar):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.model = None
+        self.offset = 0
+        self.slots = []     # item ids of the on-screen rows
+        self.shown = {}     # slot id -> (values, tags)
+        self.count = 0      # rows drawn last time (read by prepare_table off the Tk thread)
+        scrollbar.config(command=self.on_scrollbar)
+        tree.config(yscrollcommand="")
+        tree.bind("<Configure>", lambda e: self.draw())
+        tree.bind("<MouseWheel>", lambda e: self.scroll_by(-3 if e.delta > 0 else 3))
+        tree.bind("<Button-4>", lambda e: self.scroll_by(-3))
+        tree.bind("<Button-5>", lambda e: self.scroll_by(3))
+
+    def visible_count(self):
+        rowheight = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        return max(1, self.tree.winfo_height() // rowheight - 1)
+
+    def set_model(self, model):
+        self.model = model
+        self.draw()
+
+    def scroll_by(self, rows):
+        self.offset += rows
+        self.draw()
+        return "break"
+
+    def on_scrollbar(self, action, amount, unit=None):
+        total = len(self.model) if self.model else 0
+        if action == "moveto":
+            self.offset = int(float(amount) * total)
+        elif action == "scroll":
+            step = self.visible_count() if unit == "pages" else 1
+            self.offset += int(amount) * step
+        self.draw()
+
+    def draw(self):
+        if self.model is None:
+            return
+        total = len(self.model)
+        count = min(self.visible_count(), total)
+        self.offset = max(0, min(self.offset, total - count))
+        self.count = count
+
+        while len(self.slots) < count:
+            slot = self.tree.insert("", "end", iid=f"v{len(self.slots)}")
+            self.slots.append(slot)
+            self.shown[slot] = None
+        while len(self.slots) > count:
+            slot = self.slots.pop()
+            self.tree.delete(slot)
+            del self.shown[slot]
+
+        for n, slot in enumerate(self.slots):
+            _, values, tags = self.model.row(self.offset + n)
+            if self.shown[slot] != (values, tags):
+                self.tree.item(slot, values=values, tags=tags)
+                self.shown[slot] = (values, tags)
+
+        if total:
+            self.scrollbar.set(self.offset / total, (self.offset + count) / total)
+
+VIRTUAL_TABLE = None   # VirtualTable when the catalogue is too big for the tree view
+
+def prepare_table(snapshot, show_oz, currency):
+    """Builds a TableModel and formats every row the next apply_table() will show.
+
+    Makes no Tk calls, so it can run on the render worker: in tree mode that
+    is the spot rows, headers and every expanded category, in virtual mode
+    the flat layout and the rows currently on screen.
+    """
+    previous = VIRTUAL_TABLE.model if VIRTUAL_TABLE is not None else TABLE_MODEL
+    model = TableModel(snapshot, show_oz, currency, previous)
+    model.spot_rows()
+    if VIRTUAL_TABLE is not None:
+        total = len(model)
+        count = min(VIRTUAL_TABLE.count, total)
+        start = max(0, min(VIRTUAL_TABLE.offset, total - count))
+        for n in range(start, start + count):
+            model.row(n)
+    else:
+        for k, (key, _) in enumerate(CATALOGUE.categories):
+            if f"hdr:{key}" in EXPANDED:
+                model.category_rows(k)
+    return model
+
+def apply_table(model):
+    """Tk thread: puts a prepared model on screen, touching only rows that changed."""
+    if VIRTUAL_TABLE is not None:
+        VIRTUAL_TABLE.set_model(model)
     else:
-        err = {"name": "Calculation Failed - check spot price", "weight_g": 0, "price_str": "Error", "price_usd": 0, "is_spot": False}
-        for k in categories:
-            categories[k].append(err)
+        apply_table_model(model)
 
-    return {"spot": spot_results, **categories}
+    weight_header = "Weight (Troy Oz) ▼" if model.show_oz else "Weight (Grams) ▼"
+    tree.heading("weight", text=weight_header)
 
-# --- TRACKER LOGIC ---
+    update_calculator_spot_display()
+    update_inventory_display()
 
-def render_table():
-    """Refreshes the Treeview from APP_STATE['last_data']."""
-    data = APP_STATE['last_data']
-    if not data:
-        return
+def record_render(prepare_seconds, apply_seconds):
+    global LAST_RENDER_TIMES
+    LAST_RENDER_TIMES = (prepare_seconds, apply_seconds)
+    mode = "virtual" if VIRTUAL_TABLE is not None else "tree"
+    METRICS.observe("render_seconds", prepare_seconds, mode=mode, stage="prepare")
+    METRICS.observe("render_seconds", apply_seconds, mode=mode, stage="apply")
 
-    for item in tree.get_children():
-        tree.delete(item)
+def render_table():
+    """Refreshes the Treeview from the current STATE snapshot, synchronously.
 
-    show_oz = APP_STATE['show_in_oz']
-    currency = APP_STATE['currency']
+    Used where the table must be on screen before returning (the first
+    paint, benchmarks); UI events go through RENDERER instead.
+    """
+    snapshot = STATE.snapshot
+    if not snapshot.data:
+        return
 
-    def insert_rows(rows):
-        for row in rows:
-            if row["weight_g"] == 0:
-                w_str = "-"
-            elif show_oz:
-                w_val = row["weight_g"] / CONST_GRAMS_PER_OZ
-                w_str = f"{w_val:.3f} oz"
-            else:
-                w_str = f"{row['weight_g']} g"
-
-            # Re-convert price if currency has changed
-            p_usd = row.get("price_usd", 0)
-            if row.get("is_spot") and p_usd:
-                p_str = convert_price(p_usd, currency)
-                # Show fallback indicator if original had asterisk
-                if "*" in row.get("price_str", ""):
-                    p_str += " *"
-            elif not row.get("is_spot") and p_usd:
-                p_str = convert_price(p_usd, currency)
-            else:
-                p_str = row['price_str']
-
-            tags = []
-            orig = row.get('price_str', '')
-            if "Error" in orig or "Blocked" in orig or "Unavailable" in orig:
-                tags.append("error")
-            elif row.get("is_spot"):
-                tags.append("spot_row")
-            if "*" in orig:
-                tags.append("fallback")
-
-            tree.insert("", "end", values=(row['name'], w_str, p_str), tags=tuple(tags))
-
-    def insert_header(title):
-        tree.insert("", "end", values=(f"--- {title} ---", "", ""), tags=('category',))
-
-    insert_rows(data['spot'])
-    insert_header("US JUNK SILVER")
-    insert_rows(data['us'])
-    insert_header("CANADIAN JUNK SILVER")
-    insert_rows(data['cad'])
-    insert_header("UK JUNK SILVER")
-    insert_rows(data['uk'])
-    insert_header("AUSTRALIAN JUNK SILVER")
-    insert_rows(data['aus'])
-    insert_header("MEXICAN JUNK SILVER")
-    insert_rows(data['mex'])
-    insert_header("PORTUGUESE JUNK SILVER")
-    insert_rows(data['prt'])
-    insert_header("SPANISH JUNK SILVER")
-    insert_rows(data['esp'])
-    insert_header("FRENCH JUNK SILVER")
-    insert_rows(data['fra'])
-    insert_header("ITALIAN JUNK SILVER")
-    insert_rows(data['ita'])
-    insert_header("GERMAN JUNK SILVER")
-    insert_rows(data['deu'])
-    insert_header("SWISS JUNK SILVER")
-    insert_rows(data['che'])
-
-    weight_header = "Weight (Troy Oz) ▼" if show_oz else "Weight (Grams) ▼"
-    tree.heading("weight", text=weight_header)
+    start = time.perf_counter()
+    model = prepare_table(snapshot, STATE.show_in_oz, STATE.currency)
+    prepared = time.perf_counter()
+    apply_table(model)
+    record_render(prepared - start, time.perf_counter() - prepared)
+
+class RenderPipeline:
+    """Formats table rows (and the scenario tab's) on a worker thread; the Tk thread only applies the newest batch.
+
+    request() only bumps a generation number, so a burst of requests
+    (currency clicks, unit toggles, refresh ticks) collapses into a single
+    prepare_table() of the state as it is once the burst has been quiet for
+    `debounce` seconds. A prepared batch that a newer request has overtaken
+    is dropped instead of applied, unless nothing has been applied for
+    `max_defer` seconds (so a steady stream of requests cannot starve the
+    table).
+    """
+
+    def __init__(self, debounce=0.03, max_defer=0.5):
+        self.debounce = debounce
+        self.max_defer = max_defer
+        self._cond = threading.Condition()
+        self._requested = 0
+        self._last_apply = 0.0
+        self._thread = None
+
+    def request(self):
+        METRICS.inc("render_requests_total")
+        with self._cond:
+            self._requested += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="render", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        done = 0
+        while True:
+            with self._cond:
+                while self._requested == done:
+                    self._cond.wait()
+            # Debounce: wait until no new request arrived for a whole period
+            while True:
+                with self._cond:
+                    generation = self._requested
+                time.sleep(self.debounce)
+                with self._cond:
+                    if self._requested == generation:
+                        break
+            done = generation
+
+            snapshot = STATE.snapshot
+            grid = SCENARIO_GRID
+            if not snapshot.data and grid is None:
+                continue
+            start = time.perf_counter()
+            try:
+                model = prepare_table(snapshot, STATE.show_in_oz, STATE.currency) if snapshot.data else None
+                scenarios = prepare_scenarios(grid, STATE.currency, snapshot.data) if grid is not None else None
+            except Exception as e:
+                print(f"Table render failed: {e}")
+                continue
+            prepare_seconds = time.perf_counter() - start
+            root.after(0, self._apply, generation, model, scenarios, prepare_seconds)
+
+    def _apply(self, generation, model, scenarios, prepare_seconds):
+        with self._cond:
+            overtaken = generation != self._requested
+        if overtaken and time.monotonic() - self._last_apply < self.max_defer:
+            METRICS.inc("renders_dropped_total")
+            return
+        start = time.perf_counter()
+        if scenarios is not None:
+            apply_scenarios(scenarios)
+        if model is None:
+            return
+        apply_table(model)
+        self._last_apply = time.monotonic()
+        METRICS.inc("renders_applied_total")
+        record_render(prepare_seconds, time.perf_counter() - start)
+        if DIAGNOSTICS:
+            update_diagnostics()
 
-    update_calculator_spot_display()
+RENDERER = RenderPipeline()
 
 def toggle_units():
-    if not APP_STATE['last_data']:
+    if not STATE.last_data:
         return
-    APP_STATE['show_in_oz'] = not APP_STATE['show_in_oz']
-    render_table()
+    STATE.show_in_oz = not STATE.show_in_oz
+    RENDERER.request()
 
 def on_currency_change(event=None):
-    APP_STATE['currency'] = currency_var.get()
-    if APP_STATE['last_data']:
-        render_table()
-        update_calculator_spot_display()
+    STATE.currency = currency_var.get()
+    RENDERER.request()
 
 def start_refresh_thread():
-    if APP_STATE["is_fetching"]:
+    # A manual refresh replaces the pending auto-refresh; this one reschedules when it finishes
+    cancel_scheduled_refresh()
+    if not STATE.begin_fetch():
         return
 
-    APP_STATE["is_fetching"] = True
+    SCHEDULER.start()
     refresh_btn.config(text="Refreshing...", state="disabled")
     status_lbl.config(text="Status: Fetching latest prices...", bootstyle="warning")
 
     def task():
-        # Fetch exchange rates in parallel with metal prices
-        fetch_exchange_rates()
-        new_data = get_all_data()
+        error = None
+        new_data = None
+        started = time.time()
+        try:
+            if SERVER_URL:
+                new_data = get_server_data(SERVER_URL)
+            else:
+                # Exchange rates are fetched in parallel with metal prices
+                new_data = get_all_data()
+        except Exception as e:
+            error = e
+        if new_data is not None:
+            record_recent_quotes(new_data, started)
+        if ALERTS is not None and new_data is not None:
+            try:
+                ALERTS.check(new_data, STATE.exchange_rates)
+            except Exception as e:
+                print(f"Alert check failed: {e}")
 
         def update_ui():
-            APP_STATE['last_data'] = new_data
-            render_table()
-            APP_STATE["is_fetching"] = False
+            STATE.end_fetch()
             refresh_btn.config(text="↻ Refresh Now", state="normal")
             t = time.strftime("%H:%M:%S")
-            status_lbl.config(text=f"Status: Updated at {t}", bootstyle="success")
-            if APP_STATE["auto_refresh"]:
-                root.after(60000, start_refresh_thread)
+            if error is not None:
+                if SERVER_URL:
+                    status_lbl.config(text=f"Status: Quote server unavailable at {t}", bootstyle="danger")
+                    print(f"Quote server fetch failed: {error}")
+                else:
+                    status_lbl.config(text=f"Status: Refresh failed at {t}", bootstyle="danger")
+                    print(f"Refresh failed: {error}")
+            else:
+                RENDERER.request()
+                update_sparklines()
+                if refresh_outcome(new_data)[0]:
+                    mark_startup("first_data")
+                if SERVER_URL:
+                    source = " (via quote server)"
+                else:
+                    source = f" in {METRICS.refreshes[-1]['seconds']:.1f}s" if METRICS.refreshes else ""
+                status_lbl.config(text=f"Status: Updated at {t}{source}", bootstyle="success")
+            if not SERVER_URL:
+                sources_lbl.config(text=f"Sources: {SOURCE_HEALTH.summary()}")
+            if DIAGNOSTICS:
+                update_diagnostics()
+
+            ok, fingerprint = refresh_outcome(new_data)
+            delay = SCHEDULER.finish(ok, fingerprint)
+            if STATE.auto_refresh:
+                schedule_refresh(delay)
+                text = status_lbl.cget("text")
+                status_lbl.config(text=f"{text} · next in {delay:.0f}s")
 
         root.after(0, update_ui)
 
     threading.Thread(target=task, daemon=True).start()
 
+def schedule_refresh(delay):
+    """Arms the next auto-refresh `delay` seconds from now, replacing any pending one."""
+    global REFRESH_AFTER_ID
+    cancel_scheduled_refresh()
+    REFRESH_AFTER_ID = root.after(int(delay * 1000), start_refresh_thread)
+
+def cancel_scheduled_refresh():
+    global REFRESH_AFTER_ID
+    if REFRESH_AFTER_ID is not None:
+        root.after_cancel(REFRESH_AFTER_ID)
+        REFRESH_AFTER_ID = None
+
+def show_cached_data():
+    """Renders the last cached prices straight away, before any network access."""
+    cached = get_cached_data()
+    if not cached:
+        return
+    if ALERTS is not None:
+        ALERTS.check(cached, STATE.exchange_rates)   # baseline, so the first refresh can report a crossing
+    render_table()
+    ages = [a for a in (PRICE_CACHE.age(f"spot:{m['name']}") for m in METALS_CONFIG) if a is not None]
+    t = time.strftime("%H:%M:%S", time.localtime(time.time() - max(ages)))
+    status_lbl.config(text=f"Status: Showing cached prices from {t}", bootstyle="secondary")
+
 def toggle_auto_refresh():
     is_on = auto_refresh_var.get()
-    APP_STATE["auto_refresh"] = is_on
+    STATE.auto_refresh = is_on
     if is_on:
         status_lbl.config(text="Status: Auto-Refresh Started...", bootstyle="info")
-        if not APP_STATE["is_fetching"]:
+        if not STATE.is_fetching:
             start_refresh_thread()
     else:
+        cancel_scheduled_refresh()
         status_lbl.config(text="Status: Auto-Refresh Stopped", bootstyle="secondary")
 
+def mark_startup(stage):
+    """Records a startup milestone the first time it is reached; reports both once live data is in."""
+    if stage in STARTUP:
+        return
+    STARTUP[stage] = time.perf_counter() - LAUNCH_TIME
+    METRICS.observe("startup_seconds", STARTUP[stage], stage=stage)
+    if stage == "first_data":
+        print(f"Startup: first paint {STARTUP['first_paint'] * 1000:.0f} ms, "
+              f"first live data {STARTUP['first_data'] * 1000:.0f} ms")
+        METRICS.event("startup", **STARTUP)
+
+# --- SPARKLINES ---
+
+def record_recent_quotes(data, started):
+    """Adds a refresh's quotes to the sparkline buffers; errors are logged, never raised.
+
+    Empty buffers are first seeded from the history written before `started`,
+    so this refresh's own quotes are not read back from it a second time.
+    """
+    try:
+        RECENT.seed(HISTORY, started - SPARKLINE_SPAN, started)   # only fills buffers that are still empty
+        RECENT.record(data)
+    except Exception as e:
+        print(f"Could not update recent quotes: {e}")
+
+def update_sparklines():
+    """Redraws each metal's sparkline from its recent quotes, downsampled to the canvas width.
+
+    Each line is one canvas item moved with a single coords() call, however
+    many quotes the buffer holds.
+    """
+    start = time.perf_counter()
+    width, height = SPARKLINE_SIZE
+    for metal, (canvas, line, label) in SPARKLINES.items():
+        times, values = RECENT.series(metal)
+        coords = sparkline_coords(times, values, width, height)
+        if not coords:
+            canvas.coords(line, 0, 0, 0, 0)
+            label.config(text=metal)
+            continue
+        change = (values[-1] / values[0] - 1) * 100
+        canvas.coords(line, coords)
+        canvas.itemconfigure(line, fill='#00bc8c' if change >= 0 else '#ff4d4d')
+        hours = (times[-1] - times[0]) / 3600
+        label.config(text=f"{metal} {change:+.2f}% ({hours:.0f}h)" if hours >= 1 else f"{metal} {change:+.2f}%")
+    METRICS.observe("sparkline_seconds", time.perf_counter() - start)
+
+# --- ALERTS ---
+
+def show_alerts(alerts):
+    """Shows the latest alert above the table and rings the bell."""
+    for alert in alerts:
+        print(f"Alert: {alert.message()}")
+    if alert_lbl is None:
+        return
+    t = time.strftime("%H:%M:%S", time.localtime(alerts[-1].time))
+    more = f"  (+{len(alerts) - 1} more)" if len(alerts) > 1 else ""
+    alert_lbl.config(text=f"🔔 {alerts[-1].message()} at {t}{more}", bootstyle="danger")
+    root.bell()
+
+# --- DIAGNOSTICS ---
+
+def update_diagnostics():
+    """Shows the last refresh request by request, plus the running counters."""
+    if diag_tree is None:
+        return
+    diag_tree.delete(*diag_tree.get_children())
+    refresh = METRICS.refreshes[-1] if METRICS.refreshes else None
+    if refresh is not None:
+        for trace in refresh["requests"]:
+            ms = [f"{getattr(trace, phase) * 1000:.0f}" for phase in ("connect", "tls", "wait", "download", "parse")]
+            tags = ("error",) if trace.error or trace.status >= 400 else ()
+            diag_tree.insert("", END, values=(trace.url.split("?")[0], trace.error or trace.status, *ms,
+                                              f"{trace.total * 1000:.0f}", f"{trace.bytes / 1024:.1f}"), tags=tags)
+        for event in refresh["events"]:
+            what = f"{event['event']} ({event['source']})" if "source" in event else event["event"]
+            diag_tree.insert("", END, values=(what, event.get("error", "")), tags=("error",))
+
+    fx = {result: METRICS.total("cache_lookups_total", key="fx", result=result) for result in ("hit", "stale", "miss")}
+    lines = [
+        f"Last refresh: {refresh['seconds']:.2f}s, {len(refresh['requests'])} requests" if refresh else "Last refresh: --",
+        f"Spot cache: {METRICS.total('cache_lookups_total', key='spot', result='hit'):g}"
+        f"/{METRICS.total('cache_lookups_total', key='spot'):g} hits  |  "
+        f"FX cache: {fx['hit']:g} hits, {fx['stale']:g} stale, {fx['miss']:g} misses",
+        f"Fallback quotes: {METRICS.total('fallback_quotes_total'):g}  |  "
+        f"Source errors: {METRICS.total('source_errors_total'):g}",
+    ]
+    if LAST_RENDER_TIMES is not None:
+        lines.append(f"Last table render: {LAST_RENDER_TIMES[0] * 1000:.1f} ms preparing rows (worker), "
+                     f"{LAST_RENDER_TIMES[1] * 1000:.1f} ms updating the tree  |  "
+                     f"{METRICS.total('render_requests_total'):g} requests -> "
+                     f"{METRICS.total('renders_applied_total'):g} renders")
+    if "first_data" in STARTUP:
+        lines.append(f"Startup: first paint {STARTUP['first_paint'] * 1000:.0f} ms, "
+                     f"first live data {STARTUP['first_data'] * 1000:.0f} ms")
+    diag_summary_lbl.config(text="\n".join(lines))
+
+def copy_metrics():
+    """Puts every counter and timing on the clipboard in Prometheus text format."""
+    root.clipboard_clear()
+    root.clipboard_append(METRICS.prometheus_text())
+
 # --- CALCULATOR LOGIC ---
 
 def update_calculator_spot_display():
-    currency = APP_STATE['currency']
-    if APP_STATE['last_data']:
-        for item in APP_STATE['last_data']['spot']:
+    if calc_spot_lbl is None:
+        return
+    currency = STATE.currency
+    if STATE.last_data:
+        for item in STATE.last_data['spot']:
             if item['name'] == "Silver":
-                usd = item.get('price_usd', 0)
-                if usd:
-                    calc_spot_lbl.config(text=f"Live Silver Spot: {convert_price(usd, currency)} / troy oz")
+                quote = item["quote"]
+                if quote.available:
+                    calc_spot_lbl.config(text=f"Live Silver Spot: {convert_price(quote.value, currency)}"
+                                              f"{quote.marker} / troy oz")
                 else:
-                    calc_spot_lbl.config(text=f"Live Silver Spot: {item['price_str']} (USD)")
+                    calc_spot_lbl.config(text=f"Live Silver Spot: {quote.text()}")
                 return
     calc_spot_lbl.config(text="Live Silver Spot: -- (Run Refresh or set Manual below)")
 
+def update_inventory_display():
+    """Revalues the loaded holdings against the current snapshot (only lots whose price moved)."""
+    if INVENTORY is None or inventory_lbl is None or not STATE.last_data:
+        return
+    snapshot = STATE.snapshot
+    INVENTORY.revalue(spot_prices_usd(snapshot.data))
+    fmt = get_formatter(STATE.currency, snapshot.exchange_rates.get(STATE.currency, 1.0))
+    fine = "  ".join(f"{oz:,.2f} oz {metal}" for metal, oz in INVENTORY.total_fine_oz.items())
+    text = f"{len(INVENTORY)} lots  |  {fine}  |  Total: {fmt.convert(INVENTORY.total_value)}"
+    if INVENTORY.unpriced:
+        text += f"  ({INVENTORY.unpriced} unpriced)"
+    lines = [text]
+    for country, lots, _, value in INVENTORY.totals("country")[:5]:
+        lines.append(f"    {country}: {fmt.convert(value)} ({lots} lots)")
+    inventory_lbl.config(text="\n".join(lines))
+
 def apply_manual_spot():
     """Applies a user-entered manual spot price."""
     try:
         val = float(manual_spot_entry.get())
         if val <= 0:
             raise ValueError
-        APP_STATE["manual_spot"] = val
+        STATE.publish(manual_spot=val)
         manual_status_lbl.config(text=f"✓ Manual spot ${val:.2f}/oz active", bootstyle="warning")
         # Trigger re-fetch so calculator and table update
         start_refresh_thread()
@@ -458,7 +762,7 @@ def apply_manual_spot():
         manual_status_lbl.config(text="✗ Enter a valid number", bootstyle="danger")
 
 def clear_manual_spot():
-    APP_STATE["manual_spot"] = None
+    STATE.publish(manual_spot=None)
     manual_spot_entry.delete(0, "end")
     manual_status_lbl.config(text="Using live prices", bootstyle="secondary")
     start_refresh_thread()
@@ -475,10 +779,10 @@ def perform_calculation():
             purity = purity_raw
 
         spot_usd = 0.0
-        if APP_STATE['last_data']:
-            for item in APP_STATE['last_data']['spot']:
-                if item['name'] == "Silver":
-                    spot_usd = item.get('price_usd', clean_price_text(item['price_str']))
+        if STATE.last_data:
+            for item in STATE.last_data['spot']:
+                if item['name'] == "Silver" and item["quote"].available:
+                    spot_usd = item["quote"].value
                     break
 
         if spot_usd == 0:
@@ -488,7 +792,7 @@ def perform_calculation():
         weight_in_grams = weight * CONST_GRAMS_PER_OZ if unit == "Troy Oz" else weight
         pure_silver_grams = weight_in_grams * purity
         value_usd = (pure_silver_grams / CONST_GRAMS_PER_OZ) * spot_usd
-        currency = APP_STATE['currency']
+        currency = STATE.currency
 
         calc_result_lbl.config(text=f"{convert_price(value_usd, currency)}", bootstyle="success")
         calc_details_lbl.config(
@@ -500,132 +804,150 @@ def perform_calculation():
         calc_result_lbl.config(text="Invalid Input", bootstyle="danger")
         calc_details_lbl.config(text="Check numbers")
 
-# --- GUI SETUP ---
-root = ttk.Window(themename="darkly")
-root.title("Silver & Coin Tracker Pro")
-root.geometry("950x900")
-
-# Header
-header_frame = ttk.Frame(root, padding=20)
-header_frame.pack(fill=X)
-title_lbl = ttk.Label(header_frame, text="Precious Metals Manager", font=("Segoe UI", 20, "bold"), bootstyle="inverse-primary")
-title_lbl.pack(side=LEFT)
-
-# Currency selector in header
-ttk.Label(header_frame, text="Display Currency:", font=("Segoe UI", 10)).pack(side=RIGHT, padx=(0, 5))
-currency_var = ttk.StringVar(value="USD")
-currency_combo = ttk.Combobox(header_frame, textvariable=currency_var, values=CURRENCY_OPTIONS,
-                               state="readonly", width=6, bootstyle="primary")
-currency_combo.pack(side=RIGHT)
-currency_combo.bind("<<ComboboxSelected>>", on_currency_change)
-
-# Notebook
-notebook = ttk.Notebook(root, bootstyle="primary")
-notebook.pack(fill=BOTH, expand=True, padx=10, pady=10)
-
-# ================= TAB 1: TRACKER =================
-tab_tracker = ttk.Frame(notebook)
-notebook.add(tab_tracker, text="  Market Tracker  ")
-
-control_frame = ttk.Frame(tab_tracker, padding=(10, 10, 10, 5))
-control_frame.pack(fill=X)
-
-refresh_btn = ttk.Button(control_frame, text="↻ Refresh Now", command=start_refresh_thread, bootstyle="primary-outline", width=15)
-refresh_btn.pack(side=LEFT, padx=(0, 15))
-
-auto_refresh_var = ttk.BooleanVar(value=False)
-auto_switch = ttk.Checkbutton(control_frame, text="Auto-Refresh (60s)", variable=auto_refresh_var, command=toggle_auto_refresh, bootstyle="success-round-toggle")
-auto_switch.pack(side=LEFT)
-
-status_lbl = ttk.Label(control_frame, text="Status: Ready", font=("Segoe UI", 9), bootstyle="secondary")
-status_lbl.pack(side=RIGHT)
-
-tree_frame = ttk.Frame(tab_tracker, padding=10)
-tree_frame.pack(fill=BOTH, expand=True)
-
-scroll = ttk.Scrollbar(tree_frame, bootstyle="primary-round")
-scroll.pack(side=RIGHT, fill=Y)
-
-columns = ("metal", "weight", "price")
-tree = ttk.Treeview(tree_frame, columns=columns, show="headings", yscrollcommand=scroll.set, bootstyle="primary")
-scroll.config(command=tree.yview)
-
-tree.heading("metal", text="Item Description", anchor=W)
-tree.heading("weight", text="Weight (Grams) ▼", anchor=CENTER, command=toggle_units)
-tree.heading("price", text="Current Value", anchor=CENTER)
-
-tree.column("metal", width=370, anchor=W)
-tree.column("weight", width=150, anchor=CENTER)
-tree.column("price", width=160, anchor=CENTER)
-
-tree.tag_configure('error', foreground='#ff4d4d')
-tree.tag_configure('spot_row', background='#303030', font=("Segoe UI", 10, "bold"))
-tree.tag_configure('category', background='#444444', foreground='#ffffff', font=("Segoe UI", 9, "italic", "bold"))
-tree.tag_configure('fallback', foreground='#ffcc00')
-
-tree.pack(fill=BOTH, expand=True)
-
-hint_lbl = ttk.Label(tab_tracker, text=" Click 'Weight' header to toggle Grams/Oz  |  * = fallback price source  |  Change currency in header", font=("Segoe UI", 8), bootstyle="secondary")
-hint_lbl.pack(pady=5)
-
-# ================= TAB 2: MELT CALCULATOR =================
-tab_calc = ttk.Frame(notebook, padding=20)
-notebook.add(tab_calc, text="  Melt Calculator  ")
-
-calc_header = ttk.Label(tab_calc, text="Silver Melt Value Calculator", font=("Segoe UI", 16, "bold"))
-calc_header.pack(pady=(0, 10))
-
-calc_spot_lbl = ttk.Label(tab_calc, text="Live Silver Spot: -- (Run Refresh or set Manual below)", font=("Segoe UI", 12), bootstyle="warning")
-calc_spot_lbl.pack(pady=(0, 10))
-
-# Manual spot price override
-manual_frame = ttk.Labelframe(tab_calc, text="Manual Spot Override (use when offline / scraper blocked)", padding=15, bootstyle="warning")
-manual_frame.pack(fill=X, pady=(0, 10))
-manual_frame.columnconfigure(1, weight=1)
-
-ttk.Label(manual_frame, text="Silver Spot (USD/oz):").grid(row=0, column=0, sticky=E, padx=5)
-manual_spot_entry = ttk.Entry(manual_frame, width=12)
-manual_spot_entry.grid(row=0, column=1, sticky=W, padx=5)
-ttk.Button(manual_frame, text="Apply", command=apply_manual_spot, bootstyle="warning-outline", width=8).grid(row=0, column=2, padx=5)
-ttk.Button(manual_frame, text="Clear", command=clear_manual_spot, bootstyle="secondary-outline", width=8).grid(row=0, column=3, padx=5)
-manual_status_lbl = ttk.Label(manual_frame, text="Using live prices", font=("Segoe UI", 9), bootstyle="secondary")
-manual_status_lbl.grid(row=0, column=4, padx=10)
-
-# Calc inputs
-inputs_frame = ttk.Labelframe(tab_calc, text="Item Details", padding=20, bootstyle="info")
-inputs_frame.pack(fill=X)
-inputs_frame.columnconfigure(1, weight=1)
-
-ttk.Label(inputs_frame, text="Weight:").grid(row=0, column=0, sticky=E, padx=5, pady=5)
-calc_weight_entry = ttk.Entry(inputs_frame)
-calc_weight_entry.grid(row=0, column=1, sticky=EW, padx=5, pady=5)
-calc_weight_entry.insert(0, "1")
-
-calc_unit_var = ttk.StringVar(value="Grams")
-unit_combo = ttk.Combobox(inputs_frame, textvariable=calc_unit_var, values=["Grams", "Troy Oz"], state="readonly", width=10)
-unit_combo.grid(row=0, column=2, padx=5, pady=5)
+# --- SCENARIO LOGIC ---
 
-ttk.Label(inputs_frame, text="Purity:").grid(row=1, column=0, sticky=E, padx=5, pady=5)
-calc_purity_entry = ttk.Entry(inputs_frame)
-calc_purity_entry.grid(row=1, column=1, sticky=EW, padx=5, pady=5)
-calc_purity_entry.insert(0, "925")
-ttk.Label(inputs_frame, text="(e.g. 925, .999, 80)").grid(row=1, column=2, sticky=W, padx=5)
+def current_spot(metal):
+    """USD spot of `metal` from the current snapshot, or None."""
+    if not STATE.last_data:
+        return None
+    value = spot_prices_usd(STATE.last_data).get(metal)
+    return value if value is not None and value > 0 else None
+
+def on_scenario_metal_change(event=None):
+    """Suggests a price range around the metal's spot (the default $20-$60 for silver)."""
+    metal = scenario_metal_var.get()
+    spot = current_spot(metal)
+    if metal == "Silver" or spot is None:
+        bounds = DEFAULT_RANGE if metal == "Silver" else None
+    else:
+        bounds = suggest_range(spot)
+    if bounds is not None:
+        for entry, value in zip((scenario_from_entry, scenario_to_entry, scenario_step_entry), bounds):
+            entry.delete(0, "end")
+            entry.insert(0, f"{value:g}")
+
+def run_scenarios():
+    """Builds the catalogue x price x currency grid on a worker thread."""
+    try:
+        prices = price_steps(*(float(entry.get())
+                               for entry in (scenario_from_entry, scenario_to_entry, scenario_step_entry)))
+    except ValueError:
+        scenario_status_lbl.config(text="✗ Enter a valid price range (from <= to, step > 0)", bootstyle="danger")
+        return
+    metal = scenario_metal_var.get()
+    # Every currency with a known exchange rate, so switching currency needs no recalculation
+    rates = {c: STATE.exchange_rates[c] for c in CURRENCY_OPTIONS if c in STATE.exchange_rates}
+    rates.setdefault("USD", 1.0)
+    scenario_status_lbl.config(text="Calculating...", bootstyle="warning")
 
-calc_btn = ttk.Button(inputs_frame, text="Calculate Value", command=perform_calculation, bootstyle="success")
-calc_btn.grid(row=2, column=0, columnspan=3, pady=(15, 0), sticky=EW)
+    def task():
+        start = time.perf_counter()
+        try:
+            grid, error = ScenarioGrid(CATALOGUE, prices, rates, metal), None
+        except ValueError as e:
+            grid, error = None, e
+        root.after(0, show_scenarios, grid, error, time.perf_counter() - start)
+
+    threading.Thread(target=task, daemon=True, name="scenarios").start()
+
+def show_scenarios(grid, error, seconds):
+    global SCENARIO_GRID
+    if error is not None:
+        scenario_status_lbl.config(text=f"✗ {error}", bootstyle="danger")
+        return
+    SCENARIO_GRID = grid
+    render_scenarios()
+    shown = "" if len(grid) <= SCENARIO_DISPLAY_LIMIT else f"  (first {SCENARIO_DISPLAY_LIMIT:,} listed)"
+    scenario_status_lbl.config(text=f"{len(grid):,} coins × {len(grid.prices)} prices × {len(grid.currencies)} "
+                                    f"currencies in {seconds * 1000:.0f} ms{shown}", bootstyle="success")
+
+def prepare_scenarios(grid, currency, data):
+    """(columns, headings, rows) showing `grid` in `currency`, at evenly spaced prices plus the one nearest spot.
+
+    Makes no Tk calls, so it can run on the render worker.
+    """
+    currency = currency if currency in grid.currencies else "USD"
+    picks = set(np.linspace(0, len(grid.prices) - 1, min(SCENARIO_COLUMNS, len(grid.prices))).round().astype(int).tolist())
+    spot = spot_prices_usd(data).get(grid.metal) if data else None
+    spot = spot if spot is not None and spot > 0 else None
+    spot_index = grid.price_index(spot) if spot is not None and len(grid.prices) else None
+    if spot_index is not None:
+        picks.add(spot_index)
+    picks = sorted(picks)
+
+    usd = get_formatter("USD")
+    headings = [f"▶ {usd(grid.prices[i])} spot" if i == spot_index else f"{usd(grid.prices[i])} spot" for i in picks]
+    table = grid.table(currency, slice(0, SCENARIO_DISPLAY_LIMIT), picks)
+    fmt = get_formatter(currency)
+    cells = [fmt.format_column(table[:, j]) for j in range(len(picks))]
+    rows = [(CATALOGUE.names[row], *(column[n] for column in cells))
+            for n, row in enumerate(grid.rows[:SCENARIO_DISPLAY_LIMIT].tolist())]
+    return ["coin"] + [f"p{i}" for i in picks], headings, rows
+
+SCENARIO_SHOWN = ([], [])   # (columns, rows) in the scenario tree
+
+def apply_scenarios(view):
+    """Tk thread: puts a prepare_scenarios() result on screen, touching only rows that changed.
+
+    A currency or spot change keeps the rows, so only rows whose text
+    changed get a tree.item() call; a grid with another number of rows is
+    rebuilt once.
+    """
+    global SCENARIO_SHOWN
+    columns, headings, rows = view
+    shown_columns, shown_rows = SCENARIO_SHOWN
+    if columns != shown_columns:
+        scenario_tree.configure(columns=columns)
+        scenario_tree.heading("coin", text="Coin", anchor=W)
+        scenario_tree.column("coin", width=260, anchor=W, stretch=True)
+        for column in columns[1:]:
+            scenario_tree.column(column, width=95, anchor=CENTER, stretch=False)
+    for column, heading in zip(columns[1:], headings):
+        scenario_tree.heading(column, text=heading, anchor=CENTER)
+
+    if len(rows) != len(shown_rows):
+        scenario_tree.delete(*scenario_tree.get_children())
+        for n, values in enumerate(rows):
+            scenario_tree.insert("", END, iid=f"s{n}", values=values)
+    else:
+        for n, (values, shown) in enumerate(zip(rows, shown_rows)):
+            if values != shown:
+                scenario_tree.item(f"s{n}", values=values)
+    SCENARIO_SHOWN = (columns, rows)
+
+def render_scenarios():
+    """Shows a newly calculated grid; currency and price changes go through RENDERER instead."""
+    if scenario_tree is None or SCENARIO_GRID is None:
+        return
+    apply_scenarios(prepare_scenarios(SCENARIO_GRID, STATE.currency, STATE.last_data))
 
-results_frame = ttk.Frame(tab_calc, padding=20)
-results_frame.pack(fill=X, pady=10)
+def export_scenarios():
+    """Saves the whole grid (every price and currency) as CSV."""
+    grid = SCENARIO_GRID
+    if grid is None:
+        scenario_status_lbl.config(text="Calculate the scenarios first", bootstyle="warning")
+        return
+    from tkinter import filedialog
+    path = filedialog.asksaveasfilename(defaultextension=".csv", initialfile="scenarios.csv",
+                                        filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+    if not path:
+        return
+    scenario_status_lbl.config(text="Exporting...", bootstyle="warning")
 
-calc_result_lbl = ttk.Label(results_frame, text="$0.00", font=("Segoe UI", 24, "bold"), bootstyle="success", anchor=CENTER)
-calc_result_lbl.pack()
-calc_details_lbl = ttk.Label(results_frame, text="Waiting for input...", font=("Segoe UI", 10), bootstyle="secondary", anchor=CENTER)
-calc_details_lbl.pack()
+    def task():
+        try:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                grid.write_csv(f)
+            text, style = f"✓ Saved {len(grid) * len(grid.currencies):,} rows to {path}", "success"
+        except OSError as e:
+            text, style = f"✗ Could not save: {e}", "danger"
+        root.after(0, lambda: scenario_status_lbl.config(text=text, bootstyle=style))
 
-info_frame = ttk.Labelframe(tab_calc, text="Silverware Identification Guide", padding=15, bootstyle="primary")
-info_frame.pack(fill=BOTH, expand=True, pady=10)
+    threading.Thread(target=task, daemon=True, name="scenario-export").start()
+
+# --- GUI SETUP ---
 
-info_text = """
+INFO_TEXT = """
 HOW TO SPOT REAL SILVER (STERLING) vs PLATE:
 
  REAL SILVER (STERLING)
@@ -642,8 +964,317 @@ HOW TO SPOT REAL SILVER (STERLING) vs PLATE:
   - "IS" (International Silver - usually plated unless marked Sterling)
 • COLOR: If worn, you may see "brassy" or copper colors showing through.
 """
-info_lbl = ttk.Label(info_frame, text=info_text, justify=LEFT, font=("Consolas", 10))
-info_lbl.pack(anchor=W)
 
-root.after(1000, start_refresh_thread)
-root.mainloop()
+def build_gui():
+    """Creates the main window and the Market Tracker tab (see build_secondary_tabs for the rest)."""
+    global root, notebook, tree, VIRTUAL_TABLE, currency_var, refresh_btn, auto_refresh_var, status_lbl, sources_lbl
+    global alert_lbl
+
+    root = ttk.Window(themename="darkly")
+    root.title("Silver & Coin Tracker Pro")
+    root.geometry("950x900")
+
+    # Header
+    header_frame = ttk.Frame(root, padding=20)
+    header_frame.pack(fill=X)
+    title_lbl = ttk.Label(header_frame, text="Precious Metals Manager", font=("Segoe UI", 20, "bold"), bootstyle="inverse-primary")
+    title_lbl.pack(side=LEFT)
+
+    # Currency selector in header
+    ttk.Label(header_frame, text="Display Currency:", font=("Segoe UI", 10)).pack(side=RIGHT, padx=(0, 5))
+    currency_var = ttk.StringVar(value="USD")
+    currency_combo = ttk.Combobox(header_frame, textvariable=currency_var, values=CURRENCY_OPTIONS,
+                                   state="readonly", width=6, bootstyle="primary")
+    currency_combo.pack(side=RIGHT)
+    currency_combo.bind("<<ComboboxSelected>>", on_currency_change)
+
+    # Notebook
+    notebook = ttk.Notebook(root, bootstyle="primary")
+    notebook.pack(fill=BOTH, expand=True, padx=10, pady=10)
+
+    # ================= TAB 1: TRACKER =================
+    tab_tracker = ttk.Frame(notebook)
+    notebook.add(tab_tracker, text="  Market Tracker  ")
+
+    control_frame = ttk.Frame(tab_tracker, padding=(10, 10, 10, 5))
+    control_frame.pack(fill=X)
+
+    refresh_btn = ttk.Button(control_frame, text="↻ Refresh Now", command=start_refresh_thread, bootstyle="primary-outline", width=15)
+    refresh_btn.pack(side=LEFT, padx=(0, 15))
+
+    auto_refresh_var = ttk.BooleanVar(value=False)
+    auto_switch = ttk.Checkbutton(control_frame, text=f"Auto-Refresh ({SCHEDULER.interval:g}s)", variable=auto_refresh_var, command=toggle_auto_refresh, bootstyle="success-round-toggle")
+    auto_switch.pack(side=LEFT)
+
+    status_lbl = ttk.Label(control_frame, text="Status: Ready", font=("Segoe UI", 9), bootstyle="secondary")
+    status_lbl.pack(side=RIGHT)
+
+    # Latest price alert (only with --alerts)
+    alert_lbl = None
+    if ALERTS is not None:
+        alert_lbl = ttk.Label(tab_tracker, text=f"Watching {len(ALERTS)} price alerts", font=("Segoe UI", 9),
+                              bootstyle="secondary", padding=(10, 5, 10, 0))
+        alert_lbl.pack(fill=X)
+
+    # Intraday sparkline per metal
+    spark_frame = ttk.Frame(tab_tracker, padding=(10, 5, 10, 0))
+    spark_frame.pack(fill=X)
+    width, height = SPARKLINE_SIZE
+    for metal in METALS_CONFIG:
+        cell = ttk.Frame(spark_frame)
+        cell.pack(side=LEFT, expand=True)
+        label = ttk.Label(cell, text=metal["name"], font=("Segoe UI", 8), bootstyle="secondary")
+        label.pack(anchor=W)
+        canvas = ttk.Canvas(cell, width=width, height=height, highlightthickness=0)
+        canvas.pack()
+        SPARKLINES[metal["name"]] = (canvas, canvas.create_line(0, 0, 0, 0, width=1.5), label)
+
+    # Per-source latency / success rate / cooldown, refreshed after each fetch
+    sources_lbl = ttk.Label(tab_tracker, text="", font=("Segoe UI", 8), bootstyle="secondary", padding=(10, 0, 10, 5))
+    sources_lbl.pack(side=BOTTOM, fill=X)
+
+    tree_frame = ttk.Frame(tab_tracker, padding=10)
+    tree_frame.pack(fill=BOTH, expand=True)
+
+    scroll = ttk.Scrollbar(tree_frame, bootstyle="primary-round")
+    scroll.pack(side=RIGHT, fill=Y)
+
+    columns = ("metal", "weight", "price")
+    virtual_mode = len(CATALOGUE) > VIRTUAL_SCROLL_THRESHOLD
+    tree = ttk.Treeview(tree_frame, columns=columns, show="headings" if virtual_mode else "tree headings",
+                        yscrollcommand=scroll.set, bootstyle="primary")
+    scroll.config(command=tree.yview)
+
+    tree.heading("metal", text="Item Description", anchor=W)
+    tree.heading("weight", text="Weight (Grams) ▼", anchor=CENTER, command=toggle_units)
+    tree.heading("price", text="Current Value", anchor=CENTER)
+
+    tree.column("#0", width=30, stretch=False)
+    tree.column("metal", width=370, anchor=W)
+    tree.column("weight", width=150, anchor=CENTER)
+    tree.column("price", width=160, anchor=CENTER)
+
+    tree.tag_configure('error', foreground='#ff4d4d')
+    tree.tag_configure('spot_row', background='#303030', font=("Segoe UI", 10, "bold"))
+    tree.tag_configure('category', background='#444444', foreground='#ffffff', font=("Segoe UI", 9, "italic", "bold"))
+    tree.tag_configure('fallback', foreground='#ffcc00')
+
+    tree.pack(fill=BOTH, expand=True)
+
+    if virtual_mode:
+        VIRTUAL_TABLE = VirtualTable(tree, scroll)
+    else:
+        tree.bind("<<TreeviewOpen>>", on_tree_open)
+        if len(CATALOGUE) <= LAZY_EXPAND_LIMIT:
+            EXPANDED.update(f"hdr:{key}" for key, _ in CATALOGUE.categories)
+
+    hint_lbl = ttk.Label(tab_tracker, text=" Click 'Weight' header to toggle Grams/Oz  |  * = fallback price source  |  Change currency in header", font=("Segoe UI", 8), bootstyle="secondary")
+    hint_lbl.pack(pady=5)
+
+def build_secondary_tabs():
+    """Adds the Melt Calculator, Scenarios (and Diagnostics) tabs; run once the first paint is on screen."""
+    global inventory_lbl, calc_spot_lbl, manual_spot_entry, manual_status_lbl, calc_weight_entry, calc_unit_var
+    global calc_purity_entry, calc_result_lbl, calc_details_lbl, diag_tree, diag_summary_lbl
+    global scenario_tree, scenario_status_lbl, scenario_metal_var, scenario_from_entry, scenario_to_entry
+    global scenario_step_entry
+
+    # ================= TAB 2: MELT CALCULATOR =================
+    tab_calc = ttk.Frame(notebook, padding=20)
+    notebook.add(tab_calc, text="  Melt Calculator  ")
+
+    calc_header = ttk.Label(tab_calc, text="Silver Melt Value Calculator", font=("Segoe UI", 16, "bold"))
+    calc_header.pack(pady=(0, 10))
+
+    calc_spot_lbl = ttk.Label(tab_calc, text="Live Silver Spot: -- (Run Refresh or set Manual below)", font=("Segoe UI", 12), bootstyle="warning")
+    calc_spot_lbl.pack(pady=(0, 10))
+
+    # Manual spot price override
+    manual_frame = ttk.Labelframe(tab_calc, text="Manual Spot Override (use when offline / scraper blocked)", padding=15, bootstyle="warning")
+    manual_frame.pack(fill=X, pady=(0, 10))
+    manual_frame.columnconfigure(1, weight=1)
+
+    ttk.Label(manual_frame, text="Silver Spot (USD/oz):").grid(row=0, column=0, sticky=E, padx=5)
+    manual_spot_entry = ttk.Entry(manual_frame, width=12)
+    manual_spot_entry.grid(row=0, column=1, sticky=W, padx=5)
+    ttk.Button(manual_frame, text="Apply", command=apply_manual_spot, bootstyle="warning-outline", width=8).grid(row=0, column=2, padx=5)
+    ttk.Button(manual_frame, text="Clear", command=clear_manual_spot, bootstyle="secondary-outline", width=8).grid(row=0, column=3, padx=5)
+    manual_status_lbl = ttk.Label(manual_frame, text="Using live prices", font=("Segoe UI", 9), bootstyle="secondary")
+    manual_status_lbl.grid(row=0, column=4, padx=10)
+
+    # Calc inputs
+    inputs_frame = ttk.Labelframe(tab_calc, text="Item Details", padding=20, bootstyle="info")
+    inputs_frame.pack(fill=X)
+    inputs_frame.columnconfigure(1, weight=1)
+
+    ttk.Label(inputs_frame, text="Weight:").grid(row=0, column=0, sticky=E, padx=5, pady=5)
+    calc_weight_entry = ttk.Entry(inputs_frame)
+    calc_weight_entry.grid(row=0, column=1, sticky=EW, padx=5, pady=5)
+    calc_weight_entry.insert(0, "1")
+
+    calc_unit_var = ttk.StringVar(value="Grams")
+    unit_combo = ttk.Combobox(inputs_frame, textvariable=calc_unit_var, values=["Grams", "Troy Oz"], state="readonly", width=10)
+    unit_combo.grid(row=0, column=2, padx=5, pady=5)
+
+    ttk.Label(inputs_frame, text="Purity:").grid(row=1, column=0, sticky=E, padx=5, pady=5)
+    calc_purity_entry = ttk.Entry(inputs_frame)
+    calc_purity_entry.grid(row=1, column=1, sticky=EW, padx=5, pady=5)
+    calc_purity_entry.insert(0, "925")
+    ttk.Label(inputs_frame, text="(e.g. 925, .999, 80)").grid(row=1, column=2, sticky=W, padx=5)
+
+    calc_btn = ttk.Button(inputs_frame, text="Calculate Value", command=perform_calculation, bootstyle="success")
+    calc_btn.grid(row=2, column=0, columnspan=3, pady=(15, 0), sticky=EW)
+
+    results_frame = ttk.Frame(tab_calc, padding=20)
+    results_frame.pack(fill=X, pady=10)
+
+    calc_result_lbl = ttk.Label(results_frame, text="$0.00", font=("Segoe UI", 24, "bold"), bootstyle="success", anchor=CENTER)
+    calc_result_lbl.pack()
+    calc_details_lbl = ttk.Label(results_frame, text="Waiting for input...", font=("Segoe UI", 10), bootstyle="secondary", anchor=CENTER)
+    calc_details_lbl.pack()
+
+    if INVENTORY is not None:
+        inventory_frame = ttk.Labelframe(tab_calc, text="Inventory", padding=15, bootstyle="success")
+        inventory_frame.pack(fill=X, pady=(0, 10))
+        inventory_lbl = ttk.Label(inventory_frame, text="Waiting for prices...", justify=LEFT, font=("Segoe UI", 10))
+        inventory_lbl.pack(anchor=W)
+
+    info_frame = ttk.Labelframe(tab_calc, text="Silverware Identification Guide", padding=15, bootstyle="primary")
+    info_frame.pack(fill=BOTH, expand=True, pady=10)
+
+    info_lbl = ttk.Label(info_frame, text=INFO_TEXT, justify=LEFT, font=("Consolas", 10))
+    info_lbl.pack(anchor=W)
+
+    # ================= TAB 3: SCENARIOS =================
+    tab_scen = ttk.Frame(notebook, padding=10)
+    notebook.add(tab_scen, text="  Scenarios  ")
+
+    scen_inputs = ttk.Labelframe(tab_scen, text="Value every coin across a range of spot prices", padding=10,
+                                 bootstyle="info")
+    scen_inputs.pack(fill=X, pady=(0, 10))
+
+    ttk.Label(scen_inputs, text="Metal:").pack(side=LEFT, padx=(0, 5))
+    scenario_metal_var = ttk.StringVar(value="Silver")
+    metal_combo = ttk.Combobox(scen_inputs, textvariable=scenario_metal_var, values=CATALOGUE.metals,
+                               state="readonly", width=10)
+    metal_combo.pack(side=LEFT, padx=(0, 15))
+    metal_combo.bind("<<ComboboxSelected>>", on_scenario_metal_change)
+
+    scenario_entries = []
+    for label, value in zip(("From $", "To $", "Step $"), DEFAULT_RANGE):
+        ttk.Label(scen_inputs, text=label).pack(side=LEFT, padx=(0, 5))
+        entry = ttk.Entry(scen_inputs, width=8)
+        entry.insert(0, f"{value:g}")
+        entry.pack(side=LEFT, padx=(0, 15))
+        scenario_entries.append(entry)
+    scenario_from_entry, scenario_to_entry, scenario_step_entry = scenario_entries
+
+    ttk.Button(scen_inputs, text="Calculate", command=run_scenarios, bootstyle="success").pack(side=LEFT, padx=5)
+    ttk.Button(scen_inputs, text="Export CSV…", command=export_scenarios,
+               bootstyle="secondary-outline").pack(side=LEFT, padx=5)
+
+    scenario_status_lbl = ttk.Label(tab_scen, text="Enter a price range and press Calculate",
+                                    font=("Segoe UI", 9), bootstyle="secondary")
+    scenario_status_lbl.pack(anchor=W, pady=(0, 5))
+
+    scen_tree_frame = ttk.Frame(tab_scen)
+    scen_tree_frame.pack(fill=BOTH, expand=True)
+    scen_scroll = ttk.Scrollbar(scen_tree_frame, bootstyle="info-round")
+    scen_scroll.pack(side=RIGHT, fill=Y)
+    scen_xscroll = ttk.Scrollbar(scen_tree_frame, orient=HORIZONTAL, bootstyle="info-round")
+    scen_xscroll.pack(side=BOTTOM, fill=X)
+    scenario_tree = ttk.Treeview(scen_tree_frame, columns=("coin",), show="headings",
+                                 yscrollcommand=scen_scroll.set, xscrollcommand=scen_xscroll.set, bootstyle="info")
+    scen_scroll.config(command=scenario_tree.yview)
+    scen_xscroll.config(command=scenario_tree.xview)
+    scenario_tree.pack(fill=BOTH, expand=True)
+    ttk.Label(tab_scen, text=" Values in the header currency  |  ▶ = nearest to current spot  |  "
+                             "the CSV export has every price and currency",
+              font=("Segoe UI", 8), bootstyle="secondary").pack(pady=5)
+
+    # ================= TAB 4: DIAGNOSTICS (optional) =================
+    if DIAGNOSTICS:
+        tab_diag = ttk.Frame(notebook, padding=10)
+        notebook.add(tab_diag, text="  Diagnostics  ")
+
+        diag_top = ttk.Frame(tab_diag)
+        diag_top.pack(fill=X, pady=(0, 10))
+        diag_summary_lbl = ttk.Label(diag_top, text="Waiting for the first refresh...", justify=LEFT, font=("Consolas", 9))
+        diag_summary_lbl.pack(side=LEFT, anchor=W)
+        ttk.Button(diag_top, text="Copy Metrics", command=copy_metrics, bootstyle="secondary-outline").pack(side=RIGHT)
+
+        diag_columns = ("request", "status", "connect", "tls", "wait", "download", "parse", "total", "kb")
+        diag_tree = ttk.Treeview(tab_diag, columns=diag_columns, show="headings", bootstyle="info")
+        for column, heading, width in zip(diag_columns,
+                                          ("Request", "Status", "Connect ms", "TLS ms", "Wait ms", "Download ms",
+                                           "Parse ms", "Total ms", "KB"),
+                                          (300, 70, 75, 60, 65, 85, 65, 70, 55)):
+            diag_tree.heading(column, text=heading, anchor=W if column == "request" else CENTER)
+            diag_tree.column(column, width=width, anchor=W if column == "request" else CENTER,
+                             stretch=column == "request")
+        diag_tree.tag_configure('error', foreground='#ff4d4d')
+        diag_tree.pack(fill=BOTH, expand=True)
+        ttk.Label(tab_diag, text=" Connect (DNS + TCP) and TLS only show up when a new connection was opened",
+                  font=("Segoe UI", 8), bootstyle="secondary").pack(pady=5)
+
+    # Catch up with anything that arrived before these tabs existed
+    update_calculator_spot_display()
+    update_inventory_display()
+    if STATE.last_data:
+        run_scenarios()
+    if DIAGNOSTICS:
+        update_diagnostics()
+
+def main(argv=None):
+    """Launches the desktop app."""
+    global SERVER_URL, INVENTORY, DIAGNOSTICS, ALERTS
+    parser = argparse.ArgumentParser(prog="silver-tracker-gui")
+    parser.add_argument("--server", metavar="URL",
+                        help="read quotes from a quote server (silver-tracker serve) instead of scraping")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, metavar="SECONDS",
+                        help=f"auto-refresh interval (default {DEFAULT_INTERVAL:g}s); stretched while "
+                             "prices are unchanged and backed off on failures")
+    parser.add_argument("--inventory", metavar="PATH",
+                        help="holdings to value on every refresh (CSV, or SQLite with a holdings table)")
+    parser.add_argument("--alerts", metavar="PATH",
+                        help="price alert rules, one per line (e.g. 'Silver > 35'), checked on every refresh")
+    parser.add_argument("--alert-hook", metavar="COMMAND",
+                        help="with --alerts: shell command run with the fired alerts as JSON lines on stdin")
+    parser.add_argument("--diagnostics", action="store_true",
+                        help="add a tab with per-request timings (connect/TLS/wait/download/parse) and counters")
+    parser.add_argument("--metrics-log", metavar="PATH", help="append one JSON line per refresh and per error")
+    args = parser.parse_args(argv)
+    SERVER_URL = args.server
+    DIAGNOSTICS = args.diagnostics
+    if args.metrics_log:
+        METRICS.log_path = args.metrics_log
+    if args.inventory:
+        try:
+            INVENTORY = load_inventory(args.inventory, CATALOGUE)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot load holdings: {e}")
+    if args.alerts:
+        try:
+            ALERTS = AlertEngine(CATALOGUE, [m["name"] for m in METALS_CONFIG]).load(args.alerts)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot load alerts: {e}")
+        ALERTS.subscribe(lambda alerts: root.after(0, show_alerts, alerts))
+        if args.alert_hook:
+            ALERTS.subscribe(lambda alerts: run_hook(args.alert_hook, alerts))
+    elif args.alert_hook:
+        parser.error("--alert-hook needs --alerts")
+    SCHEDULER.interval = args.interval
+    SCHEDULER.max_interval = max(SCHEDULER.max_interval, args.interval)
+
+    # Staged start: paint the tracker tab with the last cached snapshot, then start the
+    # first refresh (network stacks are imported on its worker threads) and only then
+    # build the other tabs.
+    build_gui()
+    show_cached_data()
+    root.update()
+    mark_startup("first_paint")
+    start_refresh_thread()
+    root.after_idle(build_secondary_tabs)
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
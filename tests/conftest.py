@@ -0,0 +1,15 @@
+"""Shared setup: import the tracker modules from the checkout, with a throw-away home directory.
+
+tracker_core keeps its cache and history under ~/.silver_tracker (opened on
+first use), so HOME is pointed at a temporary directory before any test
+module imports it.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="silver-tracker-tests-")
+for name in ("SILVER_TRACKER_RECORD", "SILVER_TRACKER_REPLAY", "SILVER_TRACKER_FAULTS", "SILVER_TRACKER_CATALOGUE"):
+    os.environ.pop(name, None)
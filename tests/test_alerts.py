@@ -0,0 +1,117 @@
+"""AlertEngine.check: threshold crossings, repeat suppression and index rebuilds."""
+import pytest
+
+import tracker_core as core
+from tracker_alerts import AlertEngine
+from tracker_quote import Quote
+
+RATES = {"USD": 1.0, "GBP": 0.8}
+METALS = [m["name"] for m in core.METALS_CONFIG]
+
+
+def snapshot(silver, gold=2300.0):
+    return core.build_data({"Gold": Quote(gold, "test"),
+                            "Silver": Quote.unavailable() if silver is None else Quote(silver, "test"),
+                            "Platinum": Quote(998.4, "test"), "Palladium": Quote(1012.75, "test")})
+
+
+@pytest.fixture
+def engine():
+    return AlertEngine(core.CATALOGUE, METALS)
+
+
+def fired(engine, silver, **kwargs):
+    return sorted(alert.rule.text for alert in engine.check(snapshot(silver, **kwargs), RATES))
+
+
+def test_first_check_only_sets_the_baseline(engine):
+    engine.add("Silver > 30")
+    assert fired(engine, 35.0) == []
+    assert fired(engine, 36.0) == []
+
+
+def test_crossings_in_both_directions(engine):
+    engine.add("Silver > 35")
+    engine.add("Silver < 30")
+    fired(engine, 32.0)
+
+    assert fired(engine, 36.0) == ["Silver > 35"]
+    assert fired(engine, 29.0) == ["Silver < 30"]      # falling through 35 does not fire the > rule
+    assert fired(engine, 36.0) == ["Silver > 35"]      # rising through 30 does not fire the < rule
+
+
+def test_no_repeat_while_beyond_the_threshold(engine):
+    engine.add("Silver > 35")
+    fired(engine, 34.0)
+    assert fired(engine, 35.5) == ["Silver > 35"]
+    assert fired(engine, 37.0) == []
+    assert fired(engine, 36.0) == []
+    assert fired(engine, 34.0) == []
+    assert fired(engine, 35.5) == ["Silver > 35"]      # fires again after coming back
+
+
+def test_landing_on_the_threshold_fires_once(engine):
+    # Above: previous <= threshold < value; below: value < threshold <= previous
+    engine.add("Silver > 35")
+    engine.add("Silver < 30")
+    fired(engine, 34.0)
+    assert fired(engine, 35.0) == []
+    assert fired(engine, 35.01) == ["Silver > 35"]
+
+    fired(engine, 31.0)
+    assert fired(engine, 30.0) == []
+    assert fired(engine, 29.99) == ["Silver < 30"]
+
+
+def test_only_thresholds_between_the_two_values_fire(engine):
+    for amount in (30, 31, 32, 32, 33, 34):
+        engine.add(f"Silver > {amount}")
+    fired(engine, 31.0)
+    # 31 sits on the previous value and counts; 32 is there twice; 34 is not reached
+    assert fired(engine, 33.5) == ["Silver > 31", "Silver > 32", "Silver > 32", "Silver > 33"]
+
+
+def test_rules_added_between_checks_are_indexed(engine):
+    engine.add("Silver > 35")
+    fired(engine, 34.0)
+    engine.add("Silver > 34.5")
+    engine.add("Silver < 33")
+    # The baseline survives the rebuild, so the new rules compare against 34
+    assert fired(engine, 36.0) == ["Silver > 34.5", "Silver > 35"]
+    assert fired(engine, 32.0) == ["Silver < 33"]
+
+
+def test_missing_price_keeps_the_last_value(engine):
+    engine.add("Silver > 35")
+    fired(engine, 34.0)
+    assert fired(engine, None) == []
+    assert fired(engine, 36.0) == ["Silver > 35"]
+
+
+def test_currency_coin_and_ratio_rules(engine):
+    engine.add("Silver > 28 GBP")                    # 35 USD at 0.8
+    engine.add("Gold/Silver < 70")
+    fired(engine, 34.0, gold=2400.0)                 # ratio 70.6
+    alerts = engine.check(snapshot(36.0, gold=2400.0), RATES)   # 28.8 GBP, ratio 66.7
+    assert sorted(a.rule.text for a in alerts) == ["Gold/Silver < 70", "Silver > 28 GBP"]
+
+    coin = engine.add("Morgan Dollar > 30")
+    fine_oz = coin.scale
+    assert coin.threshold == pytest.approx(30 / fine_oz)
+    fired(engine, 29.0 / fine_oz, gold=2400.0)
+    assert "Morgan Dollar > 30" in fired(engine, 31.0 / fine_oz, gold=2400.0)
+
+
+def test_subscribers_get_the_alerts_and_errors_are_contained(engine, capsys):
+    engine.add("Silver > 35")
+    received = []
+
+    def broken(alerts):
+        raise RuntimeError("notifier down")
+    engine.subscribe(broken)
+    engine.subscribe(received.append)
+
+    fired(engine, 34.0)
+    assert fired(engine, 36.0) == ["Silver > 35"]
+    assert [a.rule.text for a in received[0]] == ["Silver > 35"]
+    assert "Alert notification failed" in capsys.readouterr().err
@@ -0,0 +1,129 @@
+"""TTLCache: TTL expiry, persistence and stale-while-revalidate."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import tracker_cache
+from tracker_cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable stand-in for time.time() in tracker_cache."""
+    class Clock:
+        now = 1_000_000.0
+
+        def advance(self, seconds):
+            self.now += seconds
+
+    clock = Clock()
+    monkeypatch.setattr(tracker_cache.time, "time", lambda: clock.now)
+    return clock
+
+
+class Deferred:
+    """An executor that holds submitted calls until run() is called."""
+
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, func, *args):
+        self.calls.append((func, args))
+
+    def run(self):
+        calls, self.calls = self.calls, []
+        for func, args in calls:
+            func(*args)
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = TTLCache()
+    cache.put("fx", {"GBP": 0.8})
+    clock.advance(59.0)
+    assert cache.get("fx", ttl=60) == {"GBP": 0.8}
+    clock.advance(1.0)
+    assert cache.get("fx", ttl=60) is None
+    assert cache.get("fx", ttl=3600) == {"GBP": 0.8}        # the TTL belongs to the lookup
+    assert cache.peek("fx") == {"GBP": 0.8}
+    assert cache.age("fx") == pytest.approx(60.0)
+    assert cache.get("spot", ttl=60) is None and cache.age("spot") is None
+
+
+def test_entries_keep_their_age_across_restarts(clock, tmp_path):
+    path = str(tmp_path / "cache" / "prices.json")
+    cache = TTLCache(path)
+    cache.put("spot:Silver", 30.0)
+    cache.save()
+    clock.advance(100.0)
+
+    reopened = TTLCache(path)
+    assert reopened.age("spot:Silver") == pytest.approx(100.0)
+    assert reopened.get("spot:Silver", ttl=60) is None
+
+    (tmp_path / "cache" / "prices.json").write_text("{not json", encoding="utf-8")
+    assert TTLCache(path).peek("spot:Silver") is None
+
+
+def test_fresh_missing_and_too_stale_entries(clock):
+    cache = TTLCache()
+    executor = Deferred()
+    loads = []
+
+    def loader():
+        loads.append(clock.now)
+        return len(loads)
+
+    assert cache.get_or_revalidate("fx", 60, loader, executor, max_stale=600) == 1   # missing: loads now
+    clock.advance(30.0)
+    assert cache.get_or_revalidate("fx", 60, loader, executor, max_stale=600) == 1   # fresh
+    clock.advance(600.0)
+    assert cache.get_or_revalidate("fx", 60, loader, executor, max_stale=600) == 2   # too stale: loads now
+    assert not executor.calls
+
+    # A failed synchronous load keeps the old value
+    clock.advance(600.0)
+    assert cache.get_or_revalidate("fx", 60, lambda: None, executor, max_stale=600) == 2
+
+
+def test_stale_value_is_served_while_one_revalidation_runs(clock):
+    cache = TTLCache()
+    cache.put("fx", "old")
+    clock.advance(120.0)
+    executor = Deferred()
+
+    for _ in range(3):
+        assert cache.get_or_revalidate("fx", 60, lambda: "new", executor, max_stale=600) == "old"
+    assert len(executor.calls) == 1                           # one revalidation at a time
+
+    executor.run()
+    assert cache.get_or_revalidate("fx", 60, lambda: "newer", executor, max_stale=600) == "new"
+    assert cache.age("fx") == 0.0
+
+    # A failed revalidation keeps the stale value and allows the next attempt
+    clock.advance(120.0)
+    assert cache.get_or_revalidate("fx", 60, lambda: None, executor, max_stale=600) == "new"
+    executor.run()
+    assert cache.get_or_revalidate("fx", 60, lambda: "newest", executor, max_stale=600) == "new"
+    assert len(executor.calls) == 1
+
+
+def test_concurrent_readers_start_a_single_revalidation(clock):
+    cache = TTLCache()
+    cache.put("fx", "old")
+    clock.advance(120.0)
+    release, calls = threading.Event(), []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "new"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        with ThreadPoolExecutor(max_workers=8) as readers:
+            results = list(readers.map(
+                lambda _: cache.get_or_revalidate("fx", 60, loader, executor, max_stale=600), range(16)))
+        release.set()
+    assert results == ["old"] * 16
+    assert calls == [1]
+    assert cache.peek("fx") == "new"
@@ -0,0 +1,40 @@
+"""Catalogue loading: the bundled coins.csv, where installs put it, and overrides."""
+import json
+import os
+import site
+
+import numpy as np
+import pytest
+
+import tracker_catalogue
+from tracker_catalogue import DEFAULT_CATALOGUE_PATHS, load_catalogue
+
+
+def test_bundled_catalogue_is_grouped_by_category():
+    catalogue = load_catalogue()
+    assert len(catalogue) == 78
+    starts = [catalogue.slices[key].start for key, _ in catalogue.categories]
+    assert starts == sorted(starts) and starts[0] == 0
+    dime = catalogue.names.index("10c Dime (1892-1964)")
+    assert catalogue.fine_oz[dime] == pytest.approx(2.5 * 0.9 / 31.1034768)
+
+
+def test_user_installs_are_found():
+    # pip install --user puts data_files under the user base
+    assert os.path.join(site.getuserbase(), "share", "silver-tracker", "coins.csv") in DEFAULT_CATALOGUE_PATHS
+
+
+def test_environment_override(tmp_path, monkeypatch):
+    path = tmp_path / "mine.json"
+    path.write_text(json.dumps([{"category": "bars", "name": "10 oz bar", "weight_g": 311.034768, "purity": 1}]))
+    monkeypatch.setenv("SILVER_TRACKER_CATALOGUE", str(path))
+    catalogue = load_catalogue()
+    assert catalogue.categories == [("bars", "BARS")]
+    np.testing.assert_allclose(catalogue.fine_oz, [10.0])
+
+
+def test_missing_catalogue_says_where_it_looked(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracker_catalogue, "DEFAULT_CATALOGUE_PATHS", [str(tmp_path / "coins.csv")])
+    with pytest.raises(FileNotFoundError, match="SILVER_TRACKER_CATALOGUE") as error:
+        load_catalogue()
+    assert str(tmp_path) in str(error.value)
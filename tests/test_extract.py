@@ -0,0 +1,76 @@
+"""APMEX extraction: the fast pattern path must agree with the BeautifulSoup DOM path."""
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+import tracker_core as core
+from tracker_extract import extract_apmex_price, extract_apmex_prices, hidden_spans
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks", "fixtures")
+METALS = [{"name": m["name"], "search_term": m["search_term"]} for m in core.METALS_CONFIG]
+SILVER = [m for m in METALS if m["name"] == "Silver"]
+
+PAGE = """<html><head><title>Silver Price Per Ounce</title>
+<style>td:before {{ content: "Silver Price Per Ounce"; }}</style>
+<script>var cfg = "<td>Silver Price Per Ounce</td><td>$1.00</td>";</script>
+</head><body>
+{before}
+<table><tr><th>Silver Price Per Ounce</th>{between}<td class="price">$31.20 USD</td></tr></table>
+</body></html>"""
+
+
+def dom_prices(content, metals):
+    soup = BeautifulSoup(content, "html.parser")
+    prices = {}
+    for metal in metals:
+        price = extract_apmex_price(soup, metal["search_term"])
+        if price:
+            prices[metal["name"]] = price
+    return prices
+
+
+def fast_prices(content, metals):
+    """extract_apmex_prices() with the DOM fallback ruled out."""
+    prices = extract_apmex_prices(content, metals)
+    assert len(prices) == len(metals), "fell back to the DOM parse"
+    return prices
+
+
+@pytest.mark.parametrize("fixture, metals", [("apmex_spotprices.html", METALS),
+                                             ("apmex_silver_price.html", SILVER)])
+def test_fixtures_agree_with_the_dom_parse(fixture, metals):
+    with open(os.path.join(FIXTURES_DIR, fixture), "rb") as f:
+        content = f.read()
+    assert fast_prices(content, metals) == dom_prices(content, metals)
+
+
+@pytest.mark.parametrize("before, between", [
+    ("", ""),
+    ("<!-- <p>Silver Price Per Ounce</p><table><td>$9.99</td></table> -->", ""),
+    ("<script type='text/template'><b>Silver Price Per Ounce</b> <td>$9.99</td></script>", ""),
+    ("<SCRIPT>document.write('<i>Silver Price Per Ounce</i><td>$9.99</td>')</SCRIPT>", ""),
+    ("", "<!-- <td>$9.99</td> -->"),
+    ("", "<script>x = '<td>$9.99</td>'</script>"),
+    ("<!-- unclosed --> <!---->", "<!--<td>$9.99</td>-->"),
+])
+def test_decoys_in_comments_and_scripts_are_skipped(before, between):
+    content = PAGE.format(before=before, between=between).encode("utf-8")
+    assert fast_prices(content, SILVER) == dom_prices(content, SILVER) == {"Silver": "$31.20"}
+
+
+def test_comments_inside_the_cell_are_dropped():
+    content = PAGE.format(before="", between="").replace("$31.20", "<!-- $9.99 -->$31.20").encode("utf-8")
+    assert fast_prices(content, SILVER) == dom_prices(content, SILVER) == {"Silver": "$31.20"}
+
+
+def test_label_only_in_hidden_markup_falls_back_to_the_dom():
+    content = b"<html><!-- <b>Silver Price Per Ounce</b><td>$9.99</td> --><p>Silver Price Per Ounce</p></html>"
+    assert extract_apmex_prices(content, SILVER) == dom_prices(content, SILVER) == {}
+
+
+def test_hidden_spans_cover_whole_blocks():
+    content = b"a<!-- x -->b<Script src=1></script >c<style>p{}</STYLE>d<!-- open"
+    starts, ends = hidden_spans(content)
+    assert [content[s:e] for s, e in zip(starts, ends)] == [
+        b"<!-- x -->", b"<Script src=1></script >", b"<style>p{}</STYLE>", b"<!-- open"]
@@ -0,0 +1,70 @@
+"""PriceHistory: raw quotes, OHLC rollup upserts and series() resolution choice."""
+import os
+
+import pytest
+
+from tracker_history import PriceHistory
+
+DAY = 86400
+T0 = 1_700_006_400          # a UTC midnight, so every rollup bucket starts here
+
+
+@pytest.fixture
+def history():
+    store = PriceHistory(":memory:")
+    yield store
+    store.close()
+
+
+def test_database_is_opened_on_first_use(tmp_path):
+    path = tmp_path / "nested" / "history.db"
+    store = PriceHistory(str(path))
+    assert not path.parent.exists()
+    store.record([("Silver", 30.0, "primary")], ts=T0)
+    assert os.path.exists(path)
+    store.close()
+    assert PriceHistory(str(path)).quotes("Silver", T0, T0 + 1) == [(T0, 30.0, "primary")]
+
+
+def test_quotes_keep_the_first_price_per_second_and_skip_bad_prices(history):
+    history.record([("Silver", 30.0, "primary"), ("Gold", 2300.0, "fallback"), ("Platinum", 0.0, "primary")], ts=T0)
+    history.record([("Silver", 99.0, "manual")], ts=T0)               # same second: ignored
+    history.record([("Silver", 30.5, "manual")], ts=T0 + 1)
+    assert history.quotes("Silver", T0, T0 + 60) == [(T0, 30.0, "primary"), (T0 + 1, 30.5, "manual")]
+    assert history.quotes("Silver", T0 + 1, T0 + 60) == [(T0 + 1, 30.5, "manual")]     # start inclusive
+    assert history.quotes("Silver", T0, T0 + 1) == [(T0, 30.0, "primary")]              # end exclusive
+    assert history.quotes("Platinum", T0, T0 + 60) == []
+
+
+def test_rollup_buckets_are_upserted_as_ohlc(history):
+    for offset, price in ((0, 30.0), (10, 31.5), (20, 29.0), (59, 30.25), (60, 32.0)):
+        history.record([("Silver", price, "primary")], ts=T0 + offset)
+    history.record([("Silver", 50.0, "primary")], ts=T0 + 10)         # duplicate second: not counted
+
+    assert history.rollup("Silver", 60, T0, T0 + 120) == [
+        (T0, 30.0, 31.5, 29.0, 30.25, 4),
+        (T0 + 60, 32.0, 32.0, 32.0, 32.0, 1),
+    ]
+    assert history.rollup("Silver", 3600, T0, T0 + 3600) == [(T0, 30.0, 32.0, 29.0, 32.0, 5)]
+    assert history.rollup("Silver", DAY, T0, T0 + DAY) == [(T0, 30.0, 32.0, 29.0, 32.0, 5)]
+    # A start inside a bucket still returns the bucket it falls in
+    assert [row[0] for row in history.rollup("Silver", 60, T0 + 30, T0 + 120)] == [T0, T0 + 60]
+    with pytest.raises(ValueError):
+        history.rollup("Silver", 300, T0, T0 + 600)
+
+
+def test_series_uses_the_finest_rollup_that_fits(history):
+    for hour in range(48):
+        for minute in (0, 30):
+            ts = T0 + hour * 3600 + minute * 60
+            history.record([("Silver", 30.0 + hour + minute / 100, "primary")], ts=ts)
+
+    two_hours = history.series("Silver", T0, T0 + 7200)
+    assert two_hours == [(T0, 30.0), (T0 + 1800, 30.3), (T0 + 3600, 31.0), (T0 + 5400, 31.3)]   # minutes
+
+    two_days = history.series("Silver", T0, T0 + 2 * DAY, max_points=100)
+    assert len(two_days) == 48 and two_days[1] == (T0 + 3600, 31.3)                 # hourly closes
+
+    assert history.series("Silver", T0, T0 + 2 * DAY, max_points=10) == [(T0, 53.3), (T0 + DAY, 77.3)]   # days
+    # Spans too long for any resolution fall back to the coarsest
+    assert len(history.series("Silver", T0, T0 + 400 * DAY, max_points=1)) == 2
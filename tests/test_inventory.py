@@ -0,0 +1,127 @@
+"""Inventory: incremental revaluation, running group totals and the CLI --by report."""
+import json
+
+import numpy as np
+import pytest
+
+import tracker_cli
+import tracker_core as core
+from tracker_catalogue import Catalogue
+from tracker_inventory import CONST_GRAMS_PER_OZ, GROUPS, Inventory
+from tracker_quote import Quote
+
+
+@pytest.fixture
+def catalogue():
+    return Catalogue([
+        {"category": "us", "category_title": "US", "name": "Dime", "metal": "Silver", "weight_g": 2.5, "purity": 0.9},
+        {"category": "us", "category_title": "US", "name": "Eagle", "metal": "Gold", "weight_g": 33.93, "purity": 0.9167},
+        {"category": "ca", "category_title": "Canada", "name": "Dime", "metal": "Silver", "weight_g": 2.33, "purity": 0.8},
+    ])
+
+
+@pytest.fixture
+def inventory(catalogue):
+    return Inventory([
+        {"coin": "Dime", "category": "us", "quantity": "100"},
+        {"coin": "Eagle", "quantity": "2"},
+        {"coin": "Dime", "category": "ca", "quantity": "50"},
+        {"metal": "Silver", "weight_g": "31.1034768", "purity": "1", "quantity": "10", "label": "Bar"},
+        {"metal": "Platinum", "weight_g": "31.1034768", "purity": "0.9995", "country": "Canada"},
+    ], catalogue)
+
+
+def expected_values(inventory, spot):
+    return np.array([inventory.fine_oz[i] * spot[inventory.metals[inventory.metal_index[i]]]
+                     for i in range(len(inventory))])
+
+
+def test_lots_resolve_catalogue_coins_and_free_form_items(inventory, catalogue):
+    assert inventory.labels == ["Dime", "Eagle", "Dime", "Bar", "31.1035 g Platinum @ 0.9995"]
+    assert inventory.fine_oz[0] == pytest.approx(100 * 2.5 * 0.9 / CONST_GRAMS_PER_OZ)
+    assert inventory.fine_oz[3] == pytest.approx(10.0)
+    with pytest.raises(ValueError, match="ambiguous"):
+        Inventory([{"coin": "Dime"}], catalogue)
+    with pytest.raises(ValueError, match="unknown"):
+        Inventory([{"coin": "Penny"}], catalogue)
+
+
+def test_revalue_only_recomputes_lots_whose_price_moved(inventory):
+    spot = {"Silver": 30.0, "Gold": 2300.0, "Platinum": 1000.0}
+    assert inventory.revalue(spot) == 5
+    np.testing.assert_allclose(inventory.values, expected_values(inventory, spot))
+
+    assert inventory.revalue(spot) == 0                       # nothing moved
+    spot["Gold"] = 2400.0
+    before = inventory.values.copy()
+    assert inventory.revalue(spot) == 1                       # only the gold lot
+    assert inventory.values[1] == pytest.approx(inventory.fine_oz[1] * 2400.0)
+    np.testing.assert_array_equal(np.delete(inventory.values, 1), np.delete(before, 1))
+
+    spot["Silver"] = 31.0
+    assert inventory.revalue(spot) == 3                       # the three silver lots
+    np.testing.assert_allclose(inventory.values, expected_values(inventory, spot))
+    assert inventory.total_value == pytest.approx(inventory.values.sum())
+
+
+def test_edited_quantities_are_revalued_with_unchanged_prices(inventory):
+    spot = {"Silver": 30.0, "Gold": 2300.0, "Platinum": 1000.0}
+    inventory.revalue(spot)
+    inventory.set_quantity(3, 20)
+    assert inventory.revalue(spot) == 1
+    assert inventory.values[3] == pytest.approx(600.0)
+    assert inventory.total_value == pytest.approx(inventory.values.sum())
+
+
+def test_missing_prices_leave_lots_unpriced_and_out_of_the_totals(inventory):
+    inventory.revalue({"Silver": 30.0, "Gold": 2300.0, "Platinum": 1000.0})
+    assert inventory.revalue({"Silver": 30.0, "Gold": 2300.0, "Platinum": float("nan")}) == 1
+    assert inventory.unpriced == 1
+    assert inventory.total_value == pytest.approx(np.nansum(inventory.values))
+
+    assert inventory.revalue({"Silver": 30.0, "Gold": 2300.0, "Platinum": 1000.0}) == 1
+    assert inventory.unpriced == 0
+
+
+def test_totals_by_each_group(inventory):
+    spot = {"Silver": 30.0, "Gold": 2300.0, "Platinum": 1000.0}
+    inventory.revalue(spot)
+    spot["Silver"] = 25.0
+    inventory.revalue(spot)                                    # totals are kept by deltas
+    values = inventory.values
+
+    by = {dim: {group: (lots, oz, value) for group, lots, oz, value in inventory.totals(dim)} for dim in GROUPS}
+    assert by["country"].keys() == {"US", "Canada", "Other"}
+    assert by["country"]["Canada"][0] == 2
+    assert by["country"]["Canada"][2] == pytest.approx(values[2] + values[4])
+    assert by["metal"]["Silver"] == (3, pytest.approx(inventory.fine_oz[[0, 2, 3]].sum()),
+                                     pytest.approx(values[[0, 2, 3]].sum()))
+    assert by["purity"][0.9][2] == pytest.approx(values[0])
+    assert by["purity"][1.0][2] == pytest.approx(values[3])
+
+    for dim in GROUPS:
+        rows = inventory.totals(dim)
+        assert [row[3] for row in rows] == sorted((row[3] for row in rows), reverse=True)
+        assert sum(row[1] for row in rows) == len(inventory)
+        assert sum(row[3] for row in rows) == pytest.approx(inventory.total_value)
+
+    running = {dim: [row[3] for row in inventory.totals(dim)] for dim in GROUPS}
+    inventory.recompute_totals()
+    for dim in GROUPS:
+        assert [row[3] for row in inventory.totals(dim)] == pytest.approx(running[dim])
+
+
+def test_cli_groups_the_holdings_file(tmp_path, monkeypatch, capsys):
+    holdings = tmp_path / "holdings.csv"
+    holdings.write_text("coin,category,quantity\n10c Dime (1892-1964),us,100\n"
+                        "25c Quarter (1892-1964),us,40\n", encoding="utf-8")
+    data = core.build_data({"Gold": Quote(2300.0, "test"), "Silver": Quote(30.0, "test"),
+                            "Platinum": Quote(998.4, "test"), "Palladium": Quote(1012.75, "test")})
+    monkeypatch.setattr(core, "get_all_data", lambda timeout=None: data)
+
+    assert tracker_cli.main(["inventory", str(holdings), "--by", "purity", "--format", "json"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["by"] == "purity"
+    assert [(g["group"], g["lots"]) for g in report["groups"]] == [(0.9, 2)]
+    oz = (100 * 2.5 + 40 * 6.25) * 0.9 / CONST_GRAMS_PER_OZ
+    assert report["total"]["value_usd"] == pytest.approx(oz * 30.0, abs=0.01)
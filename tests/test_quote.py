@@ -0,0 +1,66 @@
+"""Quote: parsing legacy display strings, JSON round trips and spot rows in build_data."""
+import math
+
+import numpy as np
+import pytest
+
+import tracker_core as core
+from tracker_quote import CACHED, FALLBACK, MANUAL, UNAVAILABLE, Quote
+
+
+@pytest.mark.parametrize("text, value, flags, source", [
+    ("$31.20", 31.2, 0, ""),
+    ("$1,234.50", 1234.5, 0, ""),
+    ("$31.20 *", 31.2, FALLBACK, ""),
+    ("$30.00 (Manual)", 30.0, MANUAL, "manual"),
+])
+def test_parse_keeps_the_value_and_the_marker(text, value, flags, source):
+    quote = Quote.parse(text, timestamp=5.0)
+    assert quote.value == pytest.approx(value)
+    assert (quote.flags, quote.source, quote.timestamp) == (flags, source, 5.0)
+    assert quote.available
+    assert quote.text() == text
+
+
+@pytest.mark.parametrize("text", ["Unavailable", "Error", "$0.00 *", "", "N/A (Manual)"])
+def test_parse_without_a_positive_price_is_unavailable(text):
+    quote = Quote.parse(text)
+    assert not quote.available and quote.flags == UNAVAILABLE
+    assert math.isnan(quote.value)
+    assert quote.text() == "Unavailable"
+
+
+def test_kind_and_marker_follow_the_flags():
+    assert (Quote(31.2, "apmex").kind, Quote(31.2, "apmex").marker) == ("primary", "")
+    fallback = Quote(31.2, "kitco", flags=FALLBACK | CACHED)
+    assert (fallback.kind, fallback.marker, fallback.is_fallback) == ("fallback", " *", True)
+    manual = Quote.manual(30)
+    assert (manual.kind, manual.marker, manual.is_manual) == ("manual", " (Manual)", True)
+    assert manual.with_flags(FALLBACK).kind == "manual"      # manual wins over fallback
+
+
+def test_json_round_trip_and_legacy_strings():
+    quote = Quote(31.2, "kitco", 1_700_000_000.0, FALLBACK)
+    again = Quote.from_json(quote.to_json())
+    assert (again.value, again.source, again.timestamp, again.flags) == (31.2, "kitco", 1_700_000_000.0, FALLBACK)
+
+    assert Quote.unavailable().to_json()["value"] is None
+    assert not Quote.from_json(Quote.unavailable().to_json()).available
+    assert Quote.from_json("$30.00 (Manual)").is_manual
+
+
+@pytest.mark.parametrize("silver", ["$30.00 (Manual)", "$30.00 *"])
+def test_build_data_keeps_manual_and_fallback_spot_prices(silver):
+    data = core.build_data({"Gold": Quote.parse("$2,300.00 *"),
+                            "Silver": Quote.parse(silver),
+                            "Platinum": Quote(998.4, "apmex"),
+                            "Palladium": Quote.unavailable()})
+    spot = {row["name"]: row["price_usd"] for row in data["spot"]}
+    assert spot["Gold"] == pytest.approx(2300.0)
+    assert spot["Silver"] == pytest.approx(30.0)
+    assert spot["Platinum"] == pytest.approx(998.4)
+    assert math.isnan(spot["Palladium"])
+
+    silver_coins = np.array(core.CATALOGUE.metals)[core.CATALOGUE.metal_index] == "Silver"
+    assert silver_coins.any()
+    np.testing.assert_allclose(data["coin_usd"][silver_coins], core.CATALOGUE.fine_oz[silver_coins] * 30.0)
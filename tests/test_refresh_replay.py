@@ -0,0 +1,135 @@
+"""Whole refreshes (get_all_data / fetch_all_prices) replayed from benchmarks/fixtures/replay_refresh.json."""
+import json
+import math
+import os
+import time
+
+import pytest
+
+import tracker_core as core
+from tracker_quote import FALLBACK, UNAVAILABLE
+from tracker_sources import SourceRegistry
+
+RECORDING = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks", "fixtures",
+                         "replay_refresh.json")
+METALS = [m["name"] for m in core.METALS_CONFIG]
+
+
+@pytest.fixture
+def replay(monkeypatch):
+    """Installs the recording with a fault spec and returns the [(url, timeout)] requests it answers.
+
+    Every test starts with an empty price cache and fresh source health.
+    """
+    monkeypatch.setattr(core, "SOURCE_HEALTH", SourceRegistry())
+    requests = []
+
+    def install(faults=None, recording=RECORDING):
+        transport = core.configure_transport(None, recording, faults)
+        get = transport.get
+
+        def traced(url, timeout, **kwargs):
+            requests.append((url, timeout))
+            return get(url, timeout, **kwargs)
+        monkeypatch.setattr(transport, "get", traced)
+        return requests
+    yield install
+    core.HTTP_SESSIONS.transport = None
+
+
+@pytest.fixture
+def batch_page(monkeypatch):
+    """Turns on APMEX's combined spot price page (APMEX_BATCH_PAGE)."""
+    monkeypatch.setattr(core.PRICE_SOURCES[0], "batch", core.fetch_prices_primary_batch)
+
+
+def without_url(url, tmp_path):
+    """A copy of the recording with `url` left out (so replaying it answers 404)."""
+    with open(RECORDING, encoding="utf-8") as f:
+        recording = json.load(f)
+    base = os.path.dirname(os.path.abspath(RECORDING))
+    recording["entries"] = [dict(entry, body_file=os.path.join(base, entry["body_file"]))
+                            if "body_file" in entry else entry
+                            for entry in recording["entries"] if entry["url"] != url]
+    path = tmp_path / "recording.json"
+    path.write_text(json.dumps(recording), encoding="utf-8")
+    return str(path)
+
+
+def apmex_urls(requests):
+    return [url for url, _ in requests if "apmex.com" in url]
+
+
+def spot_quotes(data):
+    return {row["name"]: row["quote"] for row in data["spot"]}
+
+
+def test_recorded_refresh_uses_apmex(replay):
+    requests = replay()
+    quotes = spot_quotes(core.get_all_data())
+
+    assert set(quotes) == set(METALS)
+    assert {q.source for q in quotes.values()} == {"apmex"}
+    assert all(q.flags == 0 and q.value > 0 for q in quotes.values())
+    assert quotes["Silver"].value == pytest.approx(31.2)
+    # One page per metal unless the combined page is turned on
+    assert sorted(apmex_urls(requests)) == sorted(m["url"] for m in core.METALS_CONFIG)
+
+
+def test_batch_page_covers_every_metal(replay, batch_page):
+    requests = replay()
+    quotes = spot_quotes(core.get_all_data())
+
+    assert all(q.source == "apmex" and q.flags == 0 for q in quotes.values())
+    assert apmex_urls(requests) == [core.APMEX_SPOT_PRICES_URL]
+
+
+def test_apmex_forbidden_falls_back(replay):
+    requests = replay("apmex.com:forbidden=1")
+    quotes = spot_quotes(core.get_all_data())
+
+    assert all(q.available for q in quotes.values())
+    assert all(q.flags == FALLBACK and q.source != "apmex" for q in quotes.values())
+    assert len(apmex_urls(requests)) == len(METALS)
+
+
+def test_forbidden_batch_page_is_not_retried_per_metal(replay, batch_page):
+    requests = replay("apmex.com:forbidden=1")
+    quotes = spot_quotes(core.get_all_data())
+
+    assert all(q.flags == FALLBACK and q.source != "apmex" for q in quotes.values())
+    assert apmex_urls(requests) == [core.APMEX_SPOT_PRICES_URL]
+
+
+def test_failed_batch_page_falls_back_to_per_metal_pages(replay, batch_page, tmp_path):
+    requests = replay(recording=without_url(core.APMEX_SPOT_PRICES_URL, tmp_path))
+    quotes = spot_quotes(core.get_all_data())
+
+    assert all(q.source == "apmex" and q.flags == 0 for q in quotes.values())
+    assert sorted(apmex_urls(requests)) == sorted([core.APMEX_SPOT_PRICES_URL] +
+                                                  [m["url"] for m in core.METALS_CONFIG])
+
+
+def test_every_source_failing_leaves_metals_unavailable(replay):
+    replay("error=1")
+    prices = core.fetch_all_prices(time.monotonic() + core.REFRESH_DEADLINE)
+
+    assert set(prices) == set(METALS)
+    for quote in prices.values():
+        assert not quote.available
+        assert quote.flags == UNAVAILABLE
+        assert math.isnan(quote.value)
+
+
+def test_hanging_sources_are_cut_off_at_the_deadline(replay):
+    # Exchange rates are answered normally; they are not a price source and keep their own timeout
+    requests = replay("timeout=1,open.er-api.com:timeout=0")
+    start = time.monotonic()
+    quotes = spot_quotes(core.get_all_data(timeout=0.5))
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.5 + 0.5
+    assert all(q.flags == UNAVAILABLE for q in quotes.values())
+    # Source requests time out by the deadline instead of holding their workers for 8-10 s
+    sources = [timeout for url, timeout in requests if "er-api.com" not in url]
+    assert sources and max(sources) <= 0.5
@@ -0,0 +1,67 @@
+"""ScenarioGrid: price sweeps, per-currency tables and the streamed CSV export."""
+import csv
+import io
+
+import numpy as np
+import pytest
+
+import tracker_scenario
+from tracker_catalogue import Catalogue
+from tracker_scenario import MAX_CELLS, ScenarioGrid, price_steps
+
+RATES = {"USD": 1.0, "GBP": 0.8, "EUR": 0.9}
+
+
+@pytest.fixture
+def catalogue():
+    return Catalogue([
+        {"category": "dimes", "name": "Dime", "metal": "Silver", "weight_g": 2.5, "purity": 0.9},
+        {"category": "dimes", "name": "Dime, \"Mercury\"", "metal": "Silver", "weight_g": 2.5, "purity": 0.9},
+        {"category": "bullion", "name": "Eagle", "metal": "Gold", "weight_g": 33.93, "purity": 0.9167},
+        {"category": "bullion", "name": "Silver Eagle", "metal": "Silver", "weight_g": 31.103, "purity": 0.999},
+    ])
+
+
+def test_price_steps_include_both_ends():
+    assert price_steps(20, 21, 0.25).tolist() == [20.0, 20.25, 20.5, 20.75, 21.0]
+    assert price_steps(20, 20.9, 0.5).tolist() == [20.0, 20.5]
+    with pytest.raises(ValueError):
+        price_steps(20, 10, 1)
+
+
+def test_huge_sweeps_are_refused_before_allocating():
+    with pytest.raises(ValueError, match="too many"):
+        price_steps(0, MAX_CELLS, 0.5)
+
+
+def test_tables_are_the_usd_grid_times_the_rate(catalogue):
+    grid = ScenarioGrid(catalogue, price_steps(20, 30, 5), RATES)
+    assert [catalogue.names[i] for i in grid.rows] == ["Dime", "Dime, \"Mercury\"", "Silver Eagle"]
+    assert grid.usd.shape == (3, 3)
+    np.testing.assert_allclose(grid.table("USD"), np.outer(catalogue.fine_oz[grid.rows], [20, 25, 30]))
+    np.testing.assert_allclose(grid.table("GBP"), grid.usd * 0.8)
+    np.testing.assert_allclose(grid.table("EUR", slice(1, 3), [0, 2]), grid.usd[1:3][:, [0, 2]] * 0.9)
+
+
+def test_grid_size_limit_ignores_the_number_of_currencies(catalogue, monkeypatch):
+    monkeypatch.setattr(tracker_scenario, "MAX_CELLS", 9)
+    ScenarioGrid(catalogue, [20, 25, 30], RATES)          # 3 coins x 3 prices, in 3 currencies
+    with pytest.raises(ValueError, match="too large"):
+        ScenarioGrid(catalogue, [20, 25, 30, 35], RATES)
+
+
+def test_csv_export_is_the_same_in_any_block_size(catalogue, monkeypatch):
+    grid = ScenarioGrid(catalogue, price_steps(20, 30, 2.5), RATES)
+    whole = io.StringIO()
+    grid.write_csv(whole)
+    monkeypatch.setattr(tracker_scenario, "CSV_BLOCK_CELLS", 1)
+    blocks = io.StringIO()
+    grid.write_csv(blocks)
+    assert blocks.getvalue() == whole.getvalue()
+
+    rows = list(csv.reader(io.StringIO(whole.getvalue())))
+    assert rows[0] == ["currency", "category", "name", "metal", "fine_oz", "20", "22.5", "25", "27.5", "30"]
+    assert len(rows) == 1 + 3 * len(RATES)
+    gbp = [row for row in rows if row[0] == "GBP"]
+    assert [row[2] for row in gbp] == ["Dime", "Dime, \"Mercury\"", "Silver Eagle"]
+    assert [float(v) for v in gbp[2][5:]] == pytest.approx(grid.table("GBP")[2].round(2).tolist())
@@ -0,0 +1,79 @@
+"""RefreshScheduler: steady cadence, failure backoff, idle stretch and jitter."""
+import pytest
+
+import tracker_core as core
+import tracker_schedule
+from tracker_quote import FALLBACK, Quote
+from tracker_schedule import RefreshScheduler, refresh_outcome
+
+
+@pytest.fixture
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(tracker_schedule.random, "uniform", lambda a, b: 0.0)
+
+
+def run(scheduler, ok, fingerprint=None, now=0.0, took=0.0):
+    scheduler.start(now)
+    return scheduler.finish(ok, fingerprint, now=now + took)
+
+
+def test_delay_is_timed_from_the_start_of_the_refresh(no_jitter):
+    scheduler = RefreshScheduler(interval=60.0)
+    assert run(scheduler, True, "a", now=1000.0, took=5.0) == pytest.approx(55.0)
+    assert run(scheduler, True, "b", now=1060.0, took=75.0) == 0.0         # overran: start straight away
+
+
+def test_failures_double_the_interval_up_to_the_cap(no_jitter):
+    scheduler = RefreshScheduler(interval=60.0, max_interval=900.0)
+    delays = [run(scheduler, False) for _ in range(6)]
+    assert delays == [120.0, 240.0, 480.0, 900.0, 900.0, 900.0]
+
+    assert run(scheduler, True, "a") == 60.0                                 # one success resets it
+    assert scheduler.failures == 0
+
+
+def test_a_long_outage_stays_at_the_cap(no_jitter):
+    scheduler = RefreshScheduler(interval=60.0, max_interval=900.0)
+    scheduler.failures = 5000
+    assert scheduler.current_interval() == 900.0
+    scheduler.failures, scheduler.unchanged = 0, 5000
+    assert scheduler.current_interval() == 900.0
+
+
+def test_unchanged_prices_stretch_the_interval(no_jitter):
+    scheduler = RefreshScheduler(interval=60.0, max_interval=900.0, idle_after=3, idle_factor=1.5)
+    delays = [run(scheduler, True, "same") for _ in range(10)]
+    # The first sets the fingerprint; the next two are unchanged but under idle_after
+    assert delays[:4] == [60.0, 60.0, 60.0, pytest.approx(90.0)]
+    assert delays[4:6] == [pytest.approx(135.0), pytest.approx(202.5)]
+    assert delays[-1] == 900.0
+
+    assert run(scheduler, True, "moved") == 60.0
+    assert run(scheduler, False) == 120.0                                    # failures take precedence
+    assert scheduler.unchanged == 0
+
+
+def test_jitter_stays_within_bounds():
+    scheduler = RefreshScheduler(interval=60.0, jitter=0.1)
+    delays = [run(scheduler, True, n) for n in range(500)]
+    assert all(54.0 <= d <= 66.0 for d in delays)
+    assert max(delays) - min(delays) > 6.0                                   # it does vary
+
+    steady = RefreshScheduler(interval=60.0, jitter=0.0)
+    assert {run(steady, True, n) for n in range(20)} == {60.0}
+
+
+def test_outcome_fingerprint_follows_prices_and_fallbacks():
+    def data(silver):
+        return core.build_data({"Gold": Quote(2300.0, "apmex"), "Silver": silver,
+                                "Platinum": Quote.unavailable(), "Palladium": Quote.unavailable()})
+
+    ok, first = refresh_outcome(data(Quote(30.0, "apmex")))
+    assert ok
+    assert refresh_outcome(data(Quote(30.0, "apmex", timestamp=5.0)))[1] == first
+    assert refresh_outcome(data(Quote(30.0, "kitco", flags=FALLBACK)))[1] != first
+    assert refresh_outcome(data(Quote(30.1, "apmex")))[1] != first
+    assert refresh_outcome(None) == (False, None)
+
+    none = core.build_data({m["name"]: Quote.unavailable() for m in core.METALS_CONFIG})
+    assert refresh_outcome(none)[0] is False
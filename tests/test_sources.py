@@ -0,0 +1,99 @@
+"""SourceRegistry: circuit breaker states, latency EWMA and ranking."""
+import pytest
+
+import tracker_sources
+from tracker_sources import SourceRegistry
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable stand-in for time.time() in tracker_sources."""
+    class Clock:
+        now = 1_000_000.0
+
+        def advance(self, seconds):
+            self.now += seconds
+
+    clock = Clock()
+    monkeypatch.setattr(tracker_sources.time, "time", lambda: clock.now)
+    return clock
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    registry = SourceRegistry(failure_threshold=2, base_cooldown=30.0)
+    registry.record_failure("kitco", 0.5, "boom")
+    assert registry.order(["kitco", "goldapi"]) == ["goldapi", "kitco"]   # one failure: still tried
+    assert registry.cooldown_remaining("kitco") == 0.0
+
+    registry.record_failure("kitco", 0.5, "boom")
+    assert registry.order(["kitco", "goldapi"]) == ["goldapi"]
+    assert registry.cooldown_remaining("kitco") == pytest.approx(30.0)
+
+
+def test_breaker_half_opens_after_cooldown_and_closes_on_success(clock):
+    registry = SourceRegistry(failure_threshold=2, base_cooldown=30.0)
+    registry.record_success("goldapi", 0.2)
+    for _ in range(2):
+        registry.record_failure("kitco", 0.5, "boom")
+
+    clock.advance(29.0)
+    assert "kitco" not in registry.order(["kitco", "goldapi"])
+    clock.advance(1.0)
+    assert "kitco" in registry.order(["kitco", "goldapi"])     # half-open: one trial attempt
+
+    registry.record_success("kitco", 0.3)
+    health = registry._health["kitco"]
+    assert health.consecutive_failures == 0 and health.cooldown_until == 0.0
+    # Closed again: a single new failure does not reopen it
+    registry.record_failure("kitco", 0.3, "blip")
+    assert "kitco" in registry.order(["kitco", "goldapi"])
+
+
+def test_failed_trial_reopens_with_a_doubled_cooldown(clock):
+    registry = SourceRegistry(failure_threshold=2, base_cooldown=30.0, max_cooldown=100.0)
+    for _ in range(2):
+        registry.record_failure("kitco", 0.5, "boom")
+
+    cooldowns = []
+    for _ in range(3):
+        clock.advance(registry.cooldown_remaining("kitco"))
+        assert "kitco" in registry.order(["kitco"])
+        registry.record_failure("kitco", 0.5, "still down")
+        cooldowns.append(registry.cooldown_remaining("kitco"))
+    assert cooldowns == [pytest.approx(60.0), pytest.approx(100.0), pytest.approx(100.0)]   # capped
+
+
+def test_all_sources_cooling_down_returns_soonest_first(clock):
+    registry = SourceRegistry(failure_threshold=1, base_cooldown=30.0)
+    registry.record_failure("kitco", 0.5, "boom")
+    clock.advance(10.0)
+    registry.record_failure("goldapi", 0.5, "boom")
+    assert registry.order(["goldapi", "kitco"]) == ["kitco", "goldapi"]
+
+
+def test_latency_is_an_exponentially_weighted_average(clock):
+    registry = SourceRegistry(alpha=0.5)
+    registry.record_success("apmex", 1.0)
+    assert registry._health["apmex"].latency == pytest.approx(1.0)    # first sample taken as is
+
+    for expected in (0.6, 0.4, 0.3, 0.25):
+        registry.record_success("apmex", 0.2)
+        assert registry._health["apmex"].latency == pytest.approx(expected)
+
+    # Failures count towards latency too (a timeout is slow)
+    registry.record_failure("apmex", 10.25, "timeout")
+    assert registry._health["apmex"].latency == pytest.approx(5.25)
+
+
+def test_order_prefers_fast_reliable_sources(clock):
+    registry = SourceRegistry(preference_penalty=0.5)
+    registry.record_success("apmex", 2.0)
+    registry.record_success("goldapi", 0.2)
+    # Untried sources come after measured healthy ones, in their given order
+    assert registry.order(["apmex", "goldapi", "kitco", "metals.dev"]) == ["goldapi", "apmex", "kitco", "metals.dev"]
+
+    # Mostly failing sources go last, even when fast
+    registry.record_failure("goldapi", 0.1, "boom")
+    registry.record_failure("goldapi", 0.1, "boom")
+    clock.advance(registry.max_cooldown)
+    assert registry.order(["goldapi", "apmex", "kitco"]) == ["apmex", "kitco", "goldapi"]
@@ -0,0 +1,90 @@
+"""RingBuffer wrap-around, RecentQuotes filtering and LTTB downsampling."""
+import numpy as np
+import pytest
+
+from tracker_history import PriceHistory
+from tracker_quote import FALLBACK, Quote
+from tracker_ticks import RecentQuotes, RingBuffer, lttb, sparkline_coords
+
+
+def spot(**quotes):
+    return {"spot": [{"name": name, "quote": quote} for name, quote in quotes.items()]}
+
+
+def test_ring_buffer_overwrites_the_oldest_quotes():
+    ring = RingBuffer(capacity=4)
+    assert len(ring) == 0 and ring.last_time is None
+    for t in range(3):
+        ring.append(t, 10.0 + t)
+    times, values = ring.arrays()
+    assert times.tolist() == [0, 1, 2] and values.tolist() == [10, 11, 12]
+
+    for t in range(3, 10):
+        ring.append(t, 10.0 + t)
+    times, values = ring.arrays()
+    assert len(ring) == ring.capacity == 4
+    assert times.tolist() == [6, 7, 8, 9] and values.tolist() == [16, 17, 18, 19]
+    assert ring.last_time == 9
+
+    ring.append(10, 20.0)                  # wrapping exactly onto slot 0 keeps the order
+    assert ring.arrays()[0].tolist() == [7, 8, 9, 10]
+    times[0] = -1                          # arrays() hands out copies
+    assert ring.arrays()[0][0] == 7
+
+
+def test_recent_quotes_skip_cached_manual_and_unavailable_quotes():
+    recent = RecentQuotes(["Silver", "Gold"], capacity=8)
+    recent.record(spot(Silver=Quote(30.0, "apmex", 100.0), Gold=Quote.unavailable()))
+    recent.record(spot(Silver=Quote(30.0, "apmex", 100.0), Gold=Quote(2300.0, "kitco", 100.0, FALLBACK)))
+    recent.record(spot(Silver=Quote.manual(99.0), Platinum=Quote(998.4, "apmex", 160.0)))
+    recent.record(spot(Silver=Quote(30.5, "apmex", 160.0)))
+    assert recent.series("Silver")[0].tolist() == [100.0, 160.0]
+    assert recent.series("Gold")[1].tolist() == [2300.0]
+
+
+def test_seed_fills_only_empty_buffers_from_history():
+    history = PriceHistory(":memory:")
+    for ts in range(100, 110):
+        history.record([("Silver", 30.0 + ts / 100, "primary"), ("Gold", 2300.0, "primary")], ts=ts)
+    recent = RecentQuotes(["Silver", "Gold"], capacity=4)
+    recent.record(spot(Gold=Quote(2400.0, "apmex", 200.0)))
+    recent.seed(history, 0, 1000)
+    assert recent.series("Silver")[0].tolist() == [106, 107, 108, 109]      # the newest that fit
+    assert recent.series("Gold")[1].tolist() == [2400.0]
+    history.close()
+
+
+def test_lttb_keeps_the_endpoints_and_returns_threshold_points():
+    rng = np.random.default_rng(7)
+    x = np.arange(1000, dtype=np.float64)
+    y = np.cumsum(rng.normal(size=1000))
+    for threshold in (3, 10, 99, 500, 999):
+        keep = lttb(x, y, threshold)
+        assert len(keep) == threshold
+        assert keep[0] == 0 and keep[-1] == 999
+        assert (np.diff(keep) > 0).all()                 # one point per bucket, in order
+
+    # Too few points, or a threshold that keeps everything: all indices
+    assert lttb(x[:5], y[:5], 10).tolist() == [0, 1, 2, 3, 4]
+    assert lttb(x, y, 1000).tolist() == list(range(1000))
+    assert lttb(x, y, 2).tolist() == list(range(1000))
+
+
+def test_lttb_keeps_a_spike():
+    x = np.arange(200, dtype=np.float64)
+    y = np.zeros(200)
+    y[123] = 50.0
+    y[57] = -20.0
+    keep = lttb(x, y, 12)
+    assert 123 in keep and 57 in keep
+
+
+def test_sparkline_fits_the_box():
+    times = np.arange(500, dtype=np.float64)
+    values = np.sin(times / 40.0)
+    coords = sparkline_coords(times, values, width=60, height=20, pad=2)
+    xs, ys = coords[0::2], coords[1::2]
+    assert len(xs) == 60
+    assert xs[0] == pytest.approx(2) and xs[-1] == pytest.approx(58)
+    assert min(ys) == pytest.approx(2) and max(ys) == pytest.approx(18)
+    assert sparkline_coords(times[:1], values[:1], 60, 20) == []
@@ -0,0 +1,261 @@
+"""Price alerts checked on every refresh.
+
+Rules are one line each, e.g.
+
+    Silver > 35                  silver spot crosses above $35
+    Gold < 2200 EUR              gold spot (in euros) crosses below €2,200
+    Morgan/Peace Dollar > £25    one coin's melt value crosses above £25
+    Gold/Silver < 70             the gold/silver ratio drops below 70
+
+Every rule is reduced to a threshold on a series: a metal's spot price in
+one currency, or a ratio of two spot prices. A coin rule divides its
+threshold by the coin's fine ounces, so a thousand coin rules in GBP all
+sit on the (Silver, GBP) series. Per series and direction the thresholds
+are kept in a sorted array; on each tick the rules crossed between the
+previous and the new value are found with two binary searches, so the cost
+is per crossing rather than per rule.
+
+A rule fires when the value crosses its threshold, not while it stays on
+the far side. The first tick only sets the baseline.
+"""
+import json
+import re
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from tracker_format import CURRENCY_SYMBOLS, get_formatter
+from tracker_metrics import METRICS
+
+ABOVE, BELOW = ">", "<"
+
+_RULE_RE = re.compile(r"^(?P<subject>.+?)\s*(?P<op>[<>])\s*(?P<symbol>[^\d.\s]*)\s*(?P<amount>[\d,]*\.?\d+)"
+                      r"\s*(?P<currency>[A-Za-z]{3})?$")
+_SYMBOLS = {symbol: currency for currency, symbol in CURRENCY_SYMBOLS.items()}
+
+
+class Rule:
+    """One alert: `subject` `op` `amount` (in `currency`), as a threshold on `series`.
+
+    `series` is ("spot", metal, currency) or ("ratio", metal, metal); the
+    subject's value is the series value times `scale` (a coin's fine ounces,
+    else 1).
+    """
+
+    __slots__ = ("text", "subject", "op", "amount", "currency", "series", "scale", "threshold")
+
+    def __init__(self, text, subject, op, amount, currency, series, scale=1.0):
+        self.text = text
+        self.subject = subject
+        self.op = op
+        self.amount = amount
+        self.currency = currency
+        self.series = series
+        self.scale = scale
+        self.threshold = amount / scale
+
+    def format_value(self, value):
+        """The subject's value for `value` on the series, for display."""
+        if self.currency is None:
+            return f"{value * self.scale:,.2f}"
+        return get_formatter(self.currency)(value * self.scale)
+
+    def __repr__(self):
+        return f"Rule({self.text!r})"
+
+
+class Alert:
+    """A rule that fired: the series moved from `previous` to `value` at `time`."""
+
+    __slots__ = ("rule", "previous", "value", "time")
+
+    def __init__(self, rule, previous, value, at=None):
+        self.rule = rule
+        self.previous = previous
+        self.value = value
+        self.time = time.time() if at is None else at
+
+    def message(self):
+        rule = self.rule
+        direction = "above" if rule.op == ABOVE else "below"
+        return (f"{rule.subject} crossed {direction} {rule.format_value(rule.threshold)} "
+                f"(now {rule.format_value(self.value)})")
+
+    def as_dict(self):
+        rule = self.rule
+        return {"rule": rule.text, "subject": rule.subject, "op": rule.op, "threshold": rule.amount,
+                "currency": rule.currency, "previous": round(self.previous * rule.scale, 4),
+                "value": round(self.value * rule.scale, 4), "time": self.time, "message": self.message()}
+
+
+def parse_rule(text, catalogue, metals):
+    """A Rule from one line such as "Silver > 35" or "Morgan/Peace Dollar > £25"; ValueError if invalid."""
+    match = _RULE_RE.match(text.strip())
+    if match is None:
+        raise ValueError(f"not a rule (expected e.g. 'Silver > 35'): {text.strip()!r}")
+    subject = re.sub(r"\s+melt(\s+value)?$", "", match["subject"].strip(), flags=re.IGNORECASE)
+    op = match["op"]
+    amount = float(match["amount"].replace(",", ""))
+    by_name = {m.lower(): m for m in metals}
+
+    if subject.count("/") == 1 and all(part.strip().lower() in by_name for part in subject.split("/")):
+        if match["symbol"] or match["currency"]:
+            raise ValueError(f"a ratio has no currency: {text.strip()!r}")
+        a, b = (by_name[part.strip().lower()] for part in subject.split("/"))
+        return Rule(text.strip(), f"{a}/{b} ratio", op, amount, None, ("ratio", a, b))
+
+    if match["currency"]:
+        currency = match["currency"].upper()
+        if currency not in CURRENCY_SYMBOLS:
+            raise ValueError(f"unknown currency {currency}")
+    elif match["symbol"]:
+        currency = _SYMBOLS.get(match["symbol"])
+        if currency is None:
+            raise ValueError(f"unknown currency symbol {match['symbol']!r}")
+    else:
+        currency = "USD"
+
+    if subject.lower() in by_name:
+        metal = by_name[subject.lower()]
+        return Rule(text.strip(), metal, op, amount, currency, ("spot", metal, currency))
+
+    row = find_coin(subject, catalogue)
+    metal = catalogue.metals[catalogue.metal_index[row]]
+    return Rule(text.strip(), catalogue.names[row], op, amount, currency, ("spot", metal, currency),
+                float(catalogue.fine_oz[row]))
+
+
+def find_coin(name, catalogue):
+    """Catalogue row of the coin called `name`.
+
+    Case-insensitive; words that pick out a single coin will do ("morgan dollar").
+    """
+    wanted = name.lower()
+    names = [n.lower() for n in catalogue.names]
+    if wanted in names:
+        return names.index(wanted)
+    words = wanted.split()
+    rows = [i for i, n in enumerate(names) if all(word in n for word in words)]
+    if len(rows) == 1:
+        return rows[0]
+    if not rows:
+        raise ValueError(f"no metal or coin called {name!r}")
+    raise ValueError(f"{name!r} matches {len(rows)} coins, e.g. " + ", ".join(catalogue.names[i] for i in rows[:3]))
+
+
+class AlertEngine:
+    """Indexed alert rules, checked against each new snapshot with check()."""
+
+    def __init__(self, catalogue, metals):
+        self.catalogue = catalogue
+        self.metals = list(metals)
+        self.rules = []
+        self._index = None      # (series, op) -> (sorted thresholds, rules in the same order)
+        self._last = {}         # series -> value at the previous tick
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.rules)
+
+    def add(self, text):
+        rule = parse_rule(text, self.catalogue, self.metals)
+        with self._lock:
+            self.rules.append(rule)
+            self._index = None
+        return rule
+
+    def load(self, path):
+        """Adds every rule in a text file (one per line; blank lines and # comments are skipped)."""
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    try:
+                        self.add(line)
+                    except ValueError as e:
+                        raise ValueError(f"{path}:{number}: {e}") from None
+        return self
+
+    def subscribe(self, callback):
+        """Calls `callback(alerts)` with the list of alerts whenever a check fires any."""
+        self._listeners.append(callback)
+
+    def _build_index(self):
+        groups = {}
+        for rule in self.rules:
+            groups.setdefault((rule.series, rule.op), []).append(rule)
+        index = {}
+        for key, rules in groups.items():
+            rules.sort(key=lambda r: r.threshold)
+            index[key] = (np.array([r.threshold for r in rules], dtype=np.float64), rules)
+        return index
+
+    def series_values(self, data, rates):
+        """Current value of every series the rules use (NaN where a price or rate is missing)."""
+        spot = {row["name"]: row["quote"].value for row in data["spot"]}
+        values = {}
+        for series, _ in self._index:
+            if series in values:
+                continue
+            kind, a, b = series
+            if kind == "ratio":
+                values[series] = spot.get(a, np.nan) / spot.get(b, np.nan) if spot.get(b) else np.nan
+            else:
+                values[series] = spot.get(a, np.nan) * rates.get(b, np.nan)
+        return values
+
+    def check(self, data, rates):
+        """Returns (and sends to subscribers) the alerts crossed since the previous check."""
+        if data is None or not self.rules:
+            return []
+        start = time.perf_counter()
+        with self._lock:
+            if self._index is None:
+                self._index = self._build_index()
+            values = self.series_values(data, rates)
+            fired = []
+            for (series, op), (thresholds, rules) in self._index.items():
+                previous, value = self._last.get(series), values[series]
+                if previous is None or np.isnan(value) or value == previous:
+                    continue
+                # Upward crossings: previous <= t < value; downward: value < t <= previous
+                if op == ABOVE and value > previous:
+                    lo, hi = np.searchsorted(thresholds, (previous, value), side="left").tolist()
+                elif op == BELOW and value < previous:
+                    lo, hi = np.searchsorted(thresholds, (value, previous), side="right").tolist()
+                else:
+                    continue
+                fired.extend(Alert(rule, previous, value) for rule in rules[lo:hi])
+            # A missing price keeps the last known value, so the next good tick is compared against it
+            self._last.update((series, value) for series, value in values.items() if not np.isnan(value))
+        METRICS.observe("alert_check_seconds", time.perf_counter() - start)
+        if fired:
+            METRICS.inc("alerts_fired_total", len(fired))
+            for alert in fired:
+                METRICS.event("alert", **alert.as_dict())
+            for callback in self._listeners:
+                try:
+                    callback(fired)
+                except Exception as e:
+                    # One broken notifier must not stop the others (or the refresh that called check)
+                    print(f"Alert notification failed: {e}", file=sys.stderr)
+        return fired
+
+
+def run_hook(command, alerts):
+    """Runs a shell `command` with the alerts as JSON lines on stdin, on a background thread."""
+    payload = "".join(json.dumps(alert.as_dict()) + "\n" for alert in alerts)
+
+    def task():
+        try:
+            result = subprocess.run(command, shell=True, input=payload, text=True, timeout=60)
+            if result.returncode:
+                print(f"Alert hook exited with status {result.returncode}", file=sys.stderr)
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"Alert hook failed: {e}", file=sys.stderr)
+
+    threading.Thread(target=task, daemon=True, name="alert-hook").start()
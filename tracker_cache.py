@@ -0,0 +1,129 @@
+"""Small TTL cache with stale-while-revalidate, persisted to disk as JSON.
+
+Entries are stamped with wall-clock time so they keep their age across
+restarts: a cold start can render the last known prices straight away and
+still know they need refreshing.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+
+class TTLCache:
+    """Thread-safe key -> value cache where each lookup supplies its own TTL.
+
+    Entries saved at `path` are read on first use (or by load()).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded = None if path else {}   # key -> (value, stored_at); None until read from `path`
+        self._revalidating = set()
+
+    @property
+    def _entries(self):
+        # Callers hold self._lock
+        if self._loaded is None:
+            self._loaded = self._read()
+        return self._loaded
+
+    def get(self, key, ttl):
+        """Returns the value if it is younger than `ttl` seconds, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and time.time() - entry[1] < ttl:
+            return entry[0]
+        return None
+
+    def peek(self, key):
+        """Returns the value regardless of age, or None if never stored."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def age(self, key):
+        """Seconds since `key` was stored, or None if never stored."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return time.time() - entry[1] if entry is not None else None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time())
+
+    def clear(self):
+        with self._lock:
+            self._loaded = {}
+
+    def get_or_revalidate(self, key, ttl, loader, executor, max_stale):
+        """Stale-while-revalidate lookup.
+
+        Fresh values are returned as-is. Values older than `ttl` but younger
+        than `max_stale` are returned immediately while `loader` refreshes the
+        entry on `executor`. Otherwise `loader` runs synchronously. `loader`
+        returns the new value, or None on failure (the old value is kept).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        age = time.time() - entry[1] if entry is not None else None
+
+        if age is not None and age < ttl:
+            return entry[0]
+        if age is not None and age < max_stale:
+            with self._lock:
+                if key in self._revalidating:
+                    return entry[0]
+                self._revalidating.add(key)
+            executor.submit(self._revalidate, key, loader)
+            return entry[0]
+
+        value = loader()
+        if value is not None:
+            self.put(key, value)
+            return value
+        return entry[0] if entry is not None else None
+
+    def _revalidate(self, key, loader):
+        try:
+            value = loader()
+            if value is not None:
+                self.put(key, value)
+                self.save()
+        finally:
+            with self._lock:
+                self._revalidating.discard(key)
+
+    def _read(self):
+        """Entries saved at `path`; a missing or corrupt file gives none."""
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            return {k: (v["value"], float(v["stored_at"])) for k, v in raw.items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return {}
+
+    def load(self):
+        """Adds the entries saved at `path`."""
+        entries = self._read()
+        with self._lock:
+            self._entries.update(entries)
+
+    def save(self):
+        """Writes all entries to `path` atomically."""
+        if not self.path:
+            return
+        with self._lock:
+            raw = {k: {"value": v, "stored_at": t} for k, (v, t) in self._entries.items()}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(raw, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Could not save price cache: {e}", file=sys.stderr)
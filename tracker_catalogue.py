@@ -0,0 +1,105 @@
+"""Coin catalogue loaded from CSV/JSON into parallel NumPy arrays.
+
+Rows are grouped by category so each category is a contiguous slice, and the
+fine metal content of every row is precomputed once. Valuing the whole
+catalogue for a set of spot prices is then a single vectorized multiply.
+"""
+import csv
+import json
+import os
+import site
+import sys
+import sysconfig
+
+import numpy as np
+
+CONST_GRAMS_PER_OZ = 31.1034768
+
+CATALOGUE_FILENAME = "coins.csv"
+
+# Where the bundled catalogue lives: next to this module when run from source
+# (or frozen), else in the share/silver-tracker data files of whichever scheme
+# pip installed into: the environment's prefix, or the user base for --user.
+DEFAULT_CATALOGUE_PATHS = list(dict.fromkeys([
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), CATALOGUE_FILENAME),
+    os.path.join(sysconfig.get_path("data"), "share", "silver-tracker", CATALOGUE_FILENAME),
+    os.path.join(sys.prefix, "share", "silver-tracker", CATALOGUE_FILENAME),
+    os.path.join(site.getuserbase(), "share", "silver-tracker", CATALOGUE_FILENAME),
+]))
+
+
+class Catalogue:
+    """Parallel arrays describing every coin, grouped by category.
+
+    Attributes:
+        categories: [(key, title)] in display order.
+        slices:     {category key: slice into the row arrays}.
+        names:      row labels.
+        metals:     distinct metal names; `metal_index` maps each row into it.
+        weight_g, purity, fine_oz: float64 arrays, one entry per row.
+    """
+
+    def __init__(self, records):
+        order = []
+        grouped = {}
+        titles = {}
+        for rec in records:
+            key = rec["category"]
+            if key not in grouped:
+                order.append(key)
+                grouped[key] = []
+                titles[key] = rec.get("category_title") or key.upper()
+            grouped[key].append(rec)
+
+        rows = [rec for key in order for rec in grouped[key]]
+        self.categories = [(key, titles[key]) for key in order]
+        self.slices = {}
+        start = 0
+        for key in order:
+            self.slices[key] = slice(start, start + len(grouped[key]))
+            start += len(grouped[key])
+
+        self.names = [rec["name"] for rec in rows]
+        self.metals = sorted({rec.get("metal") or "Silver" for rec in rows})
+        lookup = {m: i for i, m in enumerate(self.metals)}
+        self.metal_index = np.fromiter((lookup[rec.get("metal") or "Silver"] for rec in rows),
+                                       dtype=np.intp, count=len(rows))
+        self.weight_g = np.fromiter((float(rec["weight_g"]) for rec in rows), dtype=np.float64, count=len(rows))
+        self.purity = np.fromiter((float(rec["purity"]) for rec in rows), dtype=np.float64, count=len(rows))
+        self.fine_oz = self.weight_g * self.purity / CONST_GRAMS_PER_OZ
+
+    def __len__(self):
+        return len(self.names)
+
+    def spot_vector(self, spot_usd):
+        """Per-row spot price from {metal: usd}; NaN where a metal has no usable price."""
+        per_metal = np.array([spot_usd.get(m) or np.nan for m in self.metals], dtype=np.float64)
+        per_metal[per_metal <= 0] = np.nan
+        return per_metal[self.metal_index]
+
+    def values(self, spot_usd):
+        """Melt value of every row in USD for {metal: spot usd}; NaN where unpriced."""
+        return self.fine_oz * self.spot_vector(spot_usd)
+
+
+def load_catalogue(path=None):
+    """Loads a catalogue from CSV or JSON (a list of row objects).
+
+    Each row needs category, name, weight_g and purity; category_title and
+    metal (default Silver) are optional. With no `path` the file named by
+    SILVER_TRACKER_CATALOGUE is used, else the bundled coins.csv.
+    """
+    if path is None:
+        path = os.environ.get("SILVER_TRACKER_CATALOGUE") or next(
+            (p for p in DEFAULT_CATALOGUE_PATHS if os.path.exists(p)), None)
+        if path is None:
+            raise FileNotFoundError(
+                f"Coin catalogue {CATALOGUE_FILENAME} not found (looked in "
+                f"{', '.join(os.path.dirname(p) for p in DEFAULT_CATALOGUE_PATHS)}); "
+                "reinstall silver-tracker or set SILVER_TRACKER_CATALOGUE to the file's path")
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".json"):
+            records = json.load(f)
+        else:
+            records = list(csv.DictReader(f))
+    return Catalogue(records)
@@ -0,0 +1,316 @@
+"""Headless command line interface for Silver Tracker.
+
+Prints or exports spot prices and the coin valuation table without starting
+the GUI (ttkbootstrap is never imported):
+
+    silver-tracker                       # table of spot prices and coin values
+    silver-tracker prices --currency EUR --format json -o prices.json
+    silver-tracker prices --format csv --cached
+    silver-tracker inventory holdings.csv --by country
+    silver-tracker scenarios --from 20 --to 60 --step 0.5 --format csv -o grid.csv
+    silver-tracker serve --port 8765     # shared quote server (see tracker_server)
+    silver-tracker serve --alerts alerts.txt --alert-hook "notify-send 'Silver Tracker'"
+    silver-tracker --replay benchmarks/fixtures/replay_refresh.json --faults apmex.com:forbidden=1
+    silver-tracker --metrics - --metrics-log refresh.jsonl   # where did the refresh spend its time?
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+
+import tracker_core as core
+from tracker_metrics import METRICS
+from tracker_format import get_formatter
+from tracker_inventory import GROUPS, load_inventory
+from tracker_quote import FALLBACK_MARKER, MANUAL_MARKER
+from tracker_scenario import DEFAULT_RANGE, ScenarioGrid, price_steps
+from tracker_schedule import DEFAULT_INTERVAL
+
+FORMATS = ("table", "json", "csv")
+
+
+def format_table(spot, coins, show_oz=False):
+    lines = [f"{'Spot':<44}{'Weight':>12}{'Price':>16}"]
+    for row in spot:
+        price = core.format_price(row["price"], row["currency"]) if row["price"] is not None else "Unavailable"
+        marker = {"fallback": FALLBACK_MARKER, "manual": MANUAL_MARKER}.get(row["source"], "")
+        lines.append(f"{row['metal']:<44}{'1 oz':>12}{price + marker:>16}")
+
+    category = None
+    for row in coins:
+        if row["category"] != category:
+            category = row["category"]
+            lines.append(f"--- {row['category_title']} ---")
+        if show_oz:
+            weight = f"{row['weight_g'] / core.CONST_GRAMS_PER_OZ:.3f} oz"
+        else:
+            weight = f"{row['weight_g']:g} g"
+        value = core.format_price(row["value"], row["currency"]) if row["value"] is not None else "Error"
+        lines.append(f"{row['name']:<44}{weight:>12}{value:>16}")
+    return "\n".join(lines) + "\n"
+
+
+def format_csv(spot, coins):
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(["kind", "category", "name", "metal", "weight_g", "purity", "value_usd", "value", "currency", "source"])
+    for row in spot:
+        writer.writerow(["spot", "", row["metal"], row["metal"], core.CONST_GRAMS_PER_OZ, 1.0,
+                         row["price_usd"], row["price"], row["currency"], row["source"]])
+    for row in coins:
+        writer.writerow(["coin", row["category"], row["name"], row["metal"], row["weight_g"], row["purity"],
+                         row["value_usd"], row["value"], row["currency"], ""])
+    return out.getvalue()
+
+
+def format_inventory(inventory, by, currency, rate):
+    fmt = get_formatter(currency, rate)
+    lines = [f"{by.title():<32}{'Lots':>8}{'Fine oz':>14}{'Value':>18}"]
+    for group, lots, fine_oz, value in inventory.totals(by):
+        label = f"{group:g}" if by == "purity" else str(group)
+        lines.append(f"{label:<32}{lots:>8}{fine_oz:>14,.3f}{fmt.convert(value):>18}")
+    lines.append(f"{'Total':<32}{len(inventory):>8}{'':>14}{fmt.convert(inventory.total_value):>18}")
+    if inventory.unpriced:
+        lines.append(f"({inventory.unpriced} lots have no spot price and are not counted)")
+    return "\n".join(lines) + "\n"
+
+
+def format_scenarios(grid, currency, columns=8):
+    """Coin values in `currency` at up to `columns` evenly spaced prices of the sweep."""
+    fmt = get_formatter(currency, 1.0)
+    last, count = len(grid.prices) - 1, min(columns, len(grid.prices))
+    picks = sorted({round(i * last / (count - 1)) if count > 1 else 0 for i in range(count)})
+    lines = [f"{'Coin':<44}" + "".join(f"{'$' + format(grid.prices[i], 'g'):>14}" for i in picks)]
+    table = grid.table(currency)
+    for n, row in enumerate(grid.rows.tolist()):
+        lines.append(f"{core.CATALOGUE.names[row]:<44}" + "".join(f"{fmt(table[n, i]):>14}" for i in picks))
+    return "\n".join(lines) + "\n"
+
+
+def load_data(args):
+    """get_all_data() / cached / quote server result for the common price options, or None."""
+    if args.manual_spot is not None:
+        core.STATE.publish(manual_spot=args.manual_spot)
+    if args.cached:
+        data = core.get_cached_data()
+        if data is None:
+            print("No cached prices yet; run without --cached first.", file=sys.stderr)
+        return data
+    if args.server:
+        import requests
+        try:
+            return core.get_server_data(args.server, timeout=args.timeout)
+        except (requests.RequestException, ValueError, KeyError) as e:
+            # ValueError/KeyError: the reply is not a quote server snapshot
+            print(f"Cannot read prices from {args.server}: {e}", file=sys.stderr)
+            return None
+    return core.get_all_data(timeout=args.timeout)
+
+
+def write_output(args, text):
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+def cmd_prices(args):
+    data = load_data(args)
+    if data is None:
+        return 1
+
+    spot, coins = core.snapshot_rows(data, args.currency)
+    if args.format == "json":
+        text = json.dumps({"spot": spot, "coins": coins}, indent=2) + "\n"
+    elif args.format == "csv":
+        text = format_csv(spot, coins)
+    else:
+        text = format_table(spot, coins, args.oz)
+    write_output(args, text)
+    return 0
+
+
+def cmd_inventory(args):
+    try:
+        inventory = load_inventory(args.holdings, core.CATALOGUE)
+    except (OSError, ValueError) as e:
+        print(f"Cannot load holdings: {e}", file=sys.stderr)
+        return 1
+    data = load_data(args)
+    if data is None:
+        return 1
+
+    inventory.revalue(core.spot_prices_usd(data))
+    rate = core.STATE.exchange_rates.get(args.currency, 1.0)
+    rows = [{"group": group, "lots": lots, "fine_oz": round(fine_oz, 4), "value_usd": round(value, 2),
+             "value": round(value * rate, 2), "currency": args.currency}
+            for group, lots, fine_oz, value in inventory.totals(args.by)]
+    if args.format == "json":
+        total = {"lots": len(inventory), "unpriced": inventory.unpriced,
+                 "value_usd": round(inventory.total_value, 2), "value": round(inventory.total_value * rate, 2)}
+        text = json.dumps({"by": args.by, "groups": rows, "total": total}, indent=2) + "\n"
+    elif args.format == "csv":
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=list(rows[0]) if rows else ["group"], lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+        text = out.getvalue()
+    else:
+        text = format_inventory(inventory, args.by, args.currency, rate)
+    write_output(args, text)
+    return 0
+
+
+def cmd_scenarios(args):
+    data = load_data(args)
+    if data is None:
+        return 1
+
+    # Every currency with a known rate for csv/json, --currency for the table
+    rates = {c: core.STATE.exchange_rates[c] for c in core.CURRENCY_OPTIONS if c in core.STATE.exchange_rates}
+    if args.format == "table" or args.currency not in rates:
+        rates = {args.currency: core.STATE.exchange_rates.get(args.currency, 1.0)}
+    try:
+        grid = ScenarioGrid(core.CATALOGUE, price_steps(args.start, args.stop, args.step), rates, args.metal)
+    except ValueError as e:
+        print(f"Cannot build scenario grid: {e}", file=sys.stderr)
+        return 1
+
+    if args.format == "json":
+        tables = {c: grid.table(c).round(2).tolist() for c in grid.currencies}
+        coins = [{"name": core.CATALOGUE.names[row], "fine_oz": round(float(core.CATALOGUE.fine_oz[row]), 6),
+                  "values": {c: table[n] for c, table in tables.items()}}
+                 for n, row in enumerate(grid.rows.tolist())]
+        text = json.dumps({"metal": grid.metal, "prices_usd": grid.prices.tolist(), "coins": coins}) + "\n"
+    elif args.format == "csv":
+        out = io.StringIO()
+        grid.write_csv(out)
+        text = out.getvalue()
+    else:
+        text = format_scenarios(grid, args.currency)
+    write_output(args, text)
+    return 0
+
+
+def cmd_serve(args):
+    import tracker_server
+    alerts = None
+    if args.alerts:
+        # Only needed with --alerts (and it pulls in subprocess for the hook)
+        from tracker_alerts import AlertEngine, run_hook
+        try:
+            alerts = AlertEngine(core.CATALOGUE, [m["name"] for m in core.METALS_CONFIG]).load(args.alerts)
+        except (OSError, ValueError) as e:
+            print(f"Cannot load alerts: {e}", file=sys.stderr)
+            return 1
+        def print_alerts(fired):
+            for alert in fired:
+                print(f"Alert: {alert.message()}", flush=True)
+        alerts.subscribe(print_alerts)
+        if args.alert_hook:
+            alerts.subscribe(lambda fired: run_hook(args.alert_hook, fired))
+        print(f"Watching {len(alerts)} price alerts")
+    tracker_server.run(args.host, args.port, args.interval, alerts)
+    return 0
+
+
+def add_transport_options(parser):
+    group = parser.add_argument_group("offline record/replay (see tracker_replay)")
+    group.add_argument("--record", metavar="PATH", help="save every upstream response to a recording")
+    group.add_argument("--replay", metavar="PATH", help="answer upstream requests from a recording, no network")
+    group.add_argument("--faults", metavar="SPEC", help="with --replay: inject latency/errors/403s, "
+                       "e.g. latency=0.2,apmex.com:forbidden=1")
+
+
+def add_metrics_options(parser):
+    group = parser.add_argument_group("instrumentation (see tracker_metrics)")
+    group.add_argument("--metrics", metavar="PATH", help="on exit, write timings and counters in Prometheus "
+                       "text format ('-' for stderr)")
+    group.add_argument("--metrics-log", metavar="PATH", help="append one JSON line per refresh and per error")
+
+
+def write_metrics(path):
+    text = METRICS.prometheus_text()
+    if path == "-":
+        sys.stderr.write(text)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="silver-tracker", description="Precious metals & junk silver coin values.")
+    sub = parser.add_subparsers(dest="command")
+
+    # Options shared by every command that needs prices
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--currency", default="USD", type=str.upper, choices=core.CURRENCY_OPTIONS)
+    common.add_argument("--format", default="table", choices=FORMATS)
+    common.add_argument("-o", "--output", metavar="PATH", help="write to a file instead of stdout")
+    common.add_argument("--cached", action="store_true", help="use cached prices only, no network access")
+    common.add_argument("--manual-spot", type=float, metavar="USD", help="use this silver spot price")
+    common.add_argument("--timeout", type=float, default=core.REFRESH_DEADLINE, help="refresh deadline in seconds")
+    common.add_argument("--server", metavar="URL", help="read prices from a running quote server")
+    add_transport_options(common)
+    add_metrics_options(common)
+
+    prices = sub.add_parser("prices", parents=[common], help="print or export spot prices and coin values (default)")
+    prices.add_argument("--oz", action="store_true", help="show coin weights in troy ounces (table format)")
+    prices.set_defaults(func=cmd_prices)
+
+    inventory = sub.add_parser("inventory", parents=[common], help="value a holdings file (CSV or SQLite)")
+    inventory.add_argument("holdings", help="CSV file, or SQLite database with a holdings table")
+    inventory.add_argument("--by", default="country", choices=GROUPS, help="group totals by (default country)")
+    inventory.set_defaults(func=cmd_inventory)
+
+    start, stop, step = DEFAULT_RANGE
+    scenarios = sub.add_parser("scenarios", parents=[common],
+                               help="coin values across a range of spot prices (csv/json: every currency)")
+    scenarios.add_argument("--from", dest="start", type=float, default=start, metavar="USD",
+                           help=f"lowest spot price (default {start:g})")
+    scenarios.add_argument("--to", dest="stop", type=float, default=stop, metavar="USD",
+                           help=f"highest spot price (default {stop:g})")
+    scenarios.add_argument("--step", type=float, default=step, metavar="USD", help=f"price step (default {step:g})")
+    scenarios.add_argument("--metal", default="Silver", choices=core.CATALOGUE.metals)
+    scenarios.set_defaults(func=cmd_scenarios)
+
+    serve = sub.add_parser("serve", help="run the local HTTP/JSON quote server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                       help="seconds between upstream refreshes (backs off on failures)")
+    serve.add_argument("--alerts", metavar="PATH",
+                       help="price alert rules, one per line (e.g. 'Silver > 35'), checked on every refresh")
+    serve.add_argument("--alert-hook", metavar="COMMAND",
+                       help="with --alerts: shell command run with the fired alerts as JSON lines on stdin")
+    add_transport_options(serve)
+    add_metrics_options(serve)
+    serve.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # "prices" is the default command
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv.insert(0, "prices")
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.record or args.replay:
+        try:
+            core.configure_transport(args.record, args.replay, args.faults)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot use recording: {e}")
+    if args.metrics_log:
+        METRICS.log_path = args.metrics_log
+    try:
+        return args.func(args)
+    finally:
+        if args.metrics:
+            write_metrics(args.metrics)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,624 @@
+"""Fetching and valuation core of Silver Tracker.
+
+Everything the GUI, CLI and other front ends share: spot price and exchange
+rate fetching, the price cache and history store, and coin valuation. It never
+imports the GUI toolkit, and the network stacks (cloudscraper/requests) are
+only imported on first use, so headless tools start quickly.
+"""
+import sqlite3
+import sys
+import threading
+import time
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeout
+from tracker_extract import extract_apmex_prices
+from tracker_format import get_formatter
+from tracker_cache import TTLCache
+from tracker_history import PriceHistory
+from tracker_catalogue import load_catalogue
+from tracker_sources import SourceRegistry
+from tracker_state import AppState
+from tracker_metrics import METRICS, instrument_session
+from tracker_quote import CACHED, FALLBACK, Quote, parse_usd
+
+# --- CONFIGURATION ---
+METALS_CONFIG = [
+    {"name": "Gold",      "url": "https://www.apmex.com/gold-price",      "search_term": "Gold Price Per Ounce"},
+    {"name": "Silver",    "url": "https://www.apmex.com/silver-price",    "search_term": "Silver Price Per Ounce"},
+    {"name": "Platinum",  "url": "https://www.apmex.com/platinum-price",  "search_term": "Platinum Price Per Ounce"},
+    {"name": "Palladium", "url": "https://www.apmex.com/palladium-price", "search_term": "Palladium Price Per Ounce"},
+]
+
+# One APMEX page that lists every metal's spot price, so a refresh needs one scrape, not four.
+# The page has not been checked against the live site yet, so it is opt-in
+# (SILVER_TRACKER_APMEX_BATCH=1); by default each metal's own page is scraped.
+APMEX_SPOT_PRICES_URL = "https://www.apmex.com/spotprices"
+APMEX_BATCH_PAGE = os.environ.get("SILVER_TRACKER_APMEX_BATCH", "") == "1"
+
+# Optional metals.dev fallback; only used when a (free) API key is configured
+METALS_DEV_API_KEY = os.environ.get("METALS_DEV_API_KEY", "")
+
+# Supported display currencies and their approximate fallback rates
+CURRENCY_OPTIONS = ["USD", "GBP", "EUR", "CAD", "AUD", "MXN", "CHF"]
+
+# Global State
+# Current market snapshot and display preferences (see tracker_state)
+STATE = AppState()
+
+CONST_GRAMS_PER_OZ = 31.1034768
+
+# Refresh timing (seconds)
+REFRESH_DEADLINE = 20.0      # hard cap on a whole refresh, however slow the sources are
+FALLBACK_HEDGE_DELAY = 2.0   # head start APMEX gets before the fallbacks are raced against it
+
+# Cache lifetimes (seconds). Spot prices stay fresh for less than one auto-refresh
+# interval; open.er-api.com only updates its rates daily.
+CACHE_TTLS = {"spot": 30.0, "fx": 6 * 3600.0}
+FX_MAX_STALE = 7 * 86400.0   # stale rates are served (and revalidated in the background) up to this age
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".silver_tracker")
+CACHE_PATH = os.path.join(DATA_DIR, "cache.json")
+HISTORY_PATH = os.path.join(DATA_DIR, "history.sqlite3")
+
+# Shared worker pool for all network calls (metals, sources and FX run side by side)
+FETCH_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="fetch")
+
+# time.monotonic() deadline of the refresh the source call on this thread belongs to (see
+# call_source); HttpSessions.get() shortens request timeouts so no call outlives it
+_call_deadline = threading.local()
+
+# --- HTTP SESSIONS ---
+
+class HttpSessions:
+    """Shared, thread-safe HTTP sessions reused across refreshes.
+
+    APMEX goes through a single cloudscraper session so its Cloudflare cookies
+    and challenge tokens carry over from one refresh to the next. Every other
+    host (goldapi.io, kitco, open.er-api.com) shares one plain requests session.
+    Both keep connections alive in a per-host pool. A 403 throws the offending
+    session away so the next request starts with a fresh handshake/challenge.
+    """
+
+    def __init__(self, pool_size=16):
+        self._lock = threading.Lock()
+        self._pool_size = pool_size
+        self._scraper = None
+        self._plain = None
+        self.transport = None   # record/replay transport (tracker_replay) that takes over get()
+
+    def _get_session(self, scraper):
+        with self._lock:
+            if scraper:
+                if self._scraper is None:
+                    import cloudscraper
+                    self._scraper = instrument_session(cloudscraper.create_scraper())
+                return self._scraper
+            if self._plain is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=self._pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._plain = instrument_session(session)
+            return self._plain
+
+    def reset(self, scraper):
+        """Drops a session (and its pooled connections and cookies)."""
+        with self._lock:
+            session = self._scraper if scraper else self._plain
+            if scraper:
+                self._scraper = None
+            else:
+                self._plain = None
+        if session is not None:
+            session.close()
+
+    def get(self, url, timeout, headers=None, scraper=False):
+        """GETs `url` on the shared session; recreates the session on a 403. Traced in METRICS.
+
+        Inside a refresh's source call, `timeout` is capped at the time left before its deadline.
+        """
+        deadline = getattr(_call_deadline, "value", None)
+        if deadline is not None:
+            timeout = max(0.05, min(timeout, deadline - time.monotonic()))
+        if getattr(self.transport, "inner", None) is not None:
+            # A recording transport fetches through its own HttpSessions, which traces the request
+            return self.transport.get(url, timeout, headers=headers, scraper=scraper)
+        trace = METRICS.start_request(url)
+        try:
+            if self.transport is not None:
+                response = self.transport.get(url, timeout, headers=headers, scraper=scraper)
+            else:
+                response = self._get_session(scraper).get(url, timeout=timeout, headers=headers)
+        except Exception as e:
+            METRICS.finish_request(trace, error=e)
+            raise
+        METRICS.finish_request(trace, response)
+        if self.transport is None and response.status_code == 403:
+            self.reset(scraper)
+        return response
+
+HTTP_SESSIONS = HttpSessions()
+
+# Both are opened on first use, so importing this module (e.g. for --help) touches no files
+PRICE_CACHE = TTLCache(CACHE_PATH)
+HISTORY = PriceHistory(HISTORY_PATH)
+
+CATALOGUE = load_catalogue()
+
+def configure_transport(record=None, replay=None, faults=None):
+    """Routes HTTP through a recording (`record`) or answers it from one (`replay`).
+
+    Replay also switches to an empty in-memory price cache and history, so
+    replayed runs are repeatable and leave the real ones untouched. See
+    tracker_replay for the recording format and the `faults` spec.
+    """
+    global HISTORY
+    if replay:
+        from tracker_replay import ReplayTransport
+        HTTP_SESSIONS.transport = ReplayTransport(replay, faults)
+        PRICE_CACHE.path = None
+        PRICE_CACHE.clear()
+        HISTORY = PriceHistory(":memory:")
+    elif record:
+        from tracker_replay import RecordingTransport
+        HTTP_SESSIONS.transport = RecordingTransport(record, HttpSessions())
+    return HTTP_SESSIONS.transport
+
+# Environment equivalents of the CLI's --record / --replay / --faults (also used by the GUI)
+configure_transport(os.environ.get("SILVER_TRACKER_RECORD"), os.environ.get("SILVER_TRACKER_REPLAY"),
+                    os.environ.get("SILVER_TRACKER_FAULTS"))
+
+# --- CURRENCY FETCHING ---
+
+def download_exchange_rates():
+    """Downloads live exchange rates vs USD from a free open API (no key required).
+
+    Returns {currency: rate} or None on failure.
+    """
+    try:
+        url = "https://open.er-api.com/v6/latest/USD"
+        resp = HTTP_SESSIONS.get(url, timeout=8)
+        resp.raise_for_status()
+        data = resp.json()
+        if data.get("result") == "success":
+            rates = data["rates"]
+            filtered = {c: rates[c] for c in CURRENCY_OPTIONS if c in rates}
+            filtered["USD"] = 1.0
+            return filtered
+    except Exception as e:
+        print(f"Exchange rate fetch failed: {e}", file=sys.stderr)
+        METRICS.event("fx_error", error=f"{type(e).__name__}: {e}")
+    return None
+
+def fetch_exchange_rates():
+    """Returns exchange rates, from the cache when it is fresh enough, or None.
+
+    Stale cached rates are used straight away and refreshed in the background.
+    """
+    age = PRICE_CACHE.age("fx")
+    if age is None or age >= FX_MAX_STALE:
+        METRICS.inc("cache_lookups_total", key="fx", result="miss")
+    else:
+        METRICS.inc("cache_lookups_total", key="fx", result="hit" if age < CACHE_TTLS["fx"] else "stale")
+    return PRICE_CACHE.get_or_revalidate("fx", CACHE_TTLS["fx"], download_exchange_rates,
+                                         FETCH_POOL, FX_MAX_STALE) or None
+
+def convert_price(usd_value, currency=None):
+    """Converts a USD float to the target currency string."""
+    if currency is None:
+        currency = STATE.currency
+    return get_formatter(currency, STATE.exchange_rates.get(currency, 1.0)).convert(usd_value)
+
+def format_price(value, currency):
+    """Formats a value already in `currency` with its symbol."""
+    return get_formatter(currency)(value)
+
+# --- UTILS & SCRAPING ---
+
+def clean_price_text(price_text):
+    """Returns the USD float in a price string such as "$31.20 *", or 0.0 if there is none."""
+    try:
+        value = parse_usd(price_text)
+    except TypeError:
+        return 0.0
+    return value if value == value else 0.0  # NaN -> 0.0
+
+def spot_prices_usd(data):
+    """{metal: usd} from a get_all_data() result (NaN where unavailable)."""
+    return {row["name"]: row["quote"].value for row in data["spot"]}
+
+def _apmex_usd(prices):
+    """{name: usd} from extract_apmex_prices() text, dropping anything that is not a price."""
+    values = {}
+    for name, text in prices.items():
+        value = parse_usd(text)
+        if value > 0:
+            values[name] = value
+    return values
+
+def fetch_price_primary(metal_info):
+    """Primary source: scrapes APMEX. Returns the USD price or None."""
+    response = HTTP_SESSIONS.get(metal_info["url"], timeout=10, scraper=True)
+    if response.status_code == 403:
+        return None
+    with METRICS.parse_timer("apmex"):
+        return _apmex_usd(extract_apmex_prices(response.content, [metal_info])).get(metal_info["name"])
+
+def fetch_prices_primary_batch(metals):
+    """Primary source, batched: every metal from the single APMEX spot price page.
+
+    Returns {name: usd} for the metals found. A 403 or error status raises, so
+    the caller can tell a blocked request from a page that lacks a metal.
+    """
+    response = HTTP_SESSIONS.get(APMEX_SPOT_PRICES_URL, timeout=10, scraper=True)
+    response.raise_for_status()
+    with METRICS.parse_timer("apmex"):
+        return _apmex_usd(extract_apmex_prices(response.content, metals))
+
+def fetch_price_goldapi(metal_info):
+    """Fallback source: goldapi.io free scrape."""
+    symbol_map = {"Gold": "XAU", "Silver": "XAG", "Platinum": "XPT", "Palladium": "XPD"}
+    symbol = symbol_map.get(metal_info["name"], "XAG")
+    url = f"https://www.goldapi.io/api/{symbol}/USD"
+    resp = HTTP_SESSIONS.get(url, timeout=8, headers={"x-access-token": "goldapi-demo"})
+    resp.raise_for_status()
+    with METRICS.parse_timer("goldapi"):
+        price = resp.json().get("price")
+    if price:
+        return float(price)
+    return None
+
+def fetch_price_kitco(metal_info):
+    """Fallback source: kitco public JSON (no auth required)."""
+    kitco_map = {"Gold": "gold", "Silver": "silver", "Platinum": "platinum", "Palladium": "palladium"}
+    k = kitco_map.get(metal_info["name"])
+    url = f"https://online.kitco.com/KitcoChartServlet?type=currency&commodity={k.upper()}&currency=USD&period=1D"
+    resp = HTTP_SESSIONS.get(url, timeout=8)
+    resp.raise_for_status()
+    # Kitco returns CSV-like data; last value is most recent
+    with METRICS.parse_timer("kitco"):
+        lines = [l for l in resp.text.strip().split("\n") if l]
+    if lines:
+        last = lines[-1].split(",")
+        if len(last) >= 2:
+            return float(last[-1])
+    return None
+
+def fetch_prices_metals_dev(metals):
+    """Fallback source: metals.dev, every metal in one call (needs METALS_DEV_API_KEY)."""
+    url = f"https://api.metals.dev/v1/latest?api_key={METALS_DEV_API_KEY}&currency=USD&unit=toz"
+    resp = HTTP_SESSIONS.get(url, timeout=8)
+    resp.raise_for_status()
+    with METRICS.parse_timer("metals.dev"):
+        quotes = resp.json().get("metals") or {}
+    prices = {}
+    for metal in metals:
+        price = quotes.get(metal["name"].lower())
+        if price:
+            prices[metal["name"]] = float(price)
+    return prices
+
+class PriceSource:
+    """A spot price provider registered with SOURCE_HEALTH.
+
+    `batch(metals)` returns {name: usd} for several metals in one request;
+    `single(metal_info)` returns one USD float or None. Either may be None.
+    Prices from non-primary sources are flagged as fallbacks.
+    """
+
+    __slots__ = ("name", "batch", "single", "primary", "enabled")
+
+    def __init__(self, name, batch=None, single=None, primary=False, enabled=None):
+        self.name = name
+        self.batch = batch
+        self.single = single
+        self.primary = primary
+        self.enabled = enabled
+
+    def is_enabled(self):
+        return self.enabled is None or self.enabled()
+
+# Every source, in order of preference
+PRICE_SOURCES = [
+    PriceSource("apmex", batch=fetch_prices_primary_batch if APMEX_BATCH_PAGE else None,
+                single=fetch_price_primary, primary=True),
+    PriceSource("goldapi", single=fetch_price_goldapi),
+    PriceSource("kitco", single=fetch_price_kitco),
+    PriceSource("metals.dev", batch=fetch_prices_metals_dev, enabled=lambda: bool(METALS_DEV_API_KEY)),
+]
+
+SOURCE_HEALTH = SourceRegistry()
+
+def ordered_sources():
+    """Enabled sources, healthiest first, leaving out those in circuit-breaker cooldown."""
+    enabled = {s.name: s for s in PRICE_SOURCES if s.is_enabled()}
+    return [enabled[name] for name in SOURCE_HEALTH.order(list(enabled))]
+
+def call_source(source, func, arg, deadline=None):
+    """Runs one source call and records its latency and outcome in SOURCE_HEALTH and METRICS.
+
+    Requests it makes time out by `deadline` (a time.monotonic() value), if given.
+    """
+    start = time.perf_counter()
+    _call_deadline.value = deadline
+    try:
+        result = func(arg)
+    except Exception as e:
+        elapsed = time.perf_counter() - start
+        SOURCE_HEALTH.record_failure(source.name, elapsed, e)
+        METRICS.observe("source_seconds", elapsed, source=source.name, outcome="error")
+        METRICS.inc("source_errors_total", source=source.name)
+        METRICS.event("source_error", source=source.name, error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _call_deadline.value = None
+    elapsed = time.perf_counter() - start
+    if result:
+        SOURCE_HEALTH.record_success(source.name, elapsed)
+    else:
+        SOURCE_HEALTH.record_failure(source.name, elapsed, "no price returned")
+        METRICS.inc("source_errors_total", source=source.name)
+        METRICS.event("source_error", source=source.name, error="no price returned")
+    METRICS.observe("source_seconds", elapsed, source=source.name, outcome="ok" if result else "empty")
+    return result
+
+def fetch_all_prices(deadline):
+    """Fetches every metal concurrently and returns {name: Quote}.
+
+    Metals are routed to the healthiest source first (normally APMEX, one
+    page per metal, or its spot price page for every metal at once when
+    APMEX_BATCH_PAGE is set). A metal that source fails on moves straight to
+    the next one; any metal still outstanding after
+    FALLBACK_HEDGE_DELAY has every remaining source raced for it. The first
+    usable price wins and the other answers are ignored. Requests already in
+    flight cannot be cancelled, but every request's timeout is capped at
+    `deadline` (a time.monotonic() value), so none holds a worker past it.
+    Sources in circuit-breaker cooldown are skipped. Anything not settled by
+    `deadline` is Unavailable.
+    """
+    results = {}
+    cached_names = set()
+    pending = {}   # future -> (metals covered, source, "batch" or "single")
+
+    wanted = []
+    manual_spot = STATE.manual_spot
+    for metal in METALS_CONFIG:
+        # If user has manually set a spot price (Silver only), use that
+        if metal["name"] == "Silver" and manual_spot is not None:
+            results["Silver"] = Quote.manual(manual_spot)
+            continue
+        cached = PRICE_CACHE.get(f"spot:{metal['name']}", CACHE_TTLS["spot"])
+        METRICS.inc("cache_lookups_total", key="spot", result="miss" if cached is None else "hit")
+        if cached is not None:
+            results[metal["name"]] = Quote.from_json(cached).with_flags(CACHED)
+            cached_names.add(metal["name"])
+            continue
+        wanted.append(metal)
+
+    order = ordered_sources()
+    tried = {metal["name"]: set() for metal in wanted}
+
+    def submit(source, kind, metals):
+        func = source.batch if kind == "batch" else source.single
+        arg = metals if kind == "batch" else metals[0]
+        pending[FETCH_POOL.submit(call_source, source, func, arg, deadline)] = (metals, source, kind)
+
+    def launch(source, metals):
+        metals = [m for m in metals if m["name"] not in results and source.name not in tried[m["name"]]]
+        if not metals:
+            return
+        for metal in metals:
+            tried[metal["name"]].add(source.name)
+        if source.batch is not None and (len(metals) > 1 or source.single is None):
+            submit(source, "batch", metals)
+        else:
+            for metal in metals:
+                submit(source, "single", [metal])
+
+    def launch_next(metal):
+        for source in order:
+            if source.name not in tried[metal["name"]]:
+                launch(source, [metal])
+                return
+
+    if wanted and order:
+        launch(order[0], wanted)
+    hedge_at = time.monotonic() + FALLBACK_HEDGE_DELAY
+
+    while pending:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        if now >= hedge_at:
+            for metal in wanted:
+                for source in order:
+                    launch(source, [metal])
+            wake = deadline
+        else:
+            wake = hedge_at
+
+        done, _ = wait(list(pending), timeout=wake - now, return_when=FIRST_COMPLETED)
+        for fut in done:
+            metals, source, kind = pending.pop(fut)
+            blocked = False
+            try:
+                found = fut.result()
+            except Exception as e:
+                names = ", ".join(m["name"] for m in metals)
+                print(f"{source.name} fetch failed for {names}: {e}", file=sys.stderr)
+                found = None
+                blocked = getattr(getattr(e, "response", None), "status_code", None) == 403
+            if kind == "single":
+                found = {metals[0]["name"]: found} if found else {}
+            elif not found:
+                found = {}
+
+            for metal in metals:
+                name = metal["name"]
+                if name in results:
+                    continue
+                price = found.get(name)
+                if price:
+                    results[name] = Quote(price, source.name, flags=0 if source.primary else FALLBACK)
+                    if not source.primary:
+                        METRICS.inc("fallback_quotes_total", metal=name)
+                    PRICE_CACHE.put(f"spot:{name}", results[name].to_json())
+                elif kind == "batch" and source.single is not None and not blocked:
+                    # Missing from the combined page, or the page failed: try this source's
+                    # per-metal lookup. A 403 challenge moves on instead of hitting the host again.
+                    submit(source, "single", [metal])
+                else:
+                    print(f"Trying next source for {name}...", file=sys.stderr)
+                    launch_next(metal)
+
+        # Stop waiting on slower sources for metals that are already settled. Calls that have
+        # not started are cancelled; running ones finish (by `deadline` at the latest) unread.
+        for fut, (metals, _, _) in list(pending.items()):
+            if all(m["name"] in results for m in metals):
+                fut.cancel()
+                del pending[fut]
+
+    for fut in pending:
+        fut.cancel()
+
+    # Keep every newly fetched quote (not the cached ones) in the history store
+    try:
+        HISTORY.record([(name, quote.value, quote.kind) for name, quote in results.items()
+                        if name not in cached_names])
+    except sqlite3.Error as e:
+        # e.g. "database is locked" by another instance; the prices are still good
+        print(f"Could not save price history: {e}", file=sys.stderr)
+    return {m["name"]: results.get(m["name"]) or Quote.unavailable() for m in METALS_CONFIG}
+
+def get_all_data(timeout=REFRESH_DEADLINE):
+    """Scrapes/fetches all data and calculates values.
+
+    Exchange rates and every metal/source are fetched concurrently; the whole
+    refresh is bounded by `timeout` seconds. Each call is traced as one
+    refresh in METRICS.
+    """
+    deadline = time.monotonic() + timeout
+    METRICS.begin_refresh()
+    prices = None
+    try:
+        fx_future = FETCH_POOL.submit(fetch_exchange_rates)
+        prices = fetch_all_prices(deadline)
+
+        # Coin values are converted to the display currency, so wait for the rates
+        rates = None
+        try:
+            rates = fx_future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            print("Exchange rate fetch timed out, using last known rates", file=sys.stderr)
+            METRICS.event("fx_timeout")
+
+        PRICE_CACHE.save()
+        data = build_data(prices)
+        if rates:
+            STATE.publish(data=data, exchange_rates=rates)
+        else:
+            STATE.publish(data=data)
+        return data
+    finally:
+        METRICS.end_refresh(prices=prices)
+
+def get_server_data(server_url, timeout=REFRESH_DEADLINE):
+    """Gets the latest snapshot from a tracker_server instead of scraping.
+
+    Coin values are still calculated locally from CATALOGUE. Raises on
+    network/HTTP errors (including 503 before the server's first refresh).
+    Servers that predate "quotes" only send display strings in "prices".
+    """
+    resp = HTTP_SESSIONS.get(server_url.rstrip("/") + "/snapshot", timeout=timeout)
+    resp.raise_for_status()
+    snapshot = resp.json()
+    quotes = {name: Quote.from_json(raw) for name, raw in (snapshot.get("quotes") or snapshot["prices"]).items()}
+    # A manual spot override stays local to this client
+    manual_spot = STATE.manual_spot
+    if manual_spot is not None:
+        quotes["Silver"] = Quote.manual(manual_spot)
+    data = build_data(quotes)
+    STATE.publish(data=data, exchange_rates=snapshot["exchange_rates"])
+    return data
+
+def get_cached_data():
+    """Builds the table from cached prices and rates of any age, for instant display.
+
+    Returns None when nothing has been cached yet.
+    """
+    cached = {m["name"]: PRICE_CACHE.peek(f"spot:{m['name']}") for m in METALS_CONFIG}
+    if not any(cached.values()):
+        return None
+    rates = PRICE_CACHE.peek("fx")
+    data = build_data({name: Quote.from_json(raw).with_flags(CACHED) if raw else Quote.unavailable()
+                       for name, raw in cached.items()})
+    if rates:
+        STATE.publish(data=data, exchange_rates=rates)
+    else:
+        STATE.publish(data=data)
+    return data
+
+def build_data(quotes):
+    """Builds spot rows and values the whole coin catalogue from {metal name: Quote}.
+
+    Coin melt values are kept in USD as one array parallel to CATALOGUE; rows
+    whose metal has no usable spot price are NaN.
+    """
+    spot_results = []
+    spot_usd = {}
+
+    for metal in METALS_CONFIG:
+        quote = quotes[metal["name"]]
+        spot_results.append({
+            "name": metal["name"],
+            "weight_g": 31.1034768,
+            "quote": quote,
+            "price_usd": quote.value,
+            "is_spot": True
+        })
+        spot_usd[metal["name"]] = quote.value
+
+    return {"spot": spot_results, "coin_usd": CATALOGUE.values(spot_usd)}
+
+def snapshot_rows(data, currency=None):
+    """Flattens a get_all_data() result into plain dicts for export.
+
+    Returns (spot, coins): spot rows carry the metal price, coin rows the melt
+    value, both in USD and in `currency` (default: the display currency).
+    """
+    if currency is None:
+        currency = STATE.currency
+    rate = STATE.exchange_rates.get(currency, 1.0)
+
+    spot = []
+    for row in data["spot"]:
+        quote = row["quote"]
+        price = quote.value if quote.available else None
+        spot.append({
+            "metal": row["name"],
+            "price_usd": round(price, 2) if price else None,
+            "price": round(price * rate, 2) if price else None,
+            "currency": currency,
+            "source": quote.kind if price else "unavailable",
+        })
+
+    coins = []
+    values = data["coin_usd"].tolist()
+    for key, title in CATALOGUE.categories:
+        rows = CATALOGUE.slices[key]
+        for i in range(rows.start, rows.stop):
+            value = values[i]
+            priced = value == value  # not NaN
+            coins.append({
+                "category": key,
+                "category_title": title,
+                "name": CATALOGUE.names[i],
+                "metal": CATALOGUE.metals[CATALOGUE.metal_index[i]],
+                "weight_g": float(CATALOGUE.weight_g[i]),
+                "purity": float(CATALOGUE.purity[i]),
+                "value_usd": round(value, 2) if priced else None,
+                "value": round(value * rate, 2) if priced else None,
+                "currency": currency,
+            })
+    return spot, coins
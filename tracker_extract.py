@@ -0,0 +1,112 @@
+"""Fast price extraction from APMEX spot price pages.
+
+The pages are large retail documents and the price is a single <td>, so
+precompiled patterns find it without building a DOM. Labels and cells inside
+comments, <script> or <style> are skipped, as a DOM parse would. A full
+BeautifulSoup parse is only done for metals the patterns miss (e.g. after a
+page redesign).
+"""
+import bisect
+import html
+import re
+from functools import lru_cache
+
+_TAG_RE = re.compile(rb"<!--.*?-->|<[^>]+>", re.S)
+_CELL_RE = re.compile(rb"<td\b[^>]*>(.*?)</td\s*>", re.S | re.I)
+_HIDDEN_RE = re.compile(rb"<(!--|script\b|style\b)", re.I)
+_HIDDEN_END = {
+    b"!--": re.compile(rb"-->"),
+    b"script": re.compile(rb"</script\s*>", re.I),
+    b"style": re.compile(rb"</style\s*>", re.I),
+}
+
+
+@lru_cache(maxsize=None)
+def price_pattern(search_term):
+    """Compiles the pattern for the `search_term` text node."""
+    return re.compile(rb">\s*" + re.escape(search_term.encode("utf-8")) + rb"\s*<", re.I)
+
+
+def hidden_spans(content):
+    """(starts, ends) of the comments, scripts and style blocks in `content`, in order."""
+    starts, ends = [], []
+    pos = 0
+    while True:
+        match = _HIDDEN_RE.search(content, pos)
+        if not match:
+            return starts, ends
+        end = _HIDDEN_END[match.group(1).lower()].search(content, match.end())
+        pos = end.end() if end else len(content)
+        starts.append(match.start())
+        ends.append(pos)
+
+
+def _hidden_end(spans, pos):
+    """End of the hidden span containing `pos`, or None if it is visible."""
+    starts, ends = spans
+    i = bisect.bisect_right(starts, pos) - 1
+    return ends[i] if i >= 0 and pos < ends[i] else None
+
+
+def find_price_cell(content, search_term, spans):
+    """Raw bytes of the first visible <td> after the visible `search_term` text node, or None."""
+    pattern = price_pattern(search_term)
+    pos = 0
+    while True:
+        label = pattern.search(content, pos)
+        if not label:
+            return None
+        pos = _hidden_end(spans, label.end() - 2)   # the last character of the text node
+        if pos is None:
+            break
+    pos = label.end() - 1
+    while True:
+        cell = _CELL_RE.search(content, pos)
+        if not cell:
+            return None
+        pos = _hidden_end(spans, cell.start())
+        if pos is None:
+            return cell.group(1)
+
+
+def _cell_text(raw):
+    text = html.unescape(_TAG_RE.sub(b" ", raw).decode("utf-8", "replace"))
+    return " ".join(text.split()).replace(" USD", "").strip()
+
+
+def extract_apmex_price(soup, search_term):
+    """DOM path: returns the price text in the first <td> after `search_term`, or None."""
+    label = soup.find(string=search_term)
+    if label:
+        price_element = label.find_next("td")
+        if price_element:
+            raw_text = price_element.get_text(strip=True)
+            return raw_text.replace(" USD", "").strip()
+    return None
+
+
+def extract_apmex_prices(content, metals):
+    """Returns {name: price_str} for every metal found in the page bytes `content`.
+
+    Uses the precompiled patterns first and falls back to one DOM parse only
+    if some metal was not matched.
+    """
+    prices = {}
+    missing = []
+    spans = hidden_spans(content)
+    for metal in metals:
+        cell = find_price_cell(content, metal["search_term"], spans)
+        price = _cell_text(cell) if cell is not None else ""
+        if price:
+            prices[metal["name"]] = price
+        else:
+            missing.append(metal)
+
+    if missing:
+        from bs4 import BeautifulSoup  # only needed on this slow path
+        soup = BeautifulSoup(content, 'html.parser')
+        for metal in missing:
+            price = extract_apmex_price(soup, metal["search_term"])
+            if price:
+                prices[metal["name"]] = price
+    return prices
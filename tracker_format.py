@@ -0,0 +1,51 @@
+"""Currency formatting compiled once per (currency, rate).
+
+format_price()/convert_price() used to rebuild the symbol table and look up
+the exchange rate on every call, once per table row. A CurrencyFormatter
+resolves the symbol and builds a bound str.format for one currency and rate
+up front. Its *_column methods convert and format a whole array of values in
+one pass.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+CURRENCY_SYMBOLS = {"USD": "$", "GBP": "£", "EUR": "€", "CAD": "CA$", "AUD": "AU$", "MXN": "MX$", "CHF": "Fr"}
+
+
+class CurrencyFormatter:
+    """Formats money in one currency; `rate` converts USD into it."""
+
+    __slots__ = ("currency", "rate", "symbol", "_format")
+
+    def __init__(self, currency, rate=1.0):
+        self.currency = currency
+        self.rate = rate
+        self.symbol = CURRENCY_SYMBOLS.get(currency, currency + " ")
+        self._format = (self.symbol.replace("{", "{{").replace("}", "}}") + "{:,.2f}").format
+
+    def __call__(self, value):
+        """Formats a value already in this currency."""
+        return self._format(value)
+
+    def convert(self, usd_value):
+        """Converts a USD value and formats it."""
+        return self._format(usd_value * self.rate)
+
+    def format_column(self, values, missing=""):
+        """Formats an array of values already in this currency; NaN entries become `missing`."""
+        values = np.asarray(values, dtype=np.float64)
+        out = list(map(self._format, values.tolist()))
+        for i in np.flatnonzero(np.isnan(values)).tolist():
+            out[i] = missing
+        return out
+
+    def convert_column(self, usd_values, missing=""):
+        """Converts an array of USD values and formats them; NaN entries become `missing`."""
+        return self.format_column(np.asarray(usd_values, dtype=np.float64) * self.rate, missing)
+
+
+@lru_cache(maxsize=64)
+def get_formatter(currency, rate=1.0):
+    """Shared CurrencyFormatter for (currency, rate)."""
+    return CurrencyFormatter(currency, rate)
@@ -0,0 +1,120 @@
+"""Persistent spot price history in SQLite.
+
+Every quote is appended to a WITHOUT ROWID table clustered on (metal, ts),
+so range scans read contiguous pages. Alongside it, 1 minute / 1 hour /
+1 day OHLC rollups are maintained on insert, so charting months of 60 s
+polling reads a few hundred rollup rows instead of every raw quote.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+# Source codes stored per quote (kept as small integers to keep rows compact)
+SOURCES = ("primary", "fallback", "manual")
+
+# Rollup resolutions in seconds
+ROLLUPS = (60, 3600, 86400)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    metal  TEXT    NOT NULL,
+    ts     INTEGER NOT NULL,
+    price  REAL    NOT NULL,
+    source INTEGER NOT NULL,
+    PRIMARY KEY (metal, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution INTEGER NOT NULL,
+    metal      TEXT    NOT NULL,
+    bucket     INTEGER NOT NULL,
+    open       REAL    NOT NULL,
+    high       REAL    NOT NULL,
+    low        REAL    NOT NULL,
+    close      REAL    NOT NULL,
+    count      INTEGER NOT NULL,
+    PRIMARY KEY (resolution, metal, bucket)
+) WITHOUT ROWID;
+"""
+
+_UPSERT_ROLLUP = """
+INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+ON CONFLICT (resolution, metal, bucket) DO UPDATE SET
+    high = max(high, excluded.high),
+    low = min(low, excluded.low),
+    close = excluded.close,
+    count = count + 1
+"""
+
+
+class PriceHistory:
+    """Append-only quote store with time-bucketed rollups. Safe to share between threads.
+
+    The database (and its directory) is only opened on first use.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+
+    @property
+    def _conn(self):
+        # Callers hold self._lock
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._db = conn
+        return self._db
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def record(self, quotes, ts=None):
+        """Appends quotes given as (metal, price_usd, source) tuples, all stamped `ts`.
+
+        `source` is one of SOURCES. Non-positive prices are ignored, and so is
+        a second quote for a metal in the same second: the first one stays,
+        and only stored quotes are counted in the rollups.
+        """
+        ts = int(ts if ts is not None else time.time())
+        rows = [(metal, ts, price, SOURCES.index(source)) for metal, price, source in quotes if price > 0]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            stored = [row for row in rows
+                      if self._conn.execute("INSERT OR IGNORE INTO quotes VALUES (?, ?, ?, ?)", row).rowcount]
+            self._conn.executemany(_UPSERT_ROLLUP, [(res, metal, ts - ts % res, price, price, price, price)
+                                                    for res in ROLLUPS for metal, _, price, _ in stored])
+
+    def quotes(self, metal, start, end):
+        """Raw quotes as [(ts, price, source)] with start <= ts < end."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ts, price, source FROM quotes WHERE metal = ? AND ts >= ? AND ts < ? ORDER BY ts",
+                (metal, int(start), int(end))).fetchall()
+        return [(ts, price, SOURCES[source]) for ts, price, source in rows]
+
+    def rollup(self, metal, resolution, start, end):
+        """OHLC buckets as [(bucket_ts, open, high, low, close, count)] overlapping [start, end)."""
+        if resolution not in ROLLUPS:
+            raise ValueError(f"resolution must be one of {ROLLUPS}")
+        with self._lock:
+            return self._conn.execute(
+                "SELECT bucket, open, high, low, close, count FROM rollups "
+                "WHERE resolution = ? AND metal = ? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+                (resolution, metal, int(start) - int(start) % resolution, int(end))).fetchall()
+
+    def series(self, metal, start, end, max_points=1000):
+        """[(ts, price)] for charting, read from the finest rollup that fits in `max_points`."""
+        span = max(1, end - start)
+        for resolution in ROLLUPS:
+            if span / resolution <= max_points or resolution == ROLLUPS[-1]:
+                return [(row[0], row[4]) for row in self.rollup(metal, resolution, start, end)]
@@ -0,0 +1,187 @@
+"""Holdings inventory with vectorized, incremental revaluation.
+
+An inventory is a list of lots. Each lot is either a catalogue coin
+(referred to by name) or a free-form item with its own metal, weight and
+purity, times a quantity. Lots are held in parallel NumPy arrays. Running
+value totals are kept per country, metal and purity. A revaluation only
+recomputes the lots whose metal price moved or whose quantity was edited,
+and it applies their value deltas to the totals.
+
+Holdings load from CSV or SQLite. Columns (any order, extras ignored):
+    coin       catalogue coin name; or leave empty and give metal/weight_g/purity
+    category   catalogue category key, only needed if a coin name is ambiguous
+    metal      default Silver
+    weight_g   gross weight of one item in grams
+    purity     fineness, 0-1
+    quantity   default 1
+    country    default: the coin's catalogue category title
+    label      display name; default: the coin name
+SQLite files must have a `holdings` table with the same columns.
+"""
+import csv
+import sqlite3
+
+import numpy as np
+
+CONST_GRAMS_PER_OZ = 31.1034768
+
+GROUPS = ("country", "metal", "purity")
+
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+
+class Inventory:
+    """Parallel arrays describing every lot, plus per-group running totals.
+
+    Attributes:
+        labels:    lot display names.
+        quantity:  float64 number of items per lot.
+        unit_oz:   fine troy ounces in one item.
+        fine_oz:   unit_oz * quantity.
+        values:    last melt value of each lot in USD (NaN while unpriced).
+        metals:    distinct metal names; `metal_index` maps each lot into it.
+    """
+
+    def __init__(self, lots, catalogue=None):
+        lookup = {}
+        if catalogue is not None:
+            for key, title in catalogue.categories:
+                rows = catalogue.slices[key]
+                for i in range(rows.start, rows.stop):
+                    lookup.setdefault(catalogue.names[i], []).append((key, title, i))
+
+        labels, metals, countries, weights, purities, quantities = [], [], [], [], [], []
+        for n, lot in enumerate(lots, 1):
+            coin = (lot.get("coin") or "").strip()
+            if coin:
+                matches = lookup.get(coin, [])
+                if lot.get("category"):
+                    matches = [m for m in matches if m[0] == lot["category"]]
+                if len(matches) != 1:
+                    problem = "unknown" if not matches else "ambiguous (give a category)"
+                    raise ValueError(f"lot {n}: catalogue coin {coin!r} is {problem}")
+                _, title, i = matches[0]
+                metal = catalogue.metals[catalogue.metal_index[i]]
+                weight, purity = catalogue.weight_g[i], catalogue.purity[i]
+                country = lot.get("country") or title
+            else:
+                try:
+                    weight, purity = float(lot["weight_g"]), float(lot["purity"])
+                except (KeyError, TypeError, ValueError):
+                    raise ValueError(f"lot {n}: needs a coin name or weight_g and purity") from None
+                metal = lot.get("metal") or "Silver"
+                country = lot.get("country") or "Other"
+            labels.append(lot.get("label") or coin or f"{weight:g} g {metal} @ {purity:g}")
+            metals.append(metal)
+            countries.append(country)
+            weights.append(weight)
+            purities.append(purity)
+            quantity = lot.get("quantity")
+            quantities.append(1.0 if quantity is None or quantity == "" else float(quantity))
+
+        self.labels = labels
+        self.quantity = np.array(quantities, dtype=np.float64)
+        self.unit_oz = np.array(weights, dtype=np.float64) * np.array(purities) / CONST_GRAMS_PER_OZ
+        self.fine_oz = self.unit_oz * self.quantity
+        self.values = np.full(len(labels), np.nan)
+
+        # Group keys: each dimension has its labels and a per-lot index into them
+        self.metals, self.metal_index = _index(metals)
+        self._groups = {
+            "country": _index(countries),
+            "metal": (self.metals, self.metal_index),
+            "purity": _index([round(p, 4) for p in purities]),
+        }
+        self._rows_by_metal = [np.flatnonzero(self.metal_index == m) for m in range(len(self.metals))]
+
+        self._spot = np.full(len(self.metals), np.nan)   # per-metal USD used for `values`
+        self._counted = np.zeros(len(labels))             # values with NaN as 0, as summed into totals
+        self._value_totals = {dim: np.zeros(len(keys)) for dim, (keys, _) in self._groups.items()}
+        self._dirty = set()
+
+    def __len__(self):
+        return len(self.labels)
+
+    def set_quantity(self, lot, quantity):
+        """Changes how many items lot `lot` holds; the value updates on the next revalue()."""
+        self.quantity[lot] = quantity
+        self.fine_oz[lot] = self.unit_oz[lot] * quantity
+        self._dirty.add(lot)
+
+    def revalue(self, spot_usd):
+        """Revalues the lots affected by new {metal: spot usd} prices or edited quantities.
+
+        Returns the number of lots recomputed. Metals without a usable price
+        leave their lots unpriced (NaN) and out of the value totals.
+        """
+        spot = np.array([spot_usd.get(m) or np.nan for m in self.metals], dtype=np.float64)
+        spot[spot <= 0] = np.nan
+        moved = np.flatnonzero((spot != self._spot) & ~(np.isnan(spot) & np.isnan(self._spot)))
+        self._spot = spot
+
+        parts = [self._rows_by_metal[m] for m in moved]
+        if self._dirty:
+            parts.append(np.fromiter(self._dirty, dtype=np.intp, count=len(self._dirty)))
+            self._dirty.clear()
+        if not parts:
+            return 0
+        rows = np.unique(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+
+        new = self.fine_oz[rows] * spot[self.metal_index[rows]]
+        counted = np.nan_to_num(new)
+        delta = counted - self._counted[rows]
+        for dim, (keys, index) in self._groups.items():
+            self._value_totals[dim] += np.bincount(index[rows], weights=delta, minlength=len(keys))
+        self._counted[rows] = counted
+        self.values[rows] = new
+        return len(rows)
+
+    def recompute_totals(self):
+        """Rebuilds the running totals from scratch, discarding accumulated rounding drift."""
+        for dim, (keys, index) in self._groups.items():
+            self._value_totals[dim] = np.bincount(index, weights=self._counted, minlength=len(keys))
+
+    @property
+    def total_value(self):
+        return float(self._value_totals["metal"].sum())
+
+    @property
+    def total_fine_oz(self):
+        """{metal: fine troy oz held}."""
+        return dict(zip(self.metals, np.bincount(self.metal_index, weights=self.fine_oz,
+                                                 minlength=len(self.metals)).tolist()))
+
+    @property
+    def unpriced(self):
+        """Number of lots whose metal currently has no price."""
+        return int(np.isnan(self.values).sum())
+
+    def totals(self, by):
+        """[(group, lots, fine oz, value usd)] for `by` in GROUPS, largest value first."""
+        keys, index = self._groups[by]
+        lots = np.bincount(index, minlength=len(keys)).tolist()
+        fine_oz = np.bincount(index, weights=self.fine_oz, minlength=len(keys)).tolist()
+        rows = zip(keys, lots, fine_oz, self._value_totals[by].tolist())
+        return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+def _index(keys):
+    """(distinct keys in first-seen order, intp array mapping each key to its position)."""
+    positions = {}
+    index = np.fromiter((positions.setdefault(k, len(positions)) for k in keys), dtype=np.intp, count=len(keys))
+    return list(positions), index
+
+
+def load_inventory(path, catalogue=None):
+    """Loads holdings from a CSV file or an SQLite database with a `holdings` table."""
+    if path.lower().endswith(SQLITE_SUFFIXES):
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+        try:
+            lots = [dict(row) for row in conn.execute("SELECT * FROM holdings")]
+        finally:
+            conn.close()
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            lots = list(csv.DictReader(f))
+    return Inventory(lots, catalogue)
@@ -0,0 +1,283 @@
+"""Pipeline instrumentation: per-request phase timings, counters and refresh traces.
+
+Every HTTP request made through tracker_core.HTTP_SESSIONS is traced into
+phases. Connect (DNS + TCP) and TLS are timed inside urllib3's connection
+objects, so they only appear when a new connection is opened. Wait is the
+time to response headers and download is the body read. Callers can add a
+parse phase. Alongside the traces, counters cover cache hits, fallback
+quotes and source errors, and durations are summarised for every stage
+(refresh, parse, render).
+
+The same data is exposed three ways:
+    METRICS.prometheus_text()   Prometheus text exposition (quote server /metrics)
+    METRICS.refreshes           the last few refreshes, request by request (diagnostics tab)
+    METRICS.log_path            if set, one JSON line per refresh and per error event
+                                (SILVER_TRACKER_METRICS_LOG)
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+PREFIX = "silver_tracker_"
+
+HELP = {
+    "http_requests_total": "HTTP requests by host and status (status 0 = no response)",
+    "http_response_bytes_total": "Response body bytes by host",
+    "http_new_connections_total": "New TCP connections opened by host",
+    "http_phase_seconds": "Time per request phase (connect includes DNS)",
+    "source_seconds": "Price source call duration by outcome",
+    "source_errors_total": "Failed price source calls",
+    "cache_lookups_total": "Price cache lookups by key and result",
+    "fallback_quotes_total": "Spot quotes served by a fallback source",
+    "refresh_seconds": "Whole refresh duration",
+    "parse_seconds": "Price extraction time by source",
+    "render_seconds": "Table render time by view mode and stage (prepare on the worker, apply on Tk)",
+    "render_requests_total": "Table re-renders requested by the UI",
+    "renders_applied_total": "Prepared table renders applied on the Tk thread",
+    "renders_dropped_total": "Prepared table renders dropped because a newer request overtook them",
+    "startup_seconds": "GUI launch to first paint / first live data",
+    "sparkline_seconds": "Time to downsample and redraw the spot price sparklines",
+    "alerts_fired_total": "Price alert rules that fired",
+    "alert_check_seconds": "Time to check every alert rule against a new snapshot",
+}
+
+PHASES = ("connect", "tls", "wait", "download", "parse")
+
+_local = threading.local()
+
+
+class RequestTrace:
+    """Timings of one HTTP request, in seconds."""
+
+    __slots__ = ("url", "host", "status", "bytes", "started", "total", "error") + PHASES + ("_clock",)
+
+    def __init__(self, url):
+        self.url = url
+        self.host = urlsplit(url).hostname or ""
+        self.status = 0
+        self.bytes = 0
+        self.started = time.time()
+        self._clock = time.perf_counter()
+        self.total = 0.0
+        self.error = None
+        for phase in PHASES:
+            setattr(self, phase, 0.0)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name != "_clock"}
+
+
+class Metrics:
+    """Thread-safe counters, duration summaries and recent refresh traces."""
+
+    def __init__(self, keep_refreshes=20):
+        self._lock = threading.Lock()
+        self._counters = {}       # (name, labels) -> value
+        self._summaries = {}      # (name, labels) -> [count, sum, max]
+        self._current = None      # dict being filled by the refresh in progress
+        self._start = 0.0         # perf_counter() when that refresh began
+        self.refreshes = deque(maxlen=keep_refreshes)
+        self.log_path = None
+
+    # --- primitives ---
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                self._summaries[key] = [1, seconds, seconds]
+            else:
+                summary[0] += 1
+                summary[1] += seconds
+                summary[2] = max(summary[2], seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observes the duration of the `with` block as `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    @contextmanager
+    def parse_timer(self, source):
+        """Times a parse step; also attributed to this thread's last request."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.observe("parse_seconds", seconds, source=source)
+            trace = getattr(_local, "trace", None)
+            if trace is not None:
+                trace.parse += seconds
+
+    # --- requests ---
+
+    def start_request(self, url):
+        trace = RequestTrace(url)
+        _local.trace = trace
+        return trace
+
+    def finish_request(self, trace, response=None, error=None):
+        trace.total = time.perf_counter() - trace._clock
+        if response is not None:
+            trace.status = response.status_code
+            trace.bytes = len(response.content)
+            elapsed = response.elapsed.total_seconds()   # send -> headers, including any connect/TLS
+            trace.wait = max(0.0, elapsed - trace.connect - trace.tls)
+            trace.download = max(0.0, trace.total - elapsed)
+        else:
+            trace.error = f"{type(error).__name__}: {error}"
+            trace.wait = max(0.0, trace.total - trace.connect - trace.tls)
+        self.inc("http_requests_total", host=trace.host, status=str(trace.status))
+        self.inc("http_response_bytes_total", trace.bytes, host=trace.host)
+        for phase in ("connect", "tls", "wait", "download"):
+            if phase in ("wait", "download") or getattr(trace, phase):
+                self.observe("http_phase_seconds", getattr(trace, phase), host=trace.host, phase=phase)
+        with self._lock:
+            if self._current is not None:
+                self._current["requests"].append(trace)
+
+    def connection_opened(self, connect, tls):
+        """Called from the instrumented urllib3 connections with their setup times."""
+        trace = getattr(_local, "trace", None)
+        if trace is not None:
+            trace.connect += connect
+            trace.tls += tls
+            self.inc("http_new_connections_total", host=trace.host)
+
+    # --- refreshes ---
+
+    def begin_refresh(self, kind="refresh"):
+        with self._lock:
+            self._current = {"kind": kind, "started": time.time(), "requests": [], "events": []}
+            self._start = time.perf_counter()
+
+    def end_refresh(self, **summary):
+        """Closes the refresh in progress, keeps it in `refreshes` and logs it."""
+        with self._lock:
+            current, self._current = self._current, None
+            if current is None:
+                return None
+            current["seconds"] = time.perf_counter() - self._start
+        self.observe("refresh_seconds", current["seconds"])
+        current.update(summary)
+        self.refreshes.append(current)
+        self._log(dict(current, event=current["kind"],
+                       requests=[trace.as_dict() for trace in current["requests"]]))
+        return current
+
+    def event(self, kind, **fields):
+        """Records a notable event (e.g. a source failure) in the refresh trace and the log."""
+        record = dict(fields, event=kind, ts=time.time())
+        with self._lock:
+            if self._current is not None:
+                self._current["events"].append(record)
+        self._log(record)
+
+    def _log(self, record):
+        if not self.log_path:
+            return
+        line = json.dumps(record, default=str)
+        with self._lock:
+            try:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            except OSError as e:
+                print(f"Could not write metrics log: {e}", file=sys.stderr)
+
+    def total(self, name, **labels):
+        """Sum of counter `name` over every label set that includes `labels`."""
+        with self._lock:
+            return sum(value for (n, l), value in self._counters.items()
+                       if n == name and all(item in l for item in labels.items()))
+
+    # --- export ---
+
+    def snapshot(self):
+        """{"counters": [...], "summaries": [...]} as plain JSON-able data."""
+        with self._lock:
+            counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in self._counters.items()]
+            summaries = [{"name": n, "labels": dict(l), "count": c, "sum": s, "max": m}
+                         for (n, l), (c, s, m) in self._summaries.items()]
+        return {"counters": counters, "summaries": summaries}
+
+    def prometheus_text(self):
+        """Everything in Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = []
+        for kind, rows in (("counter", snap["counters"]), ("summary", snap["summaries"])):
+            seen = set()
+            for row in sorted(rows, key=lambda r: (r["name"], sorted(r["labels"].items()))):
+                name = PREFIX + row["name"]
+                if name not in seen:
+                    seen.add(name)
+                    lines.append(f"# HELP {name} {HELP.get(row['name'], row['name'])}")
+                    lines.append(f"# TYPE {name} {kind}")
+                labels = ",".join(f'{k}="{v}"' for k, v in sorted(row["labels"].items()))
+                labels = "{" + labels + "}" if labels else ""
+                if kind == "counter":
+                    lines.append(f"{name}{labels} {row['value']:g}")
+                else:
+                    lines.append(f"{name}_count{labels} {row['count']}")
+                    lines.append(f"{name}_sum{labels} {row['sum']:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+# JSON-lines log (also set by the CLI's and GUI's --metrics-log)
+METRICS.log_path = os.environ.get("SILVER_TRACKER_METRICS_LOG") or None
+
+
+def instrument_session(session):
+    """Makes every connection `session` opens report its connect and TLS time to METRICS."""
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class TimedMixin:
+        def _new_conn(self):
+            start = time.perf_counter()
+            try:
+                return super()._new_conn()
+            finally:
+                self._connect_seconds = time.perf_counter() - start
+
+        def connect(self):
+            self._connect_seconds = 0.0
+            start = time.perf_counter()
+            super().connect()
+            total = time.perf_counter() - start
+            tls = total - self._connect_seconds if isinstance(self, HTTPSConnection) else 0.0
+            METRICS.connection_opened(self._connect_seconds, max(0.0, tls))
+
+    class TimedHTTPConnection(TimedMixin, HTTPConnection):
+        pass
+
+    class TimedHTTPSConnection(TimedMixin, HTTPSConnection):
+        pass
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = TimedHTTPConnection
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = TimedHTTPSConnection
+
+    pools = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+    for adapter in session.adapters.values():
+        manager = getattr(adapter, "poolmanager", None)
+        if manager is not None:
+            manager.pool_classes_by_scheme = pools
+    return session
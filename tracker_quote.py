@@ -0,0 +1,116 @@
+"""Spot quotes as typed records.
+
+Sources hand back plain floats; the fetch layer wraps each one in a Quote
+carrying the value in USD, the source that supplied it, when it was fetched
+and status flags. Text such as "$31.20 *" is only produced for display (and
+for the legacy string form in the cache file and quote server snapshot).
+"""
+import math
+import re
+import time
+
+from tracker_format import get_formatter
+
+# Status flags
+FALLBACK = 1      # supplied by a non-primary source
+MANUAL = 2        # entered by the user
+CACHED = 4        # reused from the price cache rather than fetched by this refresh
+UNAVAILABLE = 8   # no source could supply a price; value is NaN
+
+# Display markers appended to a price (see Quote.marker)
+FALLBACK_MARKER = " *"
+MANUAL_MARKER = " (Manual)"
+
+_NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?|\.\d+")
+
+
+def parse_usd(text):
+    """First number in `text` as a float ("$1,234.50 USD" -> 1234.5), NaN if there is none."""
+    match = _NUMBER_RE.search(text)
+    return float(match.group().replace(",", "")) if match else math.nan
+
+
+class Quote:
+    """One metal's spot price: USD `value`, `source` name, fetch `timestamp` and `flags`."""
+
+    __slots__ = ("value", "source", "timestamp", "flags")
+
+    def __init__(self, value, source, timestamp=None, flags=0):
+        self.value = float(value)
+        self.source = source
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.flags = flags
+
+    @classmethod
+    def unavailable(cls):
+        return cls(math.nan, "", 0.0, UNAVAILABLE)
+
+    @classmethod
+    def manual(cls, value):
+        return cls(value, "manual", flags=MANUAL)
+
+    @property
+    def available(self):
+        return not self.flags & UNAVAILABLE
+
+    @property
+    def is_fallback(self):
+        return bool(self.flags & FALLBACK)
+
+    @property
+    def is_manual(self):
+        return bool(self.flags & MANUAL)
+
+    @property
+    def kind(self):
+        """"primary", "fallback" or "manual" (the categories kept by the history store)."""
+        if self.flags & MANUAL:
+            return "manual"
+        return "fallback" if self.flags & FALLBACK else "primary"
+
+    @property
+    def marker(self):
+        """Suffix shown after the formatted price: " *" for fallbacks, " (Manual)" for manual."""
+        if self.flags & MANUAL:
+            return MANUAL_MARKER
+        return FALLBACK_MARKER if self.flags & FALLBACK else ""
+
+    def with_flags(self, flags):
+        """A copy with `flags` added."""
+        return Quote(self.value, self.source, self.timestamp, self.flags | flags)
+
+    def text(self):
+        """The USD display string, e.g. "$31.20 *", or "Unavailable"."""
+        if self.flags & UNAVAILABLE:
+            return "Unavailable"
+        return get_formatter("USD")(self.value) + self.marker
+
+    def to_json(self):
+        return {"value": None if self.flags & UNAVAILABLE else self.value, "source": self.source,
+                "timestamp": self.timestamp, "flags": self.flags}
+
+    @classmethod
+    def from_json(cls, raw):
+        """Reverses to_json(); also accepts the older display-string form ("$31.20 *")."""
+        if isinstance(raw, str):
+            return cls.parse(raw)
+        if raw.get("value") is None:
+            return cls.unavailable()
+        return cls(raw["value"], raw.get("source", ""), raw.get("timestamp", 0.0), raw.get("flags", 0))
+
+    @classmethod
+    def parse(cls, text, timestamp=0.0):
+        """A Quote from a display string such as "$31.20 *" or "$30.00 (Manual)"."""
+        if text.endswith(MANUAL_MARKER):
+            flags, source = MANUAL, "manual"
+        elif text.endswith(FALLBACK_MARKER):
+            flags, source = FALLBACK, ""
+        else:
+            flags, source = 0, ""
+        value = parse_usd(text)
+        if not value > 0:
+            return cls.unavailable()
+        return cls(value, source, timestamp, flags)
+
+    def __repr__(self):
+        return f"Quote({self.text()!r}, source={self.source!r}, flags={self.flags})"
@@ -0,0 +1,213 @@
+"""Record/replay HTTP transport for running the fetch layer without a network.
+
+Installed on tracker_core.HTTP_SESSIONS (see tracker_core.configure_transport):
+
+    RecordingTransport  passes requests through to the real sessions and
+                        saves every response to a JSON recording.
+    ReplayTransport     answers from a recording. It can inject latency,
+                        connection errors, timeouts and 403s.
+
+Refreshes, timeouts and fallbacks can then be benchmarked and reproduced
+on machines with no network access.
+
+Recording format:
+
+    {"version": 1, "entries": [
+        {"url": "...", "status": 200, "content_type": "text/html", "elapsed": 0.41,
+         "body": "..." | "body_b64": "..." | "body_file": "page.html"}, ...]}
+
+`body_file` is relative to the recording. A URL with several entries
+replays them in turn, cycling. URLs are matched without their `api_key`
+query parameter, which is never written to a recording.
+
+A fault spec is a comma-separated list of `key=value` items, optionally
+prefixed with `host:` to apply to one host only (suffix match):
+
+    latency=0.2,jitter=0.1,apmex.com:forbidden=1,kitco.com:error=0.5
+
+    scale      multiply each entry's recorded `elapsed` (default 0: ignore it)
+    latency    extra seconds added to every response
+    jitter     up to this many extra random seconds
+    error      probability of a connection error
+    timeout    probability of hanging until the request's timeout
+    forbidden  probability of a 403 instead of the recorded response
+"""
+import base64
+import json
+import os
+import random
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+RECORDING_VERSION = 1
+
+SECRET_PARAMS = ("api_key",)
+
+
+def normalize_url(url):
+    """`url` without secret query parameters, as stored in and matched against recordings."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in SECRET_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class FaultPlan:
+    """Latency and failure injection for one host (or all hosts)."""
+
+    __slots__ = ("scale", "latency", "jitter", "error", "timeout", "forbidden")
+
+    def __init__(self, scale=0.0, latency=0.0, jitter=0.0, error=0.0, timeout=0.0, forbidden=0.0):
+        self.scale = scale
+        self.latency = latency
+        self.jitter = jitter
+        self.error = error
+        self.timeout = timeout
+        self.forbidden = forbidden
+
+    def copy(self):
+        return FaultPlan(**{name: getattr(self, name) for name in self.__slots__})
+
+
+def parse_faults(spec):
+    """Parses a fault spec into (default FaultPlan, {host: FaultPlan})."""
+    default = FaultPlan()
+    by_host = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        target, _, value = item.partition("=")
+        host, _, key = target.rpartition(":")
+        if key not in FaultPlan.__slots__:
+            raise ValueError(f"unknown fault {key!r} in {item!r}")
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValueError(f"fault {item!r} needs a number") from None
+        plan = by_host.setdefault(host, default.copy()) if host else default
+        setattr(plan, key, value)
+    return default, by_host
+
+
+def _response(url, status, body, content_type=None, elapsed=0.0):
+    """A real requests.Response carrying a replayed body."""
+    import datetime
+    import requests
+    from requests.structures import CaseInsensitiveDict
+    resp = requests.Response()
+    resp.url = url
+    resp.status_code = status
+    resp.reason = {200: "OK", 403: "Forbidden", 404: "Not Found"}.get(status, "")
+    resp._content = body
+    resp.encoding = "utf-8"
+    resp.headers = CaseInsensitiveDict({"Content-Type": content_type} if content_type else {})
+    resp.elapsed = datetime.timedelta(seconds=elapsed)
+    return resp
+
+
+class ReplayTransport:
+    """Serves responses from a recording, with faults injected per `faults` spec.
+
+    Faults are drawn from a generator seeded with `seed`, so a
+    single-threaded sequence of requests fails the same way on every run.
+    """
+
+    def __init__(self, path, faults=None, seed=0):
+        self.path = path
+        with open(path, "r", encoding="utf-8") as f:
+            recording = json.load(f)
+        base = os.path.dirname(os.path.abspath(path))
+        self._entries = {}
+        for entry in recording.get("entries", []):
+            if "body_file" in entry:
+                with open(os.path.join(base, entry["body_file"]), "rb") as f:
+                    body = f.read()
+            elif "body_b64" in entry:
+                body = base64.b64decode(entry["body_b64"])
+            else:
+                body = entry.get("body", "").encode("utf-8")
+            self._entries.setdefault(normalize_url(entry["url"]), []).append(
+                (entry.get("status", 200), body, entry.get("content_type"), float(entry.get("elapsed", 0.0))))
+        self.default_faults, self.host_faults = parse_faults(faults)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._turn = {}
+        self.stats = {"requests": 0, "misses": 0, "errors": 0, "timeouts": 0, "forbidden": 0}
+
+    def _faults_for(self, url):
+        host = urlsplit(url).hostname or ""
+        for suffix, plan in self.host_faults.items():
+            if host == suffix or host.endswith("." + suffix):
+                return plan
+        return self.default_faults
+
+    def get(self, url, timeout, headers=None, scraper=False):
+        import requests
+        key = normalize_url(url)
+        faults = self._faults_for(url)
+        with self._lock:
+            self.stats["requests"] += 1
+            entries = self._entries.get(key)
+            if entries:
+                turn = self._turn.get(key, 0)
+                self._turn[key] = turn + 1
+                status, body, content_type, elapsed = entries[turn % len(entries)]
+            roll = self._random.random()
+            delay = faults.latency + self._random.uniform(0.0, faults.jitter)
+        if not entries:
+            with self._lock:
+                self.stats["misses"] += 1
+            return _response(url, 404, b"", "text/plain")
+        delay += elapsed * faults.scale
+
+        # One roll picks at most one fault: error, then timeout, then 403
+        if roll < faults.error:
+            self._count("errors")
+            time.sleep(min(delay, timeout))
+            raise requests.exceptions.ConnectionError(f"injected connection error for {url}")
+        if roll < faults.error + faults.timeout or delay >= timeout:
+            self._count("timeouts")
+            time.sleep(timeout)
+            raise requests.exceptions.ReadTimeout(f"injected timeout after {timeout}s for {url}")
+        time.sleep(delay)
+        if roll < faults.error + faults.timeout + faults.forbidden:
+            self._count("forbidden")
+            return _response(url, 403, b"Forbidden", "text/plain", delay)
+        return _response(url, status, body, content_type, delay)
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+
+class RecordingTransport:
+    """Fetches through `inner` (an HttpSessions) and appends each response to a recording."""
+
+    def __init__(self, path, inner):
+        self.path = path
+        self.inner = inner
+        self._lock = threading.Lock()
+        self._entries = []
+
+    def get(self, url, timeout, headers=None, scraper=False):
+        start = time.perf_counter()
+        response = self.inner.get(url, timeout, headers=headers, scraper=scraper)
+        entry = {
+            "url": normalize_url(url),
+            "status": response.status_code,
+            "content_type": response.headers.get("Content-Type"),
+            "elapsed": round(time.perf_counter() - start, 4),
+        }
+        try:
+            entry["body"] = response.content.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body_b64"] = base64.b64encode(response.content).decode("ascii")
+        with self._lock:
+            self._entries.append(entry)
+            self.save()
+        return response
+
+    def save(self):
+        """Writes the recording atomically (called after every response)."""
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": RECORDING_VERSION, "entries": self._entries}, f, indent=1)
+        os.replace(tmp, self.path)
@@ -0,0 +1,111 @@
+"""Spot-price scenario grid: the catalogue valued across a sweep of prices and currencies.
+
+For one metal, every catalogue row of that metal is valued at every spot
+price in a sweep (e.g. $20-$60 in $0.50 steps), in USD, as one outer product:
+
+    usd[row, price] = fine_oz[row] * usd_price[price]
+
+Any other currency with a known exchange rate is that table times its rate,
+computed only for the rows and prices being shown or written, so memory
+does not grow with the number of currencies. Tens of thousands of coins by
+a few hundred prices take a fraction of a second; writing the CSV export
+takes longer than computing it.
+"""
+import numpy as np
+
+# Default sweep in USD per troy ounce (silver)
+DEFAULT_RANGE = (20.0, 60.0, 0.5)
+
+# Largest grid built (rows x prices USD cells of 8 bytes, so about 400 MB)
+MAX_CELLS = 50_000_000
+
+# Values converted and formatted at a time by ScenarioGrid.write_csv
+CSV_BLOCK_CELLS = 1 << 18
+
+
+def _csv_field(text):
+    if any(c in text for c in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def price_steps(start, stop, step):
+    """Prices from `start` to `stop` inclusive in `step` increments."""
+    if step <= 0 or stop < start:
+        raise ValueError("need step > 0 and stop >= start")
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    if count > MAX_CELLS:
+        raise ValueError(f"{count:,} prices is too many; use a narrower range or a bigger step")
+    return np.round(start + step * np.arange(count), 10)
+
+
+def suggest_range(spot):
+    """A sweep of roughly -40% to +40% around `spot` in round steps (80 or so prices)."""
+    step = float(10 ** np.floor(np.log10(spot * 0.8 / 80)))
+    for multiple in (1, 2, 5, 10):
+        if spot * 0.8 / (step * multiple) <= 100:
+            step *= multiple
+            break
+    return (max(step, np.floor(spot * 0.6 / step) * step), np.ceil(spot * 1.4 / step) * step, step)
+
+
+class ScenarioGrid:
+    """Melt values of one metal's catalogue rows at every (spot price, currency) pair.
+
+    Attributes:
+        rows:       catalogue row indices included (every row of `metal`).
+        prices:     USD spot prices swept, float64.
+        currencies: currency codes, in `rates` order.
+        usd:        float64 array, rows x prices, in USD (see table() for other currencies).
+    """
+
+    def __init__(self, catalogue, prices, rates, metal="Silver"):
+        self.catalogue = catalogue
+        self.metal = metal
+        if metal in catalogue.metals:
+            self.rows = np.flatnonzero(catalogue.metal_index == catalogue.metals.index(metal))
+        else:
+            self.rows = np.empty(0, dtype=np.intp)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.currencies = list(rates)
+        self.rates = np.array([rates[c] for c in self.currencies], dtype=np.float64)
+        if len(self.rows) * len(self.prices) > MAX_CELLS:
+            raise ValueError(f"{len(self.rows)} coins x {len(self.prices)} prices is too large a grid; "
+                             f"use a narrower range or a bigger step")
+        self.usd = np.multiply.outer(catalogue.fine_oz[self.rows], self.prices)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def table(self, currency, rows=slice(None), columns=slice(None)):
+        """Values in `currency` as a new rows x prices array, for the `rows` and `columns` given."""
+        return self.usd[rows][:, columns] * self.rates[self.currencies.index(currency)]
+
+    def price_index(self, price):
+        """Index of the swept price nearest to `price`."""
+        i = int(np.searchsorted(self.prices, price))
+        if i == len(self.prices) or (i and price - self.prices[i - 1] < self.prices[i] - price):
+            i -= 1
+        return i
+
+    def write_csv(self, f, currencies=None):
+        """Writes one line per (currency, coin) with a value column per swept price."""
+        catalogue = self.catalogue
+        category = np.empty(len(catalogue), dtype=object)
+        for key, rows in catalogue.slices.items():
+            category[rows] = key
+        # Everything but the values is the same for each currency
+        metal = _csv_field(self.metal)
+        prefixes = [f"{_csv_field(key)},{_csv_field(catalogue.names[i])},{metal},{oz:.6f},"
+                    for key, i, oz in zip(category[self.rows].tolist(), self.rows.tolist(),
+                                          catalogue.fine_oz[self.rows].tolist())]
+        row_format = ",".join(["%.2f"] * len(self.prices)) + "\n"
+        block = max(1, CSV_BLOCK_CELLS // max(1, len(self.prices)))
+
+        f.write(",".join(["currency", "category", "name", "metal", "fine_oz"] + [f"{p:g}" for p in self.prices]) + "\n")
+        for currency in currencies or self.currencies:
+            lead = _csv_field(currency) + ","
+            for start in range(0, len(prefixes), block):
+                values = self.table(currency, slice(start, start + block)).tolist()
+                f.write("".join([lead + prefix + row_format % tuple(row)
+                                 for prefix, row in zip(prefixes[start:start + block], values)]))
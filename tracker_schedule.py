@@ -0,0 +1,82 @@
+"""Auto-refresh scheduling: steady cadence, backoff, idle slow-down and jitter.
+
+The next refresh is timed from the *start* of the previous one, so the
+cadence does not drift by however long a fetch took. A failed refresh backs
+off exponentially. When prices come back unchanged several times in a row
+(for example, markets are closed at the weekend) the interval slowly
+stretches. Each delay gets a little random jitter so that several instances
+started together do not all hit APMEX in the same second.
+"""
+import random
+import time
+
+DEFAULT_INTERVAL = 60.0
+
+# Backoff and idle steps past this many add nothing (the interval is capped
+# long before) and would overflow a float after a few days of outage
+MAX_STEPS = 64
+
+
+def refresh_outcome(data):
+    """Returns (ok, fingerprint) for a get_all_data() result, or (False, None) if there is none.
+
+    A refresh is ok if at least one spot price was available. The fingerprint
+    changes whenever any quoted price, or whether it is a fallback, does.
+    """
+    if not data:
+        return False, None
+    quotes = [row["quote"] for row in data["spot"]]
+    fingerprint = tuple((q.value, q.kind) if q.available else None for q in quotes)
+    return any(q.available for q in quotes), fingerprint
+
+
+class RefreshScheduler:
+    """Works out how long to wait before the next refresh.
+
+    Call start() when a refresh begins and finish(ok, fingerprint) when it
+    ends. finish() returns the number of seconds to wait before starting
+    the next refresh.
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL, max_interval=900.0, backoff=2.0,
+                 idle_after=3, idle_factor=1.5, jitter=0.1):
+        self.interval = interval
+        self.max_interval = max(max_interval, interval)
+        self.backoff = backoff
+        self.idle_after = idle_after
+        self.idle_factor = idle_factor
+        self.jitter = jitter
+        self.failures = 0          # consecutive failed refreshes
+        self.unchanged = 0         # consecutive refreshes with identical prices
+        self.started_at = None
+        self._fingerprint = None
+
+    def start(self, now=None):
+        self.started_at = time.monotonic() if now is None else now
+
+    def current_interval(self):
+        """The interval before jitter, given the recent failures and unchanged refreshes."""
+        if self.failures:
+            interval = self.interval * self.backoff ** min(self.failures, MAX_STEPS)
+        elif self.unchanged >= self.idle_after:
+            interval = self.interval * self.idle_factor ** min(self.unchanged - self.idle_after + 1, MAX_STEPS)
+        else:
+            interval = self.interval
+        return min(interval, self.max_interval)
+
+    def finish(self, ok, fingerprint=None, now=None):
+        """Records a refresh's outcome and returns the delay until the next one starts."""
+        now = time.monotonic() if now is None else now
+        if not ok:
+            self.failures += 1
+        else:
+            self.failures = 0
+            if fingerprint is not None and fingerprint == self._fingerprint:
+                self.unchanged += 1
+            else:
+                self.unchanged = 0
+            self._fingerprint = fingerprint
+
+        interval = self.current_interval() * (1 + random.uniform(-self.jitter, self.jitter))
+        started_at = now if self.started_at is None else self.started_at
+        return max(0.0, started_at + interval - now)
@@ -0,0 +1,173 @@
+"""Local HTTP/JSON quote server.
+
+One process owns the refresh loop and every client reads from it, so N
+GUIs or scripts cost one upstream scrape instead of N:
+
+    silver-tracker serve --port 8765
+    silver-tracker-gui --server http://127.0.0.1:8765
+
+Endpoints (all GET, JSON unless noted):
+    /spot[?currency=EUR]    spot prices
+    /coins[?currency=EUR]   melt value of every catalogue coin
+    /snapshot               quotes (value, source, timestamp, flags) and exchange rates (what GUI clients poll)
+    /stream                 Server-Sent Events; one "snapshot" event per refresh
+    /metrics                refresh timings and counters, Prometheus text format (see tracker_metrics)
+"""
+import asyncio
+import json
+import sys
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import tracker_core as core
+from tracker_metrics import METRICS
+from tracker_schedule import DEFAULT_INTERVAL, RefreshScheduler, refresh_outcome
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+SSE_KEEPALIVE = 15.0   # seconds between comment lines on an idle stream
+
+
+class QuoteServer:
+    """Refreshes quotes and serves the latest snapshot.
+
+    Refreshes start every `interval` seconds, backing off while upstream fails
+    and stretching while prices are unchanged (see tracker_schedule). Each
+    refresh is checked against `alerts` (a tracker_alerts.AlertEngine), if given.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, interval=DEFAULT_INTERVAL, alerts=None):
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.alerts = alerts
+        self.scheduler = RefreshScheduler(interval)
+        self.data = None
+        self.updated = None
+        self._changed = None   # asyncio.Event, replaced after every publish
+
+    # --- refresh loop ---
+
+    async def refresh_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self.scheduler.start()
+            data = None
+            try:
+                data = await loop.run_in_executor(None, core.get_all_data)
+            except Exception as e:
+                print(f"Refresh failed: {e}", file=sys.stderr)
+            else:
+                if self.alerts is not None:
+                    try:
+                        self.alerts.check(data, core.STATE.exchange_rates)
+                    except Exception as e:
+                        print(f"Alert check failed: {e}", file=sys.stderr)
+                self.publish(data)
+            await asyncio.sleep(self.scheduler.finish(*refresh_outcome(data)))
+
+    def publish(self, data):
+        self.data = data
+        self.updated = time.time()
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def snapshot(self):
+        """Raw prices and rates; clients rebuild coin values with core.build_data()."""
+        return {
+            "updated": self.updated,
+            "prices": {row["name"]: row["quote"].text() for row in self.data["spot"]},   # for older clients
+            "quotes": {row["name"]: row["quote"].to_json() for row in self.data["spot"]},
+            "exchange_rates": dict(core.STATE.exchange_rates),
+        }
+
+    # --- HTTP ---
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # headers are not needed
+            if len(request_line) < 2 or request_line[0] != "GET":
+                await self.send_json(writer, "405 Method Not Allowed", {"error": "only GET is supported"})
+                return
+
+            url = urlsplit(request_line[1])
+            query = parse_qs(url.query)
+            currency = query.get("currency", ["USD"])[0].upper()
+            if currency not in core.CURRENCY_OPTIONS:
+                await self.send_json(writer, "400 Bad Request",
+                                     {"error": f"currency must be one of {core.CURRENCY_OPTIONS}"})
+                return
+
+            if url.path == "/stream":
+                await self.stream(writer)
+            elif url.path == "/metrics":
+                await self.send_body(writer, "200 OK", METRICS.prometheus_text().encode("utf-8"),
+                                     "text/plain; version=0.0.4")
+            elif url.path not in ("/spot", "/coins", "/snapshot"):
+                await self.send_json(writer, "404 Not Found", {"error": f"no such endpoint: {url.path}"})
+            elif self.data is None:
+                await self.send_json(writer, "503 Service Unavailable", {"error": "first refresh still running"})
+            elif url.path == "/snapshot":
+                await self.send_json(writer, "200 OK", self.snapshot())
+            else:
+                spot, coins = core.snapshot_rows(self.data, currency)
+                key = url.path[1:]
+                await self.send_json(writer, "200 OK",
+                                     {"updated": self.updated, key: spot if key == "spot" else coins})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def send_json(self, writer, status, payload):
+        await self.send_body(writer, status, json.dumps(payload).encode("utf-8"), "application/json")
+
+    async def send_body(self, writer, status, body, content_type):
+        writer.write((f"HTTP/1.1 {status}\r\n"
+                      f"Content-Type: {content_type}\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      "Access-Control-Allow-Origin: *\r\n"
+                      "Connection: close\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def stream(self, writer):
+        writer.write(("HTTP/1.1 200 OK\r\n"
+                      "Content-Type: text/event-stream\r\n"
+                      "Cache-Control: no-cache\r\n"
+                      "Access-Control-Allow-Origin: *\r\n"
+                      "Connection: close\r\n\r\n").encode("latin-1"))
+        if self.data is not None:
+            writer.write(self.sse_event())
+        await writer.drain()
+        while True:
+            changed = self._changed
+            try:
+                await asyncio.wait_for(changed.wait(), SSE_KEEPALIVE)
+                writer.write(self.sse_event())
+            except asyncio.TimeoutError:
+                writer.write(b": keep-alive\n\n")
+            await writer.drain()
+
+    def sse_event(self):
+        return f"event: snapshot\ndata: {json.dumps(self.snapshot())}\n\n".encode("utf-8")
+
+    async def serve_forever(self):
+        self._changed = asyncio.Event()
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        print(f"Serving quotes on http://{self.host}:{self.port}")
+        refresher = asyncio.create_task(self.refresh_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            refresher.cancel()
+
+
+def run(host=DEFAULT_HOST, port=DEFAULT_PORT, interval=DEFAULT_INTERVAL, alerts=None):
+    """Runs a QuoteServer until interrupted."""
+    try:
+        asyncio.run(QuoteServer(host, port, interval, alerts).serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,145 @@
+"""Health tracking for price sources.
+
+Every fetch attempt is recorded against its source: latency (as an
+exponentially weighted average), success rate and the last failure. Sources
+are ranked healthiest first, and a source that keeps failing is put into a
+circuit-breaker cooldown that doubles with every further failure, so a dead
+or blocked provider stops costing its full timeout on every refresh.
+"""
+import threading
+import time
+
+
+class SourceHealth:
+    """Running statistics for one source."""
+
+    __slots__ = ("name", "successes", "failures", "latency", "consecutive_failures",
+                 "last_failure", "last_error", "cooldown_until")
+
+    def __init__(self, name):
+        self.name = name
+        self.successes = 0
+        self.failures = 0
+        self.latency = None            # EWMA of attempt duration, seconds
+        self.consecutive_failures = 0
+        self.last_failure = None       # wall-clock time
+        self.last_error = None
+        self.cooldown_until = 0.0      # wall-clock time
+
+    @property
+    def attempts(self):
+        return self.successes + self.failures
+
+    @property
+    def success_rate(self):
+        return self.successes / self.attempts if self.attempts else None
+
+
+class SourceRegistry:
+    """Thread-safe collection of SourceHealth records with ranking and cooldowns.
+
+    After `failure_threshold` consecutive failures a source cools down for
+    `base_cooldown` seconds, doubling with each further failure up to
+    `max_cooldown`. When the cooldown ends the source gets one trial attempt;
+    a success closes the breaker again.
+    """
+
+    def __init__(self, failure_threshold=2, base_cooldown=30.0, max_cooldown=900.0, alpha=0.3,
+                 preference_penalty=0.5):
+        self.preference_penalty = preference_penalty
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._health = {}
+
+    def _get(self, name):
+        health = self._health.get(name)
+        if health is None:
+            health = self._health[name] = SourceHealth(name)
+        return health
+
+    def _update_latency(self, health, latency):
+        if health.latency is None:
+            health.latency = latency
+        else:
+            health.latency += self.alpha * (latency - health.latency)
+
+    def record_success(self, name, latency):
+        with self._lock:
+            health = self._get(name)
+            health.successes += 1
+            health.consecutive_failures = 0
+            health.cooldown_until = 0.0
+            self._update_latency(health, latency)
+
+    def record_failure(self, name, latency, error):
+        with self._lock:
+            health = self._get(name)
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.last_failure = time.time()
+            health.last_error = str(error)
+            self._update_latency(health, latency)
+            over = health.consecutive_failures - self.failure_threshold
+            if over >= 0:
+                cooldown = min(self.max_cooldown, self.base_cooldown * 2 ** over)
+                health.cooldown_until = health.last_failure + cooldown
+
+    def cooldown_remaining(self, name):
+        with self._lock:
+            health = self._health.get(name)
+            return max(0.0, health.cooldown_until - time.time()) if health else 0.0
+
+    def order(self, names):
+        """Ranks `names` (given in order of preference) healthiest first.
+
+        Sources in cooldown are left out. Healthy sources rank by latency
+        inflated by failure rate, with a penalty per place down the preference
+        list so near-ties keep the preferred source in front. Untried sources
+        come next in their given order, then sources failing more often than
+        not. If every source is cooling down, all are returned, soonest to
+        recover first, rather than none.
+        """
+        now = time.time()
+        with self._lock:
+            healths = [self._get(name) for name in names]
+            ready = [(pos, h) for pos, h in enumerate(healths) if h.cooldown_until <= now]
+            if not ready:
+                return [h.name for h in sorted(healths, key=lambda h: h.cooldown_until)]
+
+            def key(item):
+                pos, h = item
+                if not h.attempts:
+                    return (0, float("inf"), pos)
+                score = (h.latency or 0.0) / max(h.success_rate, 0.05) * (1 + self.preference_penalty * pos)
+                return (int(h.success_rate < 0.5), score, pos)
+
+            return [h.name for _, h in sorted(ready, key=key)]
+
+    def stats(self):
+        """[dict] per source, for display and export."""
+        now = time.time()
+        with self._lock:
+            return [{
+                "source": h.name,
+                "attempts": h.attempts,
+                "success_rate": h.success_rate,
+                "latency_ms": round(h.latency * 1000) if h.latency is not None else None,
+                "last_failure": h.last_failure,
+                "last_error": h.last_error,
+                "cooldown_s": round(max(0.0, h.cooldown_until - now)),
+            } for h in self._health.values()]
+
+    def summary(self):
+        """One line for a status bar, e.g. 'apmex 420ms 100% | kitco cooldown 60s'."""
+        parts = []
+        for s in self.stats():
+            if not s["attempts"]:
+                continue
+            if s["cooldown_s"]:
+                parts.append(f"{s['source']} cooldown {s['cooldown_s']}s")
+            else:
+                parts.append(f"{s['source']} {s['latency_ms']}ms {s['success_rate']:.0%}")
+        return " | ".join(parts)
@@ -0,0 +1,91 @@
+"""Application state shared between the GUI thread, fetch workers and the server.
+
+Market data lives in an immutable Snapshot (the last priced data, the
+exchange rates it was valued with, and any manual spot override). Writers
+build a new Snapshot and swap it in with one reference assignment, so a
+reader that takes `STATE.snapshot` once sees a consistent set of values
+without locking. The remaining fields are display preferences that only
+the Tk thread touches.
+"""
+import threading
+import time
+from types import MappingProxyType
+
+
+class Snapshot:
+    """Frozen view of the market data at one point in time."""
+
+    __slots__ = ("data", "exchange_rates", "manual_spot", "updated")
+
+    def __init__(self, data=None, exchange_rates=None, manual_spot=None, updated=None):
+        if data is not None:
+            data["coin_usd"].setflags(write=False)
+        set_ = object.__setattr__
+        set_(self, "data", data)                       # build_data() result, or None
+        set_(self, "exchange_rates", MappingProxyType(dict(exchange_rates or {"USD": 1.0})))
+        set_(self, "manual_spot", manual_spot)         # float if the user entered a manual spot price
+        set_(self, "updated", updated)                 # wall-clock time data was published
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Snapshot is immutable; use AppState.publish()")
+
+    def replace(self, **changes):
+        """Returns a copy of this snapshot with some fields changed."""
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return Snapshot(**fields)
+
+
+class AppState:
+    """Holds the current Snapshot plus the GUI's display preferences."""
+
+    __slots__ = ("_snapshot", "_publish_lock", "_fetch_lock", "show_in_oz", "auto_refresh", "currency")
+
+    def __init__(self):
+        self._snapshot = Snapshot()
+        self._publish_lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self.show_in_oz = False
+        self.auto_refresh = False
+        self.currency = "USD"
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def publish(self, **changes):
+        """Atomically replaces the snapshot with a copy carrying `changes` and returns it.
+
+        Publishing `data` stamps the snapshot's `updated` time.
+        """
+        if "data" in changes and "updated" not in changes:
+            changes["updated"] = time.time()
+        with self._publish_lock:
+            self._snapshot = self._snapshot.replace(**changes)
+            return self._snapshot
+
+    # Shortcuts for reading a single field of the current snapshot
+    @property
+    def last_data(self):
+        return self._snapshot.data
+
+    @property
+    def exchange_rates(self):
+        return self._snapshot.exchange_rates
+
+    @property
+    def manual_spot(self):
+        return self._snapshot.manual_spot
+
+    # --- refresh guard ---
+
+    def begin_fetch(self):
+        """Claims the single refresh slot; returns False if a refresh is already running."""
+        return self._fetch_lock.acquire(blocking=False)
+
+    def end_fetch(self):
+        self._fetch_lock.release()
+
+    @property
+    def is_fetching(self):
+        return self._fetch_lock.locked()
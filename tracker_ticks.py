@@ -0,0 +1,129 @@
+"""Recent spot quotes in memory, for intraday sparklines.
+
+Each metal keeps its last `capacity` quotes in a fixed-size ring buffer of
+two float64 arrays (timestamps and USD prices), so memory stays the same
+after days of auto-refresh. For drawing, a buffer is reduced to about one
+point per pixel with LTTB (Largest-Triangle-Three-Buckets), which keeps
+the visual shape - peaks and dips included - of a much longer series.
+"""
+import threading
+
+import numpy as np
+
+# Quotes kept per metal: about 2.8 days of 60 s refreshes
+DEFAULT_CAPACITY = 4096
+
+
+class RingBuffer:
+    """The last `capacity` (time, value) pairs, overwriting the oldest."""
+
+    __slots__ = ("times", "values", "_next", "count")
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self._next = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def capacity(self):
+        return len(self.times)
+
+    @property
+    def last_time(self):
+        return self.times[self._next - 1] if self.count else None
+
+    def append(self, t, value):
+        self.times[self._next] = t
+        self.values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def arrays(self):
+        """(times, values) oldest first, as copies."""
+        if self.count < self.capacity:
+            return self.times[:self.count].copy(), self.values[:self.count].copy()
+        order = np.r_[self._next:self.capacity, 0:self._next]
+        return self.times[order], self.values[order]
+
+
+class RecentQuotes:
+    """One RingBuffer per metal, filled from each refresh's snapshot. Safe to share between threads."""
+
+    def __init__(self, metals, capacity=DEFAULT_CAPACITY):
+        self._lock = threading.Lock()
+        self.buffers = {metal: RingBuffer(capacity) for metal in metals}
+
+    def record(self, data):
+        """Appends every live spot quote newer than the metal's last one.
+
+        Cached quotes (same timestamp as before) and manual overrides are skipped.
+        """
+        with self._lock:
+            for row in data["spot"]:
+                quote, buffer = row["quote"], self.buffers.get(row["name"])
+                if buffer is None or not quote.available or quote.is_manual:
+                    continue
+                last = buffer.last_time
+                if last is None or quote.timestamp > last:
+                    buffer.append(quote.timestamp, quote.value)
+
+    def seed(self, history, start, end):
+        """Fills empty buffers with the quotes kept in a tracker_history store between `start` and `end`."""
+        for metal, buffer in self.buffers.items():
+            if len(buffer):
+                continue
+            rows = history.quotes(metal, start, end)[-buffer.capacity:]
+            with self._lock:
+                for ts, price, _ in rows:
+                    buffer.append(ts, price)
+
+    def series(self, metal):
+        """(times, values) for `metal`, oldest first."""
+        with self._lock:
+            return self.buffers[metal].arrays()
+
+
+def lttb(x, y, threshold):
+    """Indices of `threshold` points of (x, y) chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. Each bucket in between keeps
+    the point that makes the largest triangle with the point kept from the
+    previous bucket and the average of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)   # threshold - 2 buckets over x[1:-1]
+    edges[1:] = np.maximum(edges[1:], edges[:-1] + 1)
+    # Average point of each bucket, plus the last point standing in for the bucket after the last
+    counts = np.diff(edges)
+    avg_x = np.append(np.add.reduceat(x[:n - 1], edges[:-1]) / counts, x[-1])
+    avg_y = np.append(np.add.reduceat(y[:n - 1], edges[:-1]) / counts, y[-1])
+    keep = np.empty(threshold, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = avg_x[i + 1], avg_y[i + 1]
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def sparkline_coords(times, values, width, height, pad=2):
+    """Flat [x0, y0, x1, y1, ...] canvas coordinates for a line of at most `width` points."""
+    if len(values) < 2:
+        return []
+    keep = lttb(times, values, max(3, int(width)))
+    x, y = times[keep], values[keep]
+    span_x = x[-1] - x[0] or 1.0
+    span_y = y.max() - y.min() or 1.0
+    px = pad + (x - x[0]) * ((width - 2 * pad) / span_x)
+    py = height - pad - (y - y.min()) * ((height - 2 * pad) / span_y)
+    return np.column_stack((px, py)).ravel().tolist()